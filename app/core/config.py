@@ -29,6 +29,27 @@ class Settings(BaseSettings):
 
     GEMINI_API_KEY: str | None = None
 
+    # 검색어 임베딩 영구 캐시 파일 (Chroma DB 폴더에 함께 저장)
+    QUERY_EMBEDDING_CACHE_PATH: str = "./chroma_db/query_embedding_cache.json"
+
+    # RAG 진단 리포트 캐시 (클래스 x 신뢰도 구간별, 매일 03:00 백그라운드 갱신)
+    RAG_REPORT_CACHE_TTL_SECONDS: int = 7 * 86400
+
+    # LLM 공용 게이트웨이 (RAG 리포트 / 운세 / 도감 키워드)
+    LLM_BACKEND: str = "gemini"                          # "gemini" / "http" (로컬 서버, 부하 테스트용)
+    LLM_HTTP_BASE_URL: str = "http://127.0.0.1:8090"     # benchmarks/fake_llm_server.py 기본 주소
+    LLM_MAX_CONNECTIONS: int = 16                        # http 백엔드 연결 풀 크기
+    LLM_MAX_CONCURRENCY: int = 8                         # 동시에 진행 중인 LLM 호출 상한 (초과 시 대기)
+    LLM_TIMEOUT_SECONDS: float = 20.0                    # 호출별 데드라인 (대기 포함, 스트림은 청크 간)
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 5               # 연속 실패 시 서킷 open → 즉시 fallback
+    LLM_BREAKER_RESET_SECONDS: float = 30.0
+
+    # 기본 운세 풀 (질문 없는 운세 요청은 미리 생성한 풀에서 선택, 매일 23:30 다음 날 풀 생성)
+    FORTUNE_POOL_SIZE: int = 30
+    FORTUNE_POOL_BATCH_SIZE: int = 5       # LLM 호출 1번에 생성할 운세 수
+    FORTUNE_POOL_CONCURRENCY: int = 3      # 풀 생성 시 동시 LLM 호출 수
+    FORTUNE_CACHE_MAX_SIZE: int = 10000    # (사용자, 날짜)별 오늘 운세 캐시 (KST 자정 만료)
+
     # Firebase 설정 (FCM 푸시 알림용)
     FIREBASE_CREDENTIALS_PATH: str | None = None
 
@@ -41,6 +62,64 @@ class Settings(BaseSettings):
     # IoT 마스터 유저 (개발자 계정)
     IOT_MASTER_USER_ID: int | None = None
 
+    # AI 모델 변형 선택: "fp32" (기본) / "int8" (정적 양자화, CPU 추론 시간 단축)
+    MODEL_VARIANT: str = "fp32"
+    # 서버 시작 시 함께 로드할 변형 (쉼표 구분, 예: "int8") → /internal/models에서 무중단 교체
+    MODEL_PRELOAD_VARIANTS: str = ""
+    # shadow 평가: 지정한 변형으로 요청 일부를 백그라운드 재추론해 활성 모델과 비교 (빈 값이면 사용 안 함)
+    MODEL_SHADOW_VARIANT: str = ""
+    MODEL_SHADOW_SAMPLE_RATE: float = 0.1
+    MODEL_SHADOW_MAX_PENDING: int = 4   # shadow 스레드 풀 대기 상한 (초과 시 비교 생략)
+
+    # 큰 JPEG 업로드를 DCT 축소(draft) 디코딩으로 빠르게 처리 (False면 풀 해상도 디코딩)
+    IMAGE_FAST_DECODE: bool = True
+
+    # AI 추론 스레드 풀 (워커마다 ORT intra-op 스레드를 쓰므로 (워커 수 + shadow 워커 1) x intra-op 스레드 수 ≤ vCPU 수)
+    # INFERENCE_INTRA_OP_THREADS=0이면 자동: vCPU 수 // (워커 수 + 1) (최소 1) → t3a.medium 2 vCPU, 워커 2개면 1
+    INFERENCE_INTRA_OP_THREADS: int = 0
+    INFERENCE_WORKERS: int = 2
+    # 동시에 처리 중인 진단 요청 상한 (초과 시 503 + Retry-After)
+    INFERENCE_MAX_PENDING: int = 16
+    INFERENCE_RETRY_AFTER_SECONDS: int = 2
+
+    # 진단 결과 캐시 (같은 사진 재업로드 시 추론/RAG/S3 업로드 생략)
+    DIAGNOSIS_CACHE_ENABLED: bool = True
+    DIAGNOSIS_CACHE_MAX_SIZE: int = 1024
+    DIAGNOSIS_CACHE_TTL_SECONDS: int = 86400
+    DIAGNOSIS_CACHE_PERCEPTUAL_HASH: bool = True     # dHash로 재인코딩된 같은 사진도 판별
+    DIAGNOSIS_CACHE_PHASH_MAX_DISTANCE: int = 4      # 64bit 중 허용 해밍 거리
+
+    # 스토리지 백엔드: "s3" (기본) / "local" (로컬 디스크, 테스트·벤치마크·AWS 키 없는 개발 환경)
+    STORAGE_BACKEND: str = "s3"
+    STORAGE_MAX_CONNECTIONS: int = 10    # S3 연결 풀 크기 (= 업로드 스레드 수)
+    LOCAL_STORAGE_DIR: str = "./local_storage"
+    LOCAL_STORAGE_BASE_URL: str = "http://localhost:8000/local-storage"
+
+    # 진단 이미지 S3 업로드 (응답 반환 후 백그라운드에서 동시 업로드 + 재시도)
+    UPLOAD_MAX_RETRIES: int = 3
+    UPLOAD_RETRY_BACKOFF_SECONDS: float = 0.5
+
+    # 비동기 진단 작업 (POST /api/diagnosis/jobs, diagnosis_jobs 테이블 기반 큐)
+    DIAGNOSIS_JOB_WORKERS: int = 2
+    DIAGNOSIS_JOB_POLL_SECONDS: float = 2.0
+    DIAGNOSIS_JOB_MAX_ATTEMPTS: int = 3
+    # 작업 큐에 저장할 이미지 크기 상한 (diagnosis_jobs.image_data는 MEDIUMBLOB 16MB, 초과 시 413)
+    DIAGNOSIS_JOB_MAX_IMAGE_BYTES: int = 10 * 1024 * 1024
+
+    # AI 추론 마이크로 배칭 (동시 요청을 모아 한 번에 추론)
+    INFERENCE_MAX_BATCH_SIZE: int = 8
+    INFERENCE_MAX_WAIT_MS: float = 10.0
+    # 추론 스레드별 입력/출력 버퍼 재사용 + ORT IO binding (False면 요청마다 session.run 출력 할당)
+    INFERENCE_IO_BINDING: bool = True
+
+    # 서버 시작 시 모델 워밍업 (합성 배치를 p99가 안정될 때까지 반복 → 끝나야 /health/ready가 200)
+    WARMUP_ENABLED: bool = True
+    WARMUP_MIN_ROUNDS: int = 3
+    WARMUP_MAX_ROUNDS: int = 20
+    WARMUP_P99_TOLERANCE: float = 0.2   # 직전 라운드 대비 p99 변화율이 이 값 이내면 안정
+    # 런타임 모델 교체 시 워밍업 (shadow 스레드 풀에서 고정 라운드만 → 서비스 중인 추론 스레드 풀 점유 없음)
+    WARMUP_RUNTIME_ROUNDS: int = 3
+
     class Config:
         # .env 파일을 읽어서 위 변수들에 자동으로 값을 채워줍니다.
         env_file = ".env"
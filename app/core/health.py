@@ -0,0 +1,61 @@
+# BACK-END/app/core/health.py
+
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Readiness:
+    """
+    서버 준비 상태 (liveness와 분리, 로드밸런서 readiness 체크용)
+    - 시작 단계마다 require()로 등록하고, 끝나면 complete()로 표시
+    - 등록된 단계가 모두 끝나야 ready (모델 워밍업이 끝나기 전에는 트래픽을 받지 않음)
+    - 단계가 실패해도 complete(error=...)로 끝낼 수 있음 (RAG처럼 fallback이 있는 단계)
+    - fail()은 단계를 끝내지 않고 오류만 기록 (모델 워밍업 실패 → 계속 not ready)
+    """
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self._pending: set[str] = set()
+        self._completed: dict[str, dict] = {}
+        self.ready_at: float | None = None
+
+    def require(self, name: str):
+        self._pending.add(name)
+        self._completed.pop(name, None)
+        self.ready_at = None
+
+    def complete(self, name: str, detail: dict | None = None, error: str | None = None):
+        self._pending.discard(name)
+        self._completed[name] = {
+            **(detail or {}),
+            "elapsed_s": round(time.monotonic() - self.started_at, 2),
+            **({"error": error} if error else {}),
+        }
+        if not self._pending and self.ready_at is None:
+            self.ready_at = time.monotonic()
+            logger.info(f"🟢 서버 준비 완료 (기동 후 {self.ready_at - self.started_at:.1f}초)")
+
+    def fail(self, name: str, error: str):
+        logger.error(f"🔴 서버 준비 단계 실패 ({name}): {error}")
+        self._completed[name] = {"elapsed_s": round(time.monotonic() - self.started_at, 2), "error": error}
+
+    def reset(self):
+        """서버 재시작(lifespan 재진입) 시 초기화"""
+        self.__init__()
+
+    @property
+    def ready(self) -> bool:
+        return not self._pending
+
+    def snapshot(self) -> dict:
+        return {
+            "ready": self.ready,
+            "pending": sorted(self._pending),
+            "completed": self._completed,
+        }
+
+
+# 앱 전역 준비 상태 (lifespan에서 갱신, /health/ready에서 조회)
+readiness = Readiness()
@@ -3,27 +3,75 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.core.database import engine, Base
+from app.core.config import settings
+from app.core.health import readiness
+from app.core.metrics import register_stats_provider, unregister_stats_provider
+from app.core.logger import setup_logging
+from app.core import resources
 
 # [중요] 테이블 생성을 위해 모든 모델을 미리 메모리에 로드해야 합니다.
 from app.domains.user.models import User
 from app.domains.home.models import Weather
-from app.domains.diagnosis.models import Diagnosis
+from app.domains.diagnosis.models import Diagnosis, DiagnosisJob, DiagnosisUpload  # 진단 결과 + 비동기 진단 작업 큐 + S3 업로드 대기
 from app.domains.dictionary.models import Dictionary
 from app.domains.notification.models import Notification  # 알림 테이블
-from app.domains.fortune.models import FortuneHistory     # 운세 이력 테이블
+from app.domains.fortune.models import FortuneHistory, FortunePool  # 운세 이력 + 날짜별 기본 운세 풀
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from app.core.scheduler import fetch_daily_weather_job, calculate_daily_risk_job, send_morning_notification_job, initialize_weather_data
+from app.core.scheduler import fetch_daily_weather_job, calculate_daily_risk_job, send_morning_notification_job, initialize_weather_data, refresh_rag_report_cache_job, generate_fortune_pool_job, initialize_fortune_pool
+import asyncio
 
 # 전역 객체 저장소
 ml_models = {}
-vector_db = {}
 scheduler = AsyncIOScheduler()
+background_tasks = set()  # 서버 시작 시 띄운 백그라운드 작업 (종료 시 취소)
+
+async def _warm_up_models():
+    """진단 모델 워밍업 (실패 시 not ready 유지 → 로드밸런서가 트래픽을 보내지 않음)"""
+    if not settings.WARMUP_ENABLED:
+        readiness.complete("models", {"skipped": True})
+        return
+    try:
+        readiness.complete("models", {"warmup": await ml_models["models"].warm_up_all()})
+    except Exception as e:
+        readiness.fail("models", str(e))
+
+
+async def _initialize_resources():
+    """Gemini / Chroma / Firebase 클라이언트 미리 생성 (import 시점 대신 기동 후 백그라운드, 실패 시 첫 사용 때 재시도)"""
+    # 라우터가 import하지 않는 리소스도 등록되도록 모듈 로드 (가벼움: 클라이언트는 아직 생성되지 않음)
+    import app.domains.fortune.service  # noqa: F401
+    import app.domains.search.rag_engine  # noqa: F401
+    import app.domains.search.vector_store  # noqa: F401
+    import app.utils.fcm_service  # noqa: F401
+
+    stats = await resources.initialize_all()
+    print(f"✅ [Resources] 외부 클라이언트 초기화: {', '.join(n for n, s in stats.items() if s['initialized'])}")
+
+
+async def _prime_retrieval():
+    """RAG 검색 경로 준비 (도감 인덱스 + 검색어 임베딩, 실패해도 fallback 리포트가 있으므로 ready 처리)"""
+    from app.domains.search.service import search_service
+    try:
+        readiness.complete("retrieval", await search_service.prime_retrieval())
+    except Exception as e:
+        readiness.complete("retrieval", error=str(e))
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # [Startup] 서버 시작 시 실행
+    setup_logging()
     print("🚀 [System] 서버 시작: DB 테이블 생성 및 리소스 로드...")
+    register_stats_provider("lazy_resources", resources.resource_stats)
+    from app.utils.llm_gateway import llm_gateway
+    register_stats_provider("llm_gateway", llm_gateway.stats)
+
+    # 준비 상태: 모델 워밍업 + 검색 경로 준비가 끝나야 /health/ready가 200 (liveness는 즉시 200)
+    readiness.reset()
+    readiness.require("models")
+    readiness.require("retrieval")
+    register_stats_provider("readiness", readiness.snapshot)
 
     # 1. DB 테이블 자동 생성 (테이블이 없을 때만 생성됨)
     async with engine.begin() as conn:
@@ -33,13 +81,79 @@ async def lifespan(app: FastAPI):
 
     # 2. AI 모델 로드 (ONNX Runtime)
     print("🚀 [System] EfficientNet-B0 (ONNX) 모델 및 Vector DB 로드 중...")
-    from app.domains.diagnosis.ai_engine import EfficientNetEngine
+    from app.domains.diagnosis.ai_engine import resolve_model_path
+    from app.domains.diagnosis.cache import diagnosis_cache
+    from app.domains.diagnosis.executor import InferenceExecutor
+    from app.domains.diagnosis.registry import ModelRegistry
     import os
-    _weights_path = os.path.join(os.path.dirname(__file__), "..", "domains", "diagnosis", "models", "efficientnet_b0_mold.onnx")
-    _weights_path = os.path.abspath(_weights_path)
-    print(f"📂 [Model] 가중치 경로: {_weights_path} (존재: {os.path.exists(_weights_path)})")
-    ml_models["efficientnet"] = EfficientNetEngine(weights_path=_weights_path)
-    
+    _weights_path = resolve_model_path(settings.MODEL_VARIANT)
+    print(f"📂 [Model] 가중치 경로 ({settings.MODEL_VARIANT}): {_weights_path} (존재: {os.path.exists(_weights_path)})")
+
+    # 2-1. 추론 전용 스레드 풀 (이벤트 루프 블로킹 방지 + 대기열 상한)
+    ml_models["executor"] = InferenceExecutor(
+        max_workers=settings.INFERENCE_WORKERS,
+        max_pending=settings.INFERENCE_MAX_PENDING,
+        retry_after_seconds=settings.INFERENCE_RETRY_AFTER_SECONDS,
+    )
+    register_stats_provider("inference_executor", ml_models["executor"].stats)
+
+    # 추론 워커별 ORT intra-op 스레드 수 (0이면 vCPU를 본 추론 워커 + shadow 워커 수로 나눈 값)
+    # shadow 스레드 풀(shadow 비교 / 런타임 워밍업)도 같은 intra-op 설정의 세션을 쓰므로 예산에 포함
+    # → vCPU가 워커 수보다 적으면(t3a.medium 2 vCPU, 워커 2 + shadow 1) 최소 1개씩이라 shadow 실행 중에만 초과 구독
+    _shadow_workers = 1
+    _intra_op_threads = settings.INFERENCE_INTRA_OP_THREADS or max(
+        1, (os.cpu_count() or 1) // (max(1, settings.INFERENCE_WORKERS) + _shadow_workers)
+    )
+    print(f"🧵 [Model] 추론 워커 {settings.INFERENCE_WORKERS}개 + shadow 워커 {_shadow_workers}개 "
+          f"x ORT intra-op 스레드 {_intra_op_threads}개")
+
+    # 2-2. 모델 레지스트리: 모델별 엔진 + 마이크로 배칭 스케줄러 (동시 요청을 모아 한 번에 추론)
+    # 활성 모델은 /internal/models/{variant}/activate로 무중단 교체, shadow 모델은 별도 1스레드 풀에서 비교
+    ml_models["models"] = ModelRegistry(
+        ml_models["executor"],
+        shadow_executor=InferenceExecutor(max_workers=_shadow_workers, max_pending=settings.MODEL_SHADOW_MAX_PENDING),
+        intra_op_num_threads=_intra_op_threads,
+        max_batch_size=settings.INFERENCE_MAX_BATCH_SIZE,
+        max_wait_ms=settings.INFERENCE_MAX_WAIT_MS,
+        io_binding=settings.INFERENCE_IO_BINDING,
+        warmup_min_rounds=settings.WARMUP_MIN_ROUNDS,
+        warmup_max_rounds=settings.WARMUP_MAX_ROUNDS,
+        warmup_tolerance=settings.WARMUP_P99_TOLERANCE,
+        runtime_warmup_rounds=settings.WARMUP_RUNTIME_ROUNDS,
+    )
+    # 시작 시에는 로드만 하고 워밍업은 아래 준비 단계에서 백그라운드로 실행
+    await ml_models["models"].activate(settings.MODEL_VARIANT, warm=False)
+    for _variant in filter(None, (v.strip() for v in settings.MODEL_PRELOAD_VARIANTS.split(","))):
+        await ml_models["models"].load(_variant, warm=False)
+    if settings.MODEL_SHADOW_VARIANT:
+        await ml_models["models"].set_shadow(settings.MODEL_SHADOW_VARIANT, settings.MODEL_SHADOW_SAMPLE_RATE,
+                                             warm=False)
+    register_stats_provider("model_registry", ml_models["models"].stats)
+    register_stats_provider("diagnosis_cache", diagnosis_cache.stats)
+
+    # 2-3. 앱 공용 스토리지 백엔드 (S3 연결 풀 공유 / 로컬 개발 시 디스크) + 업로드 write-behind 큐
+    from app.domains.diagnosis.uploader import UploadDispatcher
+    from app.utils.storage import create_storage_backend
+    ml_models["storage"] = create_storage_backend()
+    register_stats_provider("storage", ml_models["storage"].stats)
+    ml_models["uploader"] = UploadDispatcher(
+        ml_models["storage"],
+        max_retries=settings.UPLOAD_MAX_RETRIES,
+        retry_backoff_seconds=settings.UPLOAD_RETRY_BACKOFF_SECONDS,
+    )
+    await ml_models["uploader"].start()
+    register_stats_provider("upload_dispatcher", ml_models["uploader"].stats)
+
+    # 2-4. 비동기 진단 작업 워커 (diagnosis_jobs 큐 처리)
+    from app.domains.diagnosis.jobs import DiagnosisJobWorker
+    ml_models["job_worker"] = DiagnosisJobWorker(
+        concurrency=settings.DIAGNOSIS_JOB_WORKERS,
+        poll_interval=settings.DIAGNOSIS_JOB_POLL_SECONDS,
+        max_attempts=settings.DIAGNOSIS_JOB_MAX_ATTEMPTS,
+    )
+    await ml_models["job_worker"].start()
+    register_stats_provider("diagnosis_jobs", ml_models["job_worker"].stats)
+
 
     # [시작 시 실행]
     print("🚀 서버 시작: 스케줄러를 가동합니다.")
@@ -52,8 +166,41 @@ async def lifespan(app: FastAPI):
     
     # 3. 08:00 알림 발송
     scheduler.add_job(send_morning_notification_job, 'cron', hour=8, minute=0)
+
+    # 4. 03:00 RAG 진단 리포트 캐시 갱신
+    scheduler.add_job(refresh_rag_report_cache_job, 'cron', hour=3, minute=0)
+
+    # 5. 23:30 (KST) 다음 날 기본 운세 풀 생성 (날짜 계산이 KST 기준이므로 트리거도 KST 고정)
+    scheduler.add_job(generate_fortune_pool_job, 'cron', hour=23, minute=30, timezone='Asia/Seoul')
     
     scheduler.start()
+
+    # RAG 리포트 캐시 워밍 (Gemini 호출이 필요하므로 서버 기동을 막지 않도록 백그라운드 실행)
+    from app.domains.search.service import search_service
+    register_stats_provider("rag_report_cache", search_service.report_cache.stats)
+    # 동일 생성 요청 합치기 통계 (coalesced = 생략된 Gemini 호출 수)
+    from app.domains.fortune.service import fortune_flights, fortune_view_flights, fortune_cache, fortune_stream_latency
+    register_stats_provider("rag_report_flights", search_service.report_flights.stats)
+    register_stats_provider("fortune_flights", fortune_flights.stats)
+    register_stats_provider("fortune_view_flights", fortune_view_flights.stats)
+    register_stats_provider("fortune_cache", fortune_cache.stats)
+    register_stats_provider("fortune_stream", lambda: {
+        name: tracker.snapshot() for name, tracker in fortune_stream_latency.items()
+    })
+    warm_task = asyncio.create_task(search_service.warm_report_cache())
+    background_tasks.add(warm_task)
+    warm_task.add_done_callback(background_tasks.discard)
+
+    # 오늘 기본 운세 풀 확인 (없으면 LLM으로 생성, 그동안 기본 운세는 실시간 생성)
+    pool_task = asyncio.create_task(initialize_fortune_pool())
+    background_tasks.add(pool_task)
+    pool_task.add_done_callback(background_tasks.discard)
+
+    # 준비 단계 (모델 워밍업 / 검색 경로 준비)와 외부 클라이언트 생성을 백그라운드로 실행 → 끝나면 readiness 전환
+    for ready_task in (asyncio.create_task(_warm_up_models()), asyncio.create_task(_prime_retrieval()),
+                       asyncio.create_task(_initialize_resources())):
+        background_tasks.add(ready_task)
+        ready_task.add_done_callback(background_tasks.discard)
     # await를 사용하여 이 작업이 끝날 때까지 서버가 대기하도록 함 (데이터 확보 우선)
     await initialize_weather_data()
 
@@ -63,8 +210,33 @@ async def lifespan(app: FastAPI):
     # [종료 시 실행]
     print("🛑 서버 종료: 스케줄러를 정지합니다.")
     scheduler.shutdown()
+    for task in list(background_tasks):
+        task.cancel()
+    unregister_stats_provider("rag_report_cache")
+    unregister_stats_provider("rag_report_flights")
+    unregister_stats_provider("fortune_flights")
+    unregister_stats_provider("fortune_view_flights")
+    unregister_stats_provider("fortune_cache")
+    unregister_stats_provider("fortune_stream")
+    unregister_stats_provider("readiness")
+    unregister_stats_provider("model_registry")
+    unregister_stats_provider("inference_executor")
+    unregister_stats_provider("diagnosis_cache")
+    unregister_stats_provider("diagnosis_jobs")
+    await ml_models["job_worker"].stop()
+    unregister_stats_provider("upload_dispatcher")
+    # 남은 S3 업로드를 모두 처리한 뒤 종료 (DB 갱신이 필요하므로 engine.dispose() 이전)
+    await ml_models["uploader"].stop()
+    unregister_stats_provider("storage")
+    await ml_models["storage"].close()
+    await ml_models["models"].close()
+    ml_models["executor"].shutdown()
     ml_models.clear()
-    vector_db.clear()
+    # LLM 게이트웨이 연결 / Gemini / Chroma / Firebase 클라이언트 해제 (재시작 시 다시 생성)
+    unregister_stats_provider("llm_gateway")
+    await llm_gateway.aclose()
+    unregister_stats_provider("lazy_resources")
+    resources.reset_all()
     
     # DB 커넥션 종료
     await engine.dispose()
\ No newline at end of file
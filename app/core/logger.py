@@ -5,8 +5,6 @@ from logging.handlers import TimedRotatingFileHandler
 from datetime import datetime
 
 LOG_DIR = "logs"
-if not os.path.exists(LOG_DIR):
-    os.makedirs(LOG_DIR)
 
 class JsonFormatter(logging.Formatter):
     def format(self, record):
@@ -23,7 +21,16 @@ class JsonFormatter(logging.Formatter):
                 log_record["stack_trace"] = self.formatException(record.exc_info)
         return json.dumps(log_record, ensure_ascii=False)
 
+_configured = False
+
+
 def setup_logging():
+    # 서버 재시작(lifespan 재진입) 시 핸들러가 중복 등록되지 않도록 1회만 설정
+    global _configured
+    if _configured:
+        return
+    _configured = True
+
     # 기본 로그 레벨 설정
     root_logger = logging.getLogger()
     root_logger.setLevel(logging.INFO)
@@ -35,7 +42,8 @@ def setup_logging():
     logging.getLogger("uvicorn.error").setLevel(logging.ERROR)
     logging.getLogger("watchfiles").setLevel(logging.ERROR) # 리로더 로그 차단
 
-    # 파일 핸들러 (운영용: 7일 보관)
+    # 파일 핸들러 (운영용: 7일 보관, 로그 폴더는 import 시점이 아니라 로깅 설정 시 생성)
+    os.makedirs(LOG_DIR, exist_ok=True)
     file_handler = TimedRotatingFileHandler(
         filename=os.path.join(LOG_DIR, "server.log"),
         when="midnight", interval=1, backupCount=7, encoding="utf-8"
@@ -0,0 +1,87 @@
+# BACK-END/app/core/metrics.py
+
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+# 컴포넌트별 통계 제공 함수 저장소 (이름 → stats() 콜백)
+_stats_providers: dict[str, Callable[[], dict]] = {}
+
+
+def register_stats_provider(name: str, provider: Callable[[], dict]):
+    """
+    운영 통계 제공자 등록
+    - 같은 이름으로 다시 등록하면 덮어씀 (서버 재시작/리로드 대비)
+    """
+    _stats_providers[name] = provider
+
+
+def unregister_stats_provider(name: str):
+    """운영 통계 제공자 해제 (서버 종료 시)"""
+    _stats_providers.pop(name, None)
+
+
+def collect_stats() -> dict:
+    """등록된 모든 컴포넌트의 통계를 한 번에 수집"""
+    snapshot = {}
+    for name, provider in list(_stats_providers.items()):
+        try:
+            snapshot[name] = provider()
+        except Exception as e:
+            logger.error(f"통계 수집 실패 ({name}): {e}")
+            snapshot[name] = {"error": str(e)}
+    return snapshot
+
+
+class LatencyTracker:
+    """
+    작업별 지연 시간 분포 기록 (최근 window개 샘플 기준 백분위)
+    - observe()는 이벤트 루프 / 워커 스레드 어디서 호출해도 됨 (deque append는 thread-safe)
+    """
+
+    def __init__(self, window: int = 1024):
+        self._samples: deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.errors = 0
+
+    def observe(self, seconds: float, error: bool = False):
+        self._samples.append(seconds)
+        self.count += 1
+        if error:
+            self.errors += 1
+
+    @contextmanager
+    def time(self):
+        """with tracker.time(): ... 형태로 구간 시간 기록 (예외 발생 시 errors 증가)"""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.observe(time.perf_counter() - start, error=True)
+            raise
+        self.observe(time.perf_counter() - start)
+
+    def percentile(self, q: float) -> float:
+        """최근 샘플의 q 백분위 (초), 샘플이 없으면 0.0"""
+        return _percentile(sorted(self._samples), q)
+
+    def snapshot(self) -> dict:
+        ordered = sorted(self._samples)
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": round(sum(ordered) / len(ordered) * 1000, 2) if ordered else 0.0,
+            "p50_ms": round(_percentile(ordered, 50) * 1000, 2),
+            "p95_ms": round(_percentile(ordered, 95) * 1000, 2),
+            "p99_ms": round(_percentile(ordered, 99) * 1000, 2),
+        }
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
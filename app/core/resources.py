@@ -0,0 +1,98 @@
+# BACK-END/app/core/resources.py
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable, Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# 이름 → LazyResource (운영 통계 / 종료 시 일괄 해제용)
+_resources: dict[str, "LazyResource"] = {}
+
+
+class LazyResource(Generic[T]):
+    """
+    처음 사용할 때 생성되는 모듈 전역 싱글톤 (Gemini / Chroma / Firebase 클라이언트 등)
+    - import 시점에는 아무것도 만들지 않음 → 워커 기동이 빨라지고, 테스트에서 부작용 없이 app import 가능
+    - get(): 동기 코드 / 워커 스레드용 (여러 스레드가 동시에 불러도 1번만 생성)
+    - aget(): 이벤트 루프용 (아직 없으면 생성을 스레드에서 실행하여 루프 블로킹 방지)
+    - lifespan이 시작 시 미리 생성하고, 종료 시 reset_all()로 해제 (재시작 시 새로 생성)
+    """
+
+    def __init__(self, name: str, factory: Callable[[], T], close: Callable[[T], None] | None = None):
+        self.name = name
+        self._factory = factory
+        self._close = close
+        self._instance: T | None = None
+        self._lock = threading.Lock()
+        self.init_seconds: float | None = None
+        self.last_error: str | None = None
+        _resources[name] = self
+
+    @property
+    def initialized(self) -> bool:
+        return self._instance is not None
+
+    def get(self) -> T:
+        instance = self._instance
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            if self._instance is None:
+                start = time.perf_counter()
+                try:
+                    self._instance = self._factory()
+                except Exception as e:
+                    self.last_error = str(e)
+                    raise
+                self.init_seconds = time.perf_counter() - start
+                self.last_error = None
+                logger.info(f"🧩 {self.name} 초기화 완료 ({self.init_seconds * 1000:.0f}ms)")
+            return self._instance
+
+    async def aget(self) -> T:
+        instance = self._instance
+        if instance is not None:
+            return instance
+        return await asyncio.to_thread(self.get)
+
+    def reset(self):
+        """생성된 인스턴스 해제 (다음 get()에서 다시 생성)"""
+        with self._lock:
+            instance, self._instance = self._instance, None
+        if instance is not None and self._close is not None:
+            try:
+                self._close(instance)
+            except Exception as e:
+                logger.warning(f"⚠️ {self.name} 해제 실패: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "initialized": self.initialized,
+            "init_ms": round(self.init_seconds * 1000, 1) if self.init_seconds is not None else None,
+            **({"last_error": self.last_error} if self.last_error else {}),
+        }
+
+
+async def initialize_all() -> dict:
+    """등록된 리소스를 병렬로 미리 생성 (실패한 리소스는 첫 사용 시 다시 시도)"""
+    resources = list(_resources.values())
+    results = await asyncio.gather(*(resource.aget() for resource in resources), return_exceptions=True)
+    for resource, result in zip(resources, results):
+        if isinstance(result, Exception):
+            logger.error(f"❌ {resource.name} 초기화 실패: {result}")
+    return resource_stats()
+
+
+def reset_all():
+    for resource in list(_resources.values()):
+        resource.reset()
+
+
+def resource_stats() -> dict:
+    return {name: resource.stats() for name, resource in _resources.items()}
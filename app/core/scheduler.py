@@ -4,6 +4,7 @@ import asyncio
 import math
 from datetime import datetime, timedelta
 from sqlalchemy import select, func, delete
+from app.core.config import settings
 from app.core.database import AsyncSessionLocal
 from app.domains.home.models import Weather
 from app.domains.user.models import User
@@ -352,6 +353,64 @@ async def _get_best_ventilation_time(db, user) -> str:
     
     return "환기 적합 시간 없음 (실내 환기 권장)"
 
+async def refresh_rag_report_cache_job():
+    """
+    [매일 03:00 KST 실행] RAG 진단 리포트 캐시 백그라운드 갱신
+    - 도감 버전 확인 후 클래스 x 신뢰도 구간 리포트 전체 재생성
+    - 재생성 중에도 기존 리포트로 진단 응답 (성공한 항목만 교체)
+    """
+    from app.domains.search.service import search_service
+
+    logger.info("🔥 [Scheduler] RAG 리포트 캐시 갱신 시작")
+    try:
+        await search_service.warm_report_cache(force=True)
+    except Exception as e:
+        logger.error(f"❌ [Scheduler] RAG 리포트 캐시 갱신 실패: {e}")
+
+async def generate_fortune_pool_job(days_ahead: int = 1):
+    """
+    [매일 23:30 KST 실행] 다음 날 기본 운세 풀 미리 생성
+    - 질문 없는 /api/fortune/today 요청은 이 풀에서 골라 저장만 함 (아침 8시 알림 직후에도 Gemini 호출 없음)
+    - days_ahead=0: 오늘 풀 생성 (서버 시작 시 오늘 풀이 없을 때)
+    """
+    from app.domains.fortune.service import fortune_service
+    from app.domains.fortune.repository import fortune_repository
+
+    kst = pytz.timezone('Asia/Seoul')
+    today = datetime.now(kst)
+    target_date = (today + timedelta(days=days_ahead)).strftime('%Y-%m-%d')
+
+    logger.info(f"🔮 [Scheduler] 운세 풀 생성 시작 ({target_date}, {settings.FORTUNE_POOL_SIZE}개)")
+    try:
+        service = await fortune_service.aget()
+        fortunes = await service.build_pool(
+            settings.FORTUNE_POOL_SIZE, settings.FORTUNE_POOL_BATCH_SIZE, settings.FORTUNE_POOL_CONCURRENCY
+        )
+        if not fortunes:
+            logger.error(f"❌ [Scheduler] 운세 풀 생성 실패 ({target_date}): 생성된 운세 없음 (요청 시 실시간 생성)")
+            return
+
+        async with AsyncSessionLocal() as db:
+            await fortune_repository.replace_pool(db, target_date, fortunes)
+            await fortune_repository.delete_pools_before(db, today.strftime('%Y-%m-%d'))
+        logger.info(f"✅ [Scheduler] 운세 풀 저장 완료 ({target_date}, {len(fortunes)}/{settings.FORTUNE_POOL_SIZE}개)")
+    except Exception as e:
+        logger.error(f"❌ [Scheduler] 운세 풀 생성 실패: {e}")
+
+
+async def initialize_fortune_pool():
+    """서버 시작 시 오늘 운세 풀이 없으면 생성 (배포 / 23:30 작업 실패 대비)"""
+    from app.domains.fortune.repository import fortune_repository
+
+    today = datetime.now(pytz.timezone('Asia/Seoul')).strftime('%Y-%m-%d')
+    async with AsyncSessionLocal() as db:
+        pool = await fortune_repository.get_pool(db, today)
+    if pool:
+        logger.info(f"✅ [Init] 오늘 운세 풀 확인 ({len(pool)}개)")
+        return
+    await generate_fortune_pool_job(days_ahead=0)
+
+
 async def initialize_weather_data():
     print("🔎 [Init] 데이터 무결성 검사...")
     async with AsyncSessionLocal() as db:
@@ -1,8 +1,19 @@
 # BACK-END/app/domains/diagnosis/ai_engine.py
 
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from typing import Callable
+
 import numpy as np
 import onnxruntime as ort
-from PIL import Image
+
+from app.domains.diagnosis.cam import CAM_THRESHOLD, bbox_from_grid, bbox_from_heatmap, compute_cams, upsample_cams
+from app.domains.diagnosis.classifier_weights import load_classifier_weights
+from app.utils.image_context import ImageContext, decode_rgb
 
 # 학습된 모델의 출력 클래스 라벨 (5개 분류)
 # G3은 흰곰팡이(Mucor 등)와 백화현상(Efflorescence)을 병합
@@ -18,15 +29,70 @@ MOLD_CLASSES = [
 IMAGENET_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
 IMAGENET_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
 
-# CAM 바운딩박스 추출 임계값
-CAM_THRESHOLD = 0.5
+# (x / 255 - mean) / std = x * scale + bias → CHW 채널별 곱셈 1회 + 덧셈 1회로 정규화
+NORMALIZE_SCALE = (1.0 / (255.0 * IMAGENET_STD)).reshape(3, 1, 1)
+NORMALIZE_BIAS = (-IMAGENET_MEAN / IMAGENET_STD).reshape(3, 1, 1)
+
+# 모델 변형별 ONNX 파일 (convert_to_onnx.py가 생성, .env의 MODEL_VARIANT로 선택)
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+MODEL_VARIANTS = {
+    # FP32, 동적 batch
+    "fp32": {"file": "efficientnet_b0_mold.onnx", "version": "efficientnet_b0_v1.0"},
+    # 정적 INT8 양자화 (classifier는 FP32 유지)
+    "int8": {"file": "efficientnet_b0_mold_int8.onnx", "version": "efficientnet_b0_int8_v1.0"},
+}
+
+logger = logging.getLogger(__name__)
+
+# CAM 생성 여부: bool 또는 분류 결과(dict)를 보고 판단하는 함수 (저장 라벨 확정 후 필요할 때만 계산)
+CamRequest = bool | Callable[[dict], bool]
+
+
+def resolve_model_path(variant: str) -> str:
+    """모델 변형 이름(fp32/int8) → ONNX 파일 절대 경로"""
+    if variant not in MODEL_VARIANTS:
+        raise ValueError(f"알 수 없는 모델 변형: {variant} (사용 가능: {list(MODEL_VARIANTS)})")
+    return os.path.join(MODEL_DIR, MODEL_VARIANTS[variant]["file"])
+
+
+def normalize_into(image_rgb: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """
+    224x224 RGB uint8 배열 (HWC) → 정규화된 (3, 224, 224) float32를 out에 바로 기록
+    - transpose는 view, uint8 → float32 변환은 곱셈 중에 수행 → 중간 배열 없음
+    """
+    np.multiply(image_rgb.transpose(2, 0, 1), NORMALIZE_SCALE, out=out)
+    np.add(out, NORMALIZE_BIAS, out=out)
+    return out
+
+
+class InferenceBuffers:
+    """
+    추론 스레드 1개가 재사용하는 입력/출력 버퍼 + ORT IO binding
+    - 입력 (capacity, 3, 224, 224), logits (capacity, NUM_CLASSES), features (capacity, 1280, 7, 7)
+    - 배치 크기 n이면 앞쪽 n개만 바인딩 (첫 축 슬라이스라 연속 메모리 유지)
+    - 반환되는 logits / features는 버퍼의 view → 같은 스레드의 다음 추론 전에 후처리를 끝내야 함
+    """
+
+    def __init__(self, session: ort.InferenceSession, capacity: int):
+        self.capacity = capacity
+        self.inputs = np.empty((capacity, 3, 224, 224), dtype=np.float32)
+        self.outputs = [
+            np.empty([capacity] + [dim for dim in output.shape[1:]], dtype=np.float32)
+            for output in session.get_outputs()
+        ]
+        self.binding = session.io_binding()
 
 
 class EfficientNetEngine:
-    def __init__(self, weights_path: str | None = None):
+    def __init__(self, weights_path: str | None = None, intra_op_num_threads: int = 1,
+                 model_version: str = MODEL_VARIANTS["fp32"]["version"],
+                 buffer_batch_size: int = 1, io_binding: bool = True, use_weight_sidecar: bool = True):
+        # 진단 결과 sidecar / 결과 캐시에 기록되는 모델 버전
+        self.model_version = model_version
+
         sess_options = ort.SessionOptions()
         sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
-        sess_options.intra_op_num_threads = 2  # t3a.medium 2 vCPU
+        sess_options.intra_op_num_threads = intra_op_num_threads  # 추론 워커 수 x 이 값 ≤ vCPU 수
 
         self.session = ort.InferenceSession(
             weights_path,
@@ -34,37 +100,30 @@ class EfficientNetEngine:
             providers=["CPUExecutionProvider"]
         )
         self.input_name = self.session.get_inputs()[0].name
+        # 출력 노드: logits("output") + feature map (CAM 불필요 시 logits만 요청)
+        self.output_names = [output.name for output in self.session.get_outputs()]
 
-        # FC layer weight 추출 (서버 시작 시 1회, CAM 계산용)
-        self.fc_weights = self._extract_fc_weights(weights_path)
-
-    def _extract_fc_weights(self, onnx_path: str) -> np.ndarray:
-        """ONNX initializer에서 classifier FC weight 추출 (shape: NUM_CLASSES × 1280)"""
-        import onnx
-        import onnx.numpy_helper
+        # 배치 축이 동적(dynamic axis)인지 확인 (구버전 batch-1 고정 모델은 배치 추론 불가)
+        batch_dim = self.session.get_inputs()[0].shape[0]
+        self.supports_batching = not isinstance(batch_dim, int)
 
-        model = onnx.load(onnx_path)
-        for initializer in model.graph.initializer:
-            if "classifier" in initializer.name and "weight" in initializer.name:
-                return onnx.numpy_helper.to_array(initializer)
+        # FC layer weight 로드 (서버 시작 시 1회, CAM 계산용)
+        # convert_to_onnx.py가 만든 .npy sidecar를 memory-map (없거나 체크섬 불일치 시 ONNX에서 추출)
+        self.fc_weights = load_classifier_weights(weights_path, use_sidecar=use_weight_sidecar)
 
-        raise ValueError("Classifier FC weight not found in ONNX model")
+        # 추론 스레드별 재사용 버퍼 (배치 최대 크기만큼 미리 할당, 더 큰 배치가 오면 그 크기로 재할당)
+        self.buffer_batch_size = max(1, buffer_batch_size) if self.supports_batching else 1
+        self.io_binding = io_binding
+        self._local = threading.local()
 
     def preprocess(self, image_file) -> np.ndarray:
         """SpooledTemporaryFile/BytesIO → 정규화된 numpy 배열 변환"""
-        image = Image.open(image_file).convert("RGB")
-        image = image.resize((224, 224), Image.BILINEAR)
-
-        # PIL Image → float32 배열 (0~1 범위)
-        img_array = np.array(image, dtype=np.float32) / 255.0
-
-        # ImageNet 정규화
-        img_array = (img_array - IMAGENET_MEAN) / IMAGENET_STD
-
-        # HWC → CHW → NCHW (배치 차원 추가)
-        img_array = img_array.transpose(2, 0, 1)
-        img_array = np.expand_dims(img_array, axis=0)
+        return self.normalize(decode_rgb(image_file))
 
+    def normalize(self, image_rgb: np.ndarray) -> np.ndarray:
+        """224x224 RGB uint8 배열 → 정규화된 (1, 3, 224, 224) float32 배열"""
+        img_array = np.empty((1, 3, 224, 224), dtype=np.float32)
+        normalize_into(image_rgb, img_array[0])
         return img_array
 
     def predict(self, image_file) -> dict:
@@ -78,7 +137,7 @@ class EfficientNetEngine:
             "confidence": result["confidence"]
         }
 
-    def predict_with_cam(self, image_file, generate_cam: bool = True) -> dict:
+    def predict_with_cam(self, image_file, generate_cam: CamRequest = True) -> dict:
         """
         이미지 분류 추론 + Weight-based CAM 생성
         반환: {
@@ -88,88 +147,285 @@ class EfficientNetEngine:
             "bbox": [x_min, y_min, x_max, y_max] or None
         }
         """
-        input_data = self.preprocess(image_file)
-
-        # ONNX 추론 (dual-output: logits + feature maps)
-        outputs = self.session.run(None, {self.input_name: input_data})
-        logits = outputs[0][0]      # shape: (4,)
-        features = outputs[1][0]    # shape: (1280, 7, 7)
-
-        # softmax
-        exp_logits = np.exp(logits - np.max(logits))
-        probabilities = exp_logits / exp_logits.sum()
-
-        predicted_idx = int(np.argmax(probabilities))
-        confidence = float(probabilities[predicted_idx])
-
-        result = {
-            "class_name": MOLD_CLASSES[predicted_idx],
-            "confidence": round(confidence * 100, 1),
-            "cam_heatmap": None,
-            "bbox": None,
-            "all_probabilities": {
-                MOLD_CLASSES[i]: round(float(probabilities[i]) * 100, 1)
-                for i in range(len(MOLD_CLASSES))
-            }
-        }
+        return self.infer([decode_rgb(image_file)], [generate_cam], return_heatmap=True)[0]
 
-        if generate_cam:
-            cam_heatmap = self._compute_cam(features, predicted_idx)
-            bbox = self._extract_bbox(cam_heatmap)
-            result["cam_heatmap"] = cam_heatmap
-            result["bbox"] = bbox
-
-        return result
-
-    def _compute_cam(self, features: np.ndarray, class_idx: int) -> np.ndarray:
+    def infer(self, images: list[np.ndarray], generate_cam: list[CamRequest],
+              return_heatmap: bool = False) -> list[dict]:
         """
-        Weight-based CAM 계산
-        features: (1280, 7, 7), class_idx: 예측된 클래스 인덱스
-        반환: (224, 224) normalized heatmap [0, 1]
+        224x224 RGB uint8 이미지 N장 → 이미지별 분류 결과 + CAM (추론 스레드에서 호출)
+        - 스레드별 버퍼에 바로 정규화 → IO binding으로 출력도 버퍼에 받음 (요청마다 새 배열 할당 없음)
+        - CAM을 요청한 이미지가 없으면 logits만 추론
         """
-        weights = self.fc_weights[class_idx]  # (1280,)
-
-        # Weighted sum: 벡터화 연산으로 빠르게 계산
-        cam = np.einsum('i,ijk->jk', weights, features)  # (7, 7)
-
-        # ReLU
-        cam = np.maximum(cam, 0)
-
-        # Normalize to [0, 1]
-        cam_max = cam.max()
-        if cam_max > 0:
-            cam = (cam - cam.min()) / (cam_max - cam.min())
-
-        # 7x7 → 224x224 resize (PIL bilinear)
-        cam_pil = Image.fromarray((cam * 255).astype(np.uint8), mode='L')
-        cam_resized = cam_pil.resize((224, 224), Image.BILINEAR)
-
-        return np.array(cam_resized, dtype=np.float32) / 255.0
-
-    def _extract_bbox(self, cam_heatmap: np.ndarray) -> list[int]:
+        with_features = any(generate_cam)
+        if not self.io_binding:
+            inputs = np.concatenate([self.normalize(image) for image in images], axis=0)
+            logits, features = self.run_batch(inputs, with_features=with_features)
+        else:
+            buffers = self._buffers(len(images))
+            for image, out in zip(images, buffers.inputs):
+                normalize_into(image, out)
+            logits, features = self._run_bound(buffers, len(images), with_features)
+        return self.postprocess_batch(logits, features, generate_cam, return_heatmap)
+
+    def _buffers(self, batch_size: int) -> InferenceBuffers:
+        """현재 스레드의 재사용 버퍼 (처음 사용하거나 용량이 부족할 때만 할당)"""
+        buffers = getattr(self._local, "buffers", None)
+        if buffers is None or buffers.capacity < batch_size:
+            buffers = InferenceBuffers(self.session, max(batch_size, self.buffer_batch_size))
+            self._local.buffers = buffers
+        return buffers
+
+    def _run_bound(self, buffers: InferenceBuffers, batch_size: int,
+                   with_features: bool) -> tuple[np.ndarray, np.ndarray | None]:
+        """IO binding 추론: 입력 버퍼를 그대로 넘기고 출력은 미리 할당한 버퍼에 기록"""
+        binding = buffers.binding
+        binding.clear_binding_inputs()
+        binding.clear_binding_outputs()
+        binding.bind_cpu_input(self.input_name, buffers.inputs[:batch_size])
+
+        # logits만 필요하면 feature map 출력은 바인딩하지 않음
+        outputs = [output[:batch_size] for output in buffers.outputs[:2 if with_features else 1]]
+        for name, output in zip(self.output_names, outputs):
+            binding.bind_output(name, "cpu", 0, np.float32, list(output.shape), output.ctypes.data)
+
+        self.session.run_with_iobinding(binding)
+        return outputs[0], outputs[1] if with_features else None
+
+    def run_batch(self, input_batch: np.ndarray,
+                  with_features: bool = True) -> tuple[np.ndarray, np.ndarray | None]:
         """
-        CAM heatmap에서 바운딩박스 추출
-        cam_heatmap: (224, 224) [0, 1]
-        반환: [x_min, y_min, x_max, y_max]
+        (N, 3, 224, 224) 입력을 한 번의 session.run으로 추론
+        반환: (logits (N, NUM_CLASSES), features (N, 1280, 7, 7) 또는 with_features=False면 None)
         """
-        binary_mask = (cam_heatmap > CAM_THRESHOLD).astype(np.uint8)
+        if not with_features:
+            # logits 노드만 요청 → feature map (N x 1280 x 7 x 7) 출력 복사 생략
+            return self.session.run(self.output_names[:1], {self.input_name: input_batch})[0], None
 
-        rows = np.any(binary_mask, axis=1)
-        cols = np.any(binary_mask, axis=0)
+        # ONNX 추론 (dual-output: logits + feature maps)
+        outputs = self.session.run(None, {self.input_name: input_batch})
+        return outputs[0], outputs[1]
 
-        if not rows.any() or not cols.any():
-            return [0, 0, 224, 224]
+    def postprocess(self, logits: np.ndarray, features: np.ndarray | None, generate_cam: CamRequest = True,
+                    return_heatmap: bool = True) -> dict:
+        """
+        단일 이미지의 logits (NUM_CLASSES,) + features (1280, 7, 7) → 분류 결과 + CAM
+        """
+        features = None if features is None else features[None]
+        return self.postprocess_batch(logits[None], features, [generate_cam], return_heatmap)[0]
 
-        y_min, y_max = int(np.where(rows)[0][0]), int(np.where(rows)[0][-1])
-        x_min, x_max = int(np.where(cols)[0][0]), int(np.where(cols)[0][-1])
+    def postprocess_batch(self, logits: np.ndarray, features: np.ndarray | None, generate_cam: list[CamRequest],
+                          return_heatmap: bool = False) -> list[dict]:
+        """
+        배치 logits (N, NUM_CLASSES) + features (N, 1280, 7, 7) → 이미지별 분류 결과 + CAM
+        - generate_cam이 함수인 이미지는 분류 결과를 넘겨 CAM이 실제로 쓰일 때만 계산 (예: 저장 라벨이 G0가 아님)
+        - CAM이 필요한 이미지만 모아 한 번의 einsum으로 계산
+        - return_heatmap=False면 224x224 heatmap을 만들지 않고 7x7 격자에서 bbox를 바로 계산
+        """
+        # softmax
+        exp_logits = np.exp(logits - logits.max(axis=1, keepdims=True))
+        probabilities = exp_logits / exp_logits.sum(axis=1, keepdims=True)
+        predicted = probabilities.argmax(axis=1)
+
+        results = []
+        for probs, predicted_idx in zip(probabilities, predicted):
+            results.append({
+                "class_name": MOLD_CLASSES[predicted_idx],
+                "confidence": round(float(probs[predicted_idx]) * 100, 1),
+                "cam_heatmap": None,
+                "bbox": None,
+                "all_probabilities": {
+                    MOLD_CLASSES[i]: round(float(probs[i]) * 100, 1)
+                    for i in range(len(MOLD_CLASSES))
+                }
+            })
+
+        cam_rows = [
+            i for i, (flag, result) in enumerate(zip(generate_cam, results))
+            if (flag(result) if callable(flag) else flag)
+        ]
+        if not cam_rows or features is None:
+            return results
+
+        # 전부 CAM 대상이면 feature map을 복사하지 않고 그대로 사용 (IO binding 버퍼 view)
+        selected = features if len(cam_rows) == len(features) else features[cam_rows]
+        cams = compute_cams(selected, self.fc_weights, predicted[cam_rows])  # (M, 7, 7)
+        if return_heatmap:
+            heatmaps = upsample_cams(cams)  # (M, 224, 224)
+            for row, heatmap in zip(cam_rows, heatmaps):
+                results[row]["cam_heatmap"] = heatmap
+                results[row]["bbox"] = bbox_from_heatmap(heatmap, CAM_THRESHOLD)
+        else:
+            for row, cam in zip(cam_rows, cams):
+                results[row]["bbox"] = bbox_from_grid(cam, CAM_THRESHOLD)
+
+        return results
+
+
+class InferenceBatcher:
+    """
+    동시에 들어온 진단 요청을 모아 한 번의 session.run으로 처리하는 마이크로 배칭 스케줄러
+    - 최대 max_batch_size장이 모이거나 첫 요청 후 max_wait_ms가 지나면 배치 실행
+    - 배치 추론 + 후처리(softmax, CAM, bbox)를 한 번에 실행하고 요청별 결과를 Future로 돌려줌
+    - 배치 축이 고정된 모델이면 max_batch_size=1로 동작 (기존과 동일한 단건 추론)
+    - 전처리/추론/후처리는 모두 executor(추론 전용 스레드 풀)에서 실행되어 이벤트 루프를 막지 않음
+    """
+
+    def __init__(self, engine: EfficientNetEngine, executor=None,
+                 max_batch_size: int = 8, max_wait_ms: float = 10.0):
+        self.engine = engine
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size) if engine.supports_batching else 1
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+
+        # 운영 통계
+        self.total_requests = 0
+        self.total_batches = 0
+        self.batch_size_histogram = Counter()
+        self.last_batch_latency_ms = 0.0
+        self.total_logits_only_batches = 0  # feature map 출력 없이 추론한 배치
+        self.total_cams_computed = 0
+        self.total_cams_skipped = 0         # CAM 판단 함수가 불필요로 판정한 요청 (G0 / UNCLASSIFIED 등)
+
+    async def start(self):
+        """배치 수집 루프 시작 (lifespan startup에서 1회 호출)"""
+        if self._worker is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+        logger.info(
+            f"InferenceBatcher 시작 (max_batch_size={self.max_batch_size}, "
+            f"max_wait_ms={self.max_wait * 1000:.1f}, dynamic_batch={self.engine.supports_batching})"
+        )
 
-        # 10% padding
-        pad_y = max(1, int((y_max - y_min) * 0.1))
-        pad_x = max(1, int((x_max - x_min) * 0.1))
+    async def stop(self):
+        """배치 수집 루프 종료 + 대기 중인 요청 실패 처리 (이후 submit()은 즉시 RuntimeError)"""
+        if self._worker is None:
+            return
+        queue, self._queue = self._queue, None  # 종료 중 / 종료 후 들어온 요청은 큐에 넣지 않음
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        while not queue.empty():
+            *_, future = queue.get_nowait()
+            self._fail(future)
+
+    @staticmethod
+    def _fail(future: asyncio.Future):
+        if not future.done():
+            future.set_exception(RuntimeError("InferenceBatcher가 종료되었습니다."))
+
+    async def submit(self, image_rgb: np.ndarray, generate_cam: CamRequest = True) -> dict:
+        """
+        디코딩된 224x224 RGB uint8 이미지를 큐에 넣고 배치 추론 결과를 기다림
+        (정규화는 배치 실행 시 추론 스레드의 재사용 버퍼에 바로 기록)
+        반환: EfficientNetEngine.infer의 결과 1건 (cam_heatmap 없이 bbox만 계산)
+        """
+        if self._queue is None:
+            raise RuntimeError("InferenceBatcher가 시작되지 않았거나 종료되었습니다.")
 
-        y_min = max(0, y_min - pad_y)
-        y_max = min(223, y_max + pad_y)
-        x_min = max(0, x_min - pad_x)
-        x_max = min(223, x_max + pad_x)
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((image_rgb, generate_cam, future))
+        self.total_requests += 1
+        return await future
 
-        return [x_min, y_min, x_max, y_max]
+    async def predict_with_cam(self, image: ImageContext, generate_cam: CamRequest = True) -> dict:
+        """
+        EfficientNetEngine.predict_with_cam의 배치 버전 (반환 형식 동일, cam_heatmap은 None)
+        image: 1회 디코딩된 224x224 배열을 CAM 렌더링과 공유하는 ImageContext
+        """
+        image_rgb = await self._offload(image.decode)
+        with image.stage("inference"):
+            return await self.submit(image_rgb, generate_cam)
+
+    async def _offload(self, func, *args):
+        """CPU 작업을 executor로 넘김 (executor 미지정 시 기본 스레드 풀)"""
+        if self.executor is not None:
+            return await self.executor.run(func, *args)
+        return await asyncio.to_thread(func, *args)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        batch = []
+        try:
+            while True:
+                # 첫 요청이 올 때까지 대기
+                batch = [await queue.get()]
+                deadline = loop.time() + self.max_wait
+
+                # 배치가 차거나 대기 시간이 끝날 때까지 추가 요청 수집
+                while len(batch) < self.max_batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+
+                await self._execute(batch)
+                batch = []
+        except asyncio.CancelledError:
+            # 큐에서 꺼냈지만 결과를 받지 못한 요청도 대기 상태로 남기지 않음
+            for *_, future in batch:
+                self._fail(future)
+            raise
+
+    async def _execute(self, batch: list):
+        # 클라이언트 연결 종료 등으로 이미 취소된 요청은 제외
+        batch = [item for item in batch if not item[-1].done()]
+        if not batch:
+            return
+
+        images = [image_rgb for image_rgb, _, _ in batch]
+        generate_cam = [flag for _, flag, _ in batch]
+        start_time = time.perf_counter()
+        try:
+            results = await self._offload(self._infer_batch, images, generate_cam)
+        except Exception as e:
+            logger.error(f"배치 추론 실패 (batch_size={len(batch)}): {e}")
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.last_batch_latency_ms = (time.perf_counter() - start_time) * 1000
+        self.total_batches += 1
+        self.batch_size_histogram[len(batch)] += 1
+
+        for (_, flag, future), result in zip(batch, results):
+            if result["bbox"] is not None:
+                self.total_cams_computed += 1
+            elif callable(flag):
+                self.total_cams_skipped += 1
+            if not future.done():
+                future.set_result(result)
+
+    def _infer_batch(self, images: list[np.ndarray], generate_cam: list[CamRequest]) -> list[dict]:
+        """(executor 스레드) 정규화 + 배치 추론 + 배치 CAM 후처리"""
+        if not any(generate_cam):
+            self.total_logits_only_batches += 1
+        return self.engine.infer(images, generate_cam)
+
+    def stats(self) -> dict:
+        """큐 대기 수 및 배치 크기 통계"""
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "total_requests": self.total_requests,
+            "total_batches": self.total_batches,
+            "avg_batch_size": round(self.total_requests / self.total_batches, 2) if self.total_batches else 0.0,
+            "batch_size_histogram": dict(sorted(self.batch_size_histogram.items())),
+            "last_batch_latency_ms": round(self.last_batch_latency_ms, 2),
+            "logits_only_batches": self.total_logits_only_batches,
+            "cams_computed": self.total_cams_computed,
+            "cams_skipped": self.total_cams_skipped,
+        }
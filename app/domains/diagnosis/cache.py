@@ -0,0 +1,76 @@
+# BACK-END/app/domains/diagnosis/cache.py
+
+import logging
+
+from app.core.config import settings
+from app.utils.cache import TTLCache
+from app.utils.image_context import ImageContext
+
+logger = logging.getLogger(__name__)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class DiagnosisResultCache:
+    """
+    같은 사진 재업로드 시 추론/RAG/S3 업로드를 건너뛰기 위한 진단 결과 캐시
+    - 1차: 원본 bytes SHA-256 완전 일치 (디코딩 불필요)
+    - 2차(옵션): 64bit dHash 해밍 거리 (재인코딩/리사이즈된 같은 사진)
+    - 키에 user_id와 model_version을 포함 → 다른 사용자의 이미지 URL이 노출되지 않고,
+      모델 교체 시 이전 모델의 결과는 재사용하지 않음
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 86400.0,
+                 use_perceptual_hash: bool = True, phash_max_distance: int = 4):
+        self._cache = TTLCache(max_size=max_size, ttl_seconds=ttl_seconds)
+        self.use_perceptual_hash = use_perceptual_hash
+        self.phash_max_distance = phash_max_distance
+        self.perceptual_hits = 0
+
+    def lookup_exact(self, user_id: int, image: ImageContext, model_version: str) -> dict | None:
+        """SHA-256 완전 일치 조회"""
+        return self._cache.get((user_id, model_version, image.sha256))
+
+    def lookup_perceptual(self, user_id: int, phash: int, model_version: str) -> dict | None:
+        """dHash 근사 일치 조회 (가장 가까운 항목 1개)"""
+        if not self.use_perceptual_hash:
+            return None
+
+        best_key, best_distance = None, self.phash_max_distance + 1
+        for key, outcome in self._cache.items():
+            cached_user_id, cached_version, _ = key
+            if cached_user_id != user_id or cached_version != model_version or outcome["phash"] is None:
+                continue
+            distance = hamming_distance(outcome["phash"], phash)
+            if distance < best_distance:
+                best_key, best_distance = key, distance
+
+        if best_key is None:
+            return None
+
+        self.perceptual_hits += 1
+        logger.info(f"♻️ 진단 캐시 근사 일치 (user={user_id}, hamming={best_distance})")
+        return self._cache.get(best_key)
+
+    def store(self, user_id: int, image: ImageContext, model_version: str, outcome: dict, phash: int | None = None):
+        """
+        진단 결과 저장
+        outcome: result / confidence / image_path / gradcam_image_path / bbox_coordinates / model_solution
+        """
+        self._cache.set(
+            (user_id, model_version, image.sha256),
+            {**outcome, "model_version": model_version, "phash": phash},
+        )
+
+    def stats(self) -> dict:
+        return {**self._cache.stats(), "perceptual_hits": self.perceptual_hits}
+
+
+diagnosis_cache = DiagnosisResultCache(
+    max_size=settings.DIAGNOSIS_CACHE_MAX_SIZE,
+    ttl_seconds=settings.DIAGNOSIS_CACHE_TTL_SECONDS,
+    use_perceptual_hash=settings.DIAGNOSIS_CACHE_PERCEPTUAL_HASH,
+    phash_max_distance=settings.DIAGNOSIS_CACHE_PHASH_MAX_DISTANCE,
+)
@@ -0,0 +1,123 @@
+# BACK-END/app/domains/diagnosis/classifier_weights.py
+# CAM 계산용 classifier FC weight sidecar (.npy + 체크섬 JSON)
+# - convert_to_onnx.py가 ONNX 파일 옆에 <모델>.classifier.npy / <모델>.classifier.json을 생성
+# - 서버 시작 시 onnx.load(모델 전체 파싱) 대신 sidecar를 memory-map으로 읽음
+# - JSON에 ONNX 파일 / npy 파일의 SHA-256을 기록 → 모델을 교체했는데 sidecar가 예전 것이면 사용하지 않음
+# (numpy / 표준 라이브러리만 사용: 변환 스크립트와 서버가 함께 import)
+
+import hashlib
+import json
+import logging
+import os
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SIDECAR_FORMAT_VERSION = 1
+
+
+def sidecar_paths(onnx_path: str) -> tuple[str, str]:
+    """ONNX 경로 → (weight .npy 경로, 체크섬 .json 경로)"""
+    base, _ = os.path.splitext(onnx_path)
+    return f"{base}.classifier.npy", f"{base}.classifier.json"
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """파일 SHA-256 (청크 단위로 읽어 메모리 사용 최소화)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def extract_from_onnx(onnx_path: str) -> tuple[str, np.ndarray]:
+    """ONNX initializer에서 classifier FC weight 추출 → (initializer 이름, NUM_CLASSES × 1280 배열)"""
+    import onnx
+    import onnx.numpy_helper
+
+    model = onnx.load(onnx_path)
+    for initializer in model.graph.initializer:
+        if "classifier" in initializer.name and "weight" in initializer.name:
+            return initializer.name, onnx.numpy_helper.to_array(initializer)
+
+    raise ValueError("Classifier FC weight not found in ONNX model")
+
+
+def write_sidecar(onnx_path: str, weights: np.ndarray, initializer_name: str) -> str:
+    """weight .npy + 체크섬 .json 저장 (임시 파일에 쓴 뒤 교체), 반환: .npy 경로"""
+    npy_path, meta_path = sidecar_paths(onnx_path)
+    weights = np.ascontiguousarray(weights, dtype=np.float32)
+
+    tmp_npy = npy_path + ".tmp"
+    with open(tmp_npy, "wb") as f:
+        np.save(f, weights)
+    os.replace(tmp_npy, npy_path)
+
+    meta = {
+        "format_version": SIDECAR_FORMAT_VERSION,
+        "initializer": initializer_name,
+        "shape": list(weights.shape),
+        "dtype": str(weights.dtype),
+        "onnx_sha256": file_sha256(onnx_path),
+        "npy_sha256": file_sha256(npy_path),
+    }
+    tmp_meta = meta_path + ".tmp"
+    with open(tmp_meta, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_meta, meta_path)
+    return npy_path
+
+
+def load_sidecar(onnx_path: str) -> np.ndarray | None:
+    """
+    체크섬이 맞는 sidecar를 read-only memory-map으로 로드
+    반환: (NUM_CLASSES, 1280) float32 배열, sidecar가 없거나 ONNX와 맞지 않으면 None
+    """
+    npy_path, meta_path = sidecar_paths(onnx_path)
+    if not (os.path.exists(npy_path) and os.path.exists(meta_path)):
+        return None
+
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format_version") != SIDECAR_FORMAT_VERSION:
+            logger.warning(f"⚠️ classifier sidecar 형식 버전 불일치 → 무시: {meta_path}")
+            return None
+        if meta.get("onnx_sha256") != file_sha256(onnx_path):
+            logger.warning(f"⚠️ classifier sidecar가 현재 ONNX 파일과 다름 (모델 교체 후 미갱신) → 무시: {npy_path}")
+            return None
+        if meta.get("npy_sha256") != file_sha256(npy_path):
+            logger.warning(f"⚠️ classifier sidecar 체크섬 불일치 (파일 손상) → 무시: {npy_path}")
+            return None
+
+        weights = np.load(npy_path, mmap_mode="r")
+        if list(weights.shape) != meta.get("shape") or weights.dtype != np.float32:
+            logger.warning(f"⚠️ classifier sidecar shape/dtype 불일치 → 무시: {npy_path}")
+            return None
+        return weights
+    except Exception as e:
+        logger.warning(f"⚠️ classifier sidecar 로드 실패 → ONNX에서 추출: {e}")
+        return None
+
+
+def load_classifier_weights(onnx_path: str, use_sidecar: bool = True) -> np.ndarray:
+    """
+    CAM 계산용 classifier weight 로드
+    - sidecar가 유효하면 memory-map (onnx 패키지 import / 모델 전체 파싱 없음)
+    - 없거나 맞지 않으면 onnx.load로 추출한 뒤 sidecar를 다시 써서 다음 기동부터 빠르게 로드
+    """
+    if use_sidecar:
+        weights = load_sidecar(onnx_path)
+        if weights is not None:
+            return weights
+
+    initializer_name, weights = extract_from_onnx(onnx_path)
+    if use_sidecar:
+        try:
+            write_sidecar(onnx_path, weights, initializer_name)
+            logger.info(f"💾 classifier sidecar 생성: {sidecar_paths(onnx_path)[0]}")
+        except OSError as e:
+            logger.warning(f"⚠️ classifier sidecar 저장 실패 (읽기 전용 경로?): {e}")
+    return weights
@@ -0,0 +1,72 @@
+# BACK-END/app/domains/diagnosis/executor.py
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceOverloadedError(RuntimeError):
+    """추론 대기열이 가득 차서 요청을 받을 수 없을 때 (→ 503 + Retry-After)"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("진단 요청이 많아 잠시 후 다시 시도해주세요.")
+        self.retry_after = retry_after
+
+
+class InferenceExecutor:
+    """
+    이미지 디코딩 / ONNX 추론 / CAM 계산 전용 bounded thread pool
+    - 이벤트 루프를 막지 않도록 CPU 작업을 별도 스레드에서 실행 (ORT는 추론 중 GIL 해제)
+    - 동시에 처리 중인 진단 요청 수를 max_pending으로 제한 (backpressure)
+      → 초과 시 InferenceOverloadedError를 발생시켜 지연이 무한히 늘어나는 것을 방지
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 16, retry_after_seconds: int = 2):
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(1, max_pending)
+        self.retry_after_seconds = retry_after_seconds
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+
+        # 운영 통계
+        self._pending = 0
+        self.total_admitted = 0
+        self.total_rejected = 0
+
+    @asynccontextmanager
+    async def admit(self):
+        """
+        진단 요청 1건의 처리 구간을 감싸는 입장 제어
+        - 처리 중인 요청이 max_pending 이상이면 즉시 거절
+        """
+        if self._pending >= self.max_pending:
+            self.total_rejected += 1
+            logger.warning(f"추론 대기열 포화 (pending={self._pending}/{self.max_pending}) → 요청 거절")
+            raise InferenceOverloadedError(self.retry_after_seconds)
+
+        self._pending += 1
+        self.total_admitted += 1
+        try:
+            yield
+        finally:
+            self._pending -= 1
+
+    async def run(self, func, *args):
+        """동기 함수를 추론 전용 스레드 풀에서 실행하고 결과를 기다림"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, func, *args)
+
+    def shutdown(self):
+        """스레드 풀 종료 (lifespan shutdown에서 호출)"""
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "total_admitted": self.total_admitted,
+            "total_rejected": self.total_rejected,
+        }
@@ -0,0 +1,186 @@
+# BACK-END/app/domains/diagnosis/jobs.py
+
+import asyncio
+import logging
+import time
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.domains.diagnosis.executor import InferenceOverloadedError
+from app.domains.diagnosis.repository import DiagnosisJobRepository
+from app.domains.diagnosis.service import DiagnosisService
+from app.utils.image_context import ImageContext
+
+logger = logging.getLogger(__name__)
+
+
+class DiagnosisJobWorker:
+    """
+    비동기 진단 작업 워커 풀 (diagnosis_jobs 테이블을 큐로 사용)
+    - 서버 프로세스 안에서 asyncio 워커 concurrency개가 queued 작업을 하나씩 가져가 처리
+    - 작업 등록 시 notify()로 즉시 깨우고, 그 외에는 poll_interval마다 DB 확인
+      (다른 서버 프로세스가 등록한 작업 / 재시도 대기가 끝난 작업도 처리)
+    - 추론 대기열 포화 시 시도 횟수를 늘리지 않고 잠시 후 재시도,
+      그 외 실패는 max_attempts회까지 재시도 후 failed 처리
+    - 종료 시 처리 중이던 작업은 바로 queued로 되돌리고, 다른 프로세스가 비정상 종료하며 남긴 작업은
+      recover_interval마다 stale 복구로 다시 처리
+    """
+
+    def __init__(self, concurrency: int = 2, poll_interval: float = 2.0, max_attempts: int = 3,
+                 retry_delay_seconds: float = 10.0, stale_seconds: float = 600.0,
+                 recover_interval: float = 60.0):
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.max_attempts = max(1, max_attempts)
+        self.retry_delay_seconds = retry_delay_seconds
+        self.stale_seconds = stale_seconds
+        self.recover_interval = recover_interval
+        self._wakeup = asyncio.Event()
+        self._workers: list[asyncio.Task] = []
+        self._busy = 0
+        self._interrupted: list[str] = []  # 종료(취소)로 처리가 중단된 작업 ID
+        self._last_recovery = 0.0
+
+        # 운영 통계
+        self.total_done = 0
+        self.total_failed = 0
+        self.total_retried = 0
+        self.total_recovered = 0
+        self._processing_seconds_total = 0.0
+
+    async def start(self):
+        if self._workers:
+            return
+        # 이전 실행에서 처리 도중 끊긴 작업 복구
+        await self._recover_stale_jobs()
+        self._workers = [asyncio.create_task(self._run(i)) for i in range(self.concurrency)]
+
+    async def stop(self):
+        """워커 종료 (처리 중이던 작업은 시도 횟수를 늘리지 않고 바로 queued로 되돌림)"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        interrupted, self._interrupted = self._interrupted, []
+        if not interrupted:
+            return
+        try:
+            async with AsyncSessionLocal() as db:
+                released = await DiagnosisJobRepository(db).release_jobs(interrupted)
+            logger.info(f"♻️ 처리 중이던 진단 작업 {released}건을 다시 대기열에 넣었습니다.")
+        except Exception as e:
+            # 되돌리지 못한 작업은 stale 복구 대상으로 남음
+            logger.error(f"중단된 진단 작업 복구 실패: {e}")
+
+    async def _recover_stale_jobs(self):
+        """processing으로 stale_seconds 넘게 남은 작업(다른 프로세스 비정상 종료 등)을 다시 queued로"""
+        self._last_recovery = time.monotonic()
+        try:
+            async with AsyncSessionLocal() as db:
+                recovered = await DiagnosisJobRepository(db).requeue_stale_jobs(self.stale_seconds)
+        except Exception as e:
+            logger.error(f"stale 진단 작업 복구 실패: {e}")
+            return
+        if recovered:
+            self.total_recovered += recovered
+            logger.warning(f"♻️ 처리 중 중단된 진단 작업 {recovered}건을 다시 대기열에 넣었습니다.")
+            self.notify()
+
+    def notify(self):
+        """새 작업 등록 알림 (대기 중인 워커를 즉시 깨움)"""
+        self._wakeup.set()
+
+    async def _run(self, worker_index: int):
+        while True:
+            # 워커 1개만 주기적으로 stale 복구 실행
+            if worker_index == 0 and time.monotonic() - self._last_recovery >= self.recover_interval:
+                await self._recover_stale_jobs()
+
+            try:
+                async with AsyncSessionLocal() as db:
+                    job = await DiagnosisJobRepository(db).claim_next_job()
+            except Exception as e:
+                logger.error(f"진단 작업 조회 실패 (worker={worker_index}): {e}")
+                job = None
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self._busy += 1
+            try:
+                await self._process(job)
+            except asyncio.CancelledError:
+                self._interrupted.append(job.id)
+                raise
+            except Exception as e:
+                # 어떤 오류가 나도 워커 루프는 계속 (처리 중 상태로 남은 작업은 stale 복구 대상)
+                logger.error(f"진단 작업 처리 중 예기치 못한 오류 (worker={worker_index}, job={job.id}): {e}",
+                             exc_info=True)
+            finally:
+                self._busy -= 1
+
+    async def _process(self, job):
+        start = time.perf_counter()
+        image = ImageContext(job.image_data, filename=job.filename, content_type=job.content_type,
+                             fast_decode=settings.IMAGE_FAST_DECODE)
+        try:
+            async with AsyncSessionLocal() as db:
+                # 이전 시도에서 진단 기록은 저장됐지만 완료 처리 전에 중단된 작업이면 다시 진단하지 않음
+                diagnosis_id = job.diagnosis_id
+                if diagnosis_id is None:
+                    diagnosis = await DiagnosisService(db).diagnose_context(image, job.mold_location, job.user_id,
+                                                                            job_id=job.id)
+                    diagnosis_id = diagnosis.id
+                await DiagnosisJobRepository(db).mark_done(job.id, diagnosis_id)
+            self.total_done += 1
+            self._processing_seconds_total += time.perf_counter() - start
+            logger.info(f"✅ 진단 작업 완료 (job={job.id}, diagnosis={diagnosis_id}, "
+                        f"{(time.perf_counter() - start) * 1000:.0f}ms)")
+
+        except InferenceOverloadedError as e:
+            # 추론 대기열 포화: 실패로 보지 않고 잠시 뒤 다시 처리
+            self.total_retried += 1
+            await self._requeue(job, e.retry_after, None, count_attempt=False)
+
+        except Exception as e:
+            logger.error(f"진단 작업 실패 (job={job.id}, 시도 {job.attempts}/{self.max_attempts}): {e}",
+                         exc_info=True)
+            if job.attempts >= self.max_attempts:
+                self.total_failed += 1
+                await self._mark_failed(job, str(e))
+            else:
+                self.total_retried += 1
+                await self._requeue(job, self.retry_delay_seconds * job.attempts, str(e))
+
+    async def _requeue(self, job, delay_seconds: float, error: str | None, count_attempt: bool = True):
+        """재시도 대기열로 되돌림 (DB 오류 시 로그만 남김 → processing으로 남은 작업은 stale 복구로 재처리)"""
+        try:
+            async with AsyncSessionLocal() as db:
+                await DiagnosisJobRepository(db).requeue(job.id, delay_seconds, error, count_attempt=count_attempt)
+        except Exception as e:
+            logger.error(f"진단 작업 재시도 등록 실패 (job={job.id}): {e}")
+
+    async def _mark_failed(self, job, error: str):
+        try:
+            async with AsyncSessionLocal() as db:
+                await DiagnosisJobRepository(db).mark_failed(job.id, error)
+        except Exception as e:
+            logger.error(f"진단 작업 실패 처리 실패 (job={job.id}): {e}")
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "busy_workers": self._busy,
+            "total_done": self.total_done,
+            "total_failed": self.total_failed,
+            "total_retried": self.total_retried,
+            "total_recovered": self.total_recovered,
+            "avg_processing_ms": round(self._processing_seconds_total / self.total_done * 1000, 2)
+            if self.total_done else 0.0,
+        }
@@ -1,6 +1,6 @@
 # BACK-END/app/domains/diagnosis/models.py
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Enum
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Enum, LargeBinary
 from sqlalchemy.sql import func
 from app.core.database import Base
 from datetime import datetime
@@ -46,6 +46,64 @@ class Diagnosis(Base):
     model_solution = Column(Text, nullable=False)
 
 
+class DiagnosisJob(Base):
+    """
+    비동기 진단 작업 큐 (POST /api/diagnosis/jobs)
+    - 요청 시 업로드 이미지를 그대로 저장하고 작업 ID만 즉시 반환
+    - 백그라운드 워커가 queued 작업을 가져가 추론/업로드/RAG 처리 후 Diagnosis 행을 연결
+    - DB에 저장되므로 서버가 재시작돼도 작업이 사라지지 않음
+    """
+    __tablename__ = "diagnosis_jobs"
+
+    # 작업 ID (UUID 문자열, 클라이언트가 상태 조회에 사용)
+    id = Column(String(36), primary_key=True)
+
+    user_id = Column(Integer, nullable=False, index=True)
+
+    # 상태: queued → processing → done / failed
+    status = Column(String(20), nullable=False, default="queued", index=True)
+
+    # 진단 요청 정보 (처리가 끝나면 image_data는 비움)
+    mold_location = Column(String(30), nullable=False)
+    image_data = Column(LargeBinary(length=16 * 1024 * 1024), nullable=True)  # MySQL: MEDIUMBLOB
+    filename = Column(String(255), nullable=True)
+    content_type = Column(String(100), nullable=True)
+
+    # 처리 결과
+    diagnosis_id = Column(Integer, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+
+    # 이 시각 이후에 처리 (재시도 대기용)
+    available_at = Column(DateTime(timezone=True), default=get_now_kst, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=get_now_kst, nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class DiagnosisUpload(Base):
+    """
+    S3 업로드 대기 항목 (write-behind 업로드의 영속 큐)
+    - 업로드할 항목(원본 / CAM / JSON sidecar)을 Diagnosis 행과 같은 트랜잭션으로 기록하고, 업로드에 성공하면 삭제
+    - 서버가 재시작되거나 재시도까지 실패해도 주기적으로 다시 업로드한 뒤 Diagnosis 행의 URL 갱신
+    """
+    __tablename__ = "diagnosis_uploads"
+
+    id = Column(Integer, primary_key=True)
+    diagnosis_id = Column(Integer, nullable=False, index=True)
+
+    # 업로드 URL을 저장할 Diagnosis 컬럼 ("image_path" / "gradcam_image_path" / None)
+    field = Column(String(30), nullable=True)
+    storage_key = Column(String(255), nullable=False)
+    body = Column(LargeBinary(length=16 * 1024 * 1024), nullable=False)  # MySQL: MEDIUMBLOB
+    content_type = Column(String(100), nullable=False)
+
+    # 재시도까지 실패한 횟수 (복구 주기마다 다시 업로드, 상한 초과 시 포기)
+    attempts = Column(Integer, nullable=False, default=0)
+
+    created_at = Column(DateTime(timezone=True), default=get_now_kst, nullable=False)
+
+
 class MoldRisk(Base):
     """
     [Source 4] 매일 01:00에 계산된 사용자별 곰팡이 위험도 히스토리
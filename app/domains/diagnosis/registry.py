@@ -0,0 +1,316 @@
+# BACK-END/app/domains/diagnosis/registry.py
+
+import asyncio
+import logging
+import os
+import random
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from app.core.metrics import LatencyTracker
+from app.domains.diagnosis.ai_engine import (
+    CamRequest, EfficientNetEngine, InferenceBatcher, MODEL_VARIANTS, resolve_model_path,
+)
+from app.domains.diagnosis.executor import InferenceExecutor, InferenceOverloadedError
+from app.utils.image_context import ImageContext
+
+logger = logging.getLogger(__name__)
+
+
+class LoadedModel:
+    """레지스트리에 로드된 모델 1개 (엔진 + 전용 배치 스케줄러 + 지연 시간 통계)"""
+
+    def __init__(self, variant: str, engine: EfficientNetEngine, batcher: InferenceBatcher):
+        self.variant = variant
+        self.engine = engine
+        self.batcher = batcher
+        self.latency = LatencyTracker()  # 요청 1건의 배치 대기 + 추론 + 후처리 시간
+        self.in_flight = 0  # 이 모델을 잡고 있는 요청 / shadow 비교 수 (ModelRegistry.acquire / observe)
+
+    @property
+    def model_version(self) -> str:
+        return self.engine.model_version
+
+    async def predict_with_cam(self, image: ImageContext, generate_cam: CamRequest = True) -> dict:
+        with self.latency.time():
+            return await self.batcher.predict_with_cam(image, generate_cam)
+
+    async def drain(self, timeout: float):
+        """처리 중인 요청이 끝날 때까지 대기 (언로드 전)"""
+        deadline = time.monotonic() + timeout
+        while self.in_flight and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+
+    def stats(self) -> dict:
+        return {
+            "model_version": self.model_version,
+            "in_flight": self.in_flight,
+            "latency": self.latency.snapshot(),
+            "batcher": self.batcher.stats(),
+        }
+
+
+class ModelRegistry:
+    """
+    진단 모델 레지스트리
+    - 여러 ONNX 변형(MODEL_VARIANTS)을 동시에 로드해두고 활성 모델을 서버 재시작 없이 교체
+      (DiagnosisService는 acquire()로 요청 시작 시점의 활성 모델을 잡고 끝까지 사용
+       → 교체 직후 이전 모델을 언로드해도 drain이 그 요청이 끝날 때까지 대기)
+    - shadow 모델: 활성 모델 결과가 나온 요청 중 sample_rate 비율만 골라 별도 스레드 풀에서 재추론,
+      분류 일치율 / 신뢰도 차이 / 지연 시간을 기록 (응답에는 영향 없음)
+    - shadow 스레드 풀이 가득 차면 비교를 건너뜀 → 부하가 높을 때도 본 추론을 밀어내지 않음
+    - 서버 시작 시(readiness 전)에는 본 추론 스레드 풀에서 p99가 안정될 때까지 워밍업
+    - 런타임에 로드한 모델은 활성 / shadow로 지정하기 전에 shadow 스레드 풀에서 고정 라운드만 워밍업
+      (본 추론 스레드 풀을 합성 배치로 점유하지 않음 → 교체 중에도 서비스 요청 지연 없음)
+    """
+
+    def __init__(self, executor: InferenceExecutor, shadow_executor: InferenceExecutor | None = None,
+                 intra_op_num_threads: int = 1, max_batch_size: int = 8, max_wait_ms: float = 10.0,
+                 io_binding: bool = True, warmup_min_rounds: int = 3, warmup_max_rounds: int = 20,
+                 warmup_tolerance: float = 0.2, runtime_warmup_rounds: int = 3):
+        self.executor = executor
+        self.shadow_executor = shadow_executor or InferenceExecutor(max_workers=1, max_pending=4)
+        self.intra_op_num_threads = intra_op_num_threads
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.io_binding = io_binding
+        self.warmup_min_rounds = warmup_min_rounds
+        self.warmup_max_rounds = warmup_max_rounds
+        self.warmup_tolerance = warmup_tolerance
+        self.runtime_warmup_rounds = max(1, runtime_warmup_rounds)
+
+        self.models: dict[str, LoadedModel] = {}
+        self.active: LoadedModel | None = None
+        self.shadow: LoadedModel | None = None
+        self.shadow_sample_rate = 0.0
+        self._lock = asyncio.Lock()  # 로드 / 교체 / 언로드 직렬화
+        self._shadow_tasks: set[asyncio.Task] = set()
+
+        # shadow 평가 통계 (shadow 모델이 바뀌면 초기화)
+        self._reset_shadow_stats()
+
+    def _reset_shadow_stats(self):
+        self.shadow_compared = 0
+        self.shadow_agreed = 0
+        self.shadow_skipped = 0
+        self.shadow_errors = 0
+        self._confidence_delta_total = 0.0
+        self.shadow_latency = LatencyTracker()
+
+    async def load(self, variant: str, warm: bool = True) -> LoadedModel:
+        """모델 변형 로드 (이미 로드되어 있으면 그대로 반환)"""
+        async with self._lock:
+            return await self._load(variant, warm)
+
+    async def _load(self, variant: str, warm: bool) -> LoadedModel:
+        if variant in self.models:
+            return self.models[variant]
+
+        weights_path = resolve_model_path(variant)  # 알 수 없는 변형이면 ValueError
+        if not os.path.exists(weights_path):
+            raise ValueError(f"모델 파일이 없습니다: {weights_path} (convert_to_onnx.py로 생성)")
+        start = time.perf_counter()
+        # ORT 세션 생성 / 그래프 최적화는 수 초 걸리므로 스레드에서 실행 (로드 중에도 기존 모델로 계속 서비스)
+        engine = await asyncio.to_thread(
+            EfficientNetEngine,
+            weights_path,
+            intra_op_num_threads=self.intra_op_num_threads,
+            model_version=MODEL_VARIANTS[variant]["version"],
+            buffer_batch_size=self.max_batch_size,
+            io_binding=self.io_binding,
+        )
+        batcher = InferenceBatcher(engine, executor=self.executor,
+                                   max_batch_size=self.max_batch_size, max_wait_ms=self.max_wait_ms)
+        await batcher.start()
+
+        model = LoadedModel(variant, engine, batcher)
+        logger.info(f"📦 모델 로드 완료: {variant} ({engine.model_version}, "
+                    f"{(time.perf_counter() - start) * 1000:.0f}ms)")
+        if warm:
+            # 런타임 로드: 서비스 중인 추론 스레드 풀 대신 shadow 스레드 풀에서 짧게 워밍업
+            await self.warm_up(model, executor=self.shadow_executor,
+                               min_rounds=self.runtime_warmup_rounds, max_rounds=self.runtime_warmup_rounds)
+        self.models[variant] = model
+        return model
+
+    async def warm_up(self, model: LoadedModel, executor: InferenceExecutor | None = None,
+                      min_rounds: int | None = None, max_rounds: int | None = None) -> dict:
+        """
+        합성 이미지 배치로 p99가 안정될 때까지 반복 추론 (ORT 그래프 최적화 / 스레드 풀 / 첫 할당 비용 선지불)
+        - 라운드마다 추론 스레드 수 x 4회를 동시에 실행 → 모든 추론 스레드의 재사용 버퍼 / ORT 스레드 준비
+        - 직전 라운드 대비 p99 변화가 warmup_tolerance 이내이고 min_rounds 이상이면 종료
+        - 배치 스케줄러 / 요청 통계를 거치지 않고 executor(기본: 본 추론 스레드 풀)에서 엔진을 직접 호출
+          → 본 추론 스레드 풀 사용은 서비스 전(서버 시작 시)에만
+        """
+        executor = executor or self.executor
+        min_rounds = self.warmup_min_rounds if min_rounds is None else min_rounds
+        max_rounds = self.warmup_max_rounds if max_rounds is None else max_rounds
+        start = time.perf_counter()
+        rng = np.random.default_rng(0)
+        max_batch = model.batcher.max_batch_size
+        images = [rng.integers(0, 256, (224, 224, 3), dtype=np.uint8) for _ in range(max_batch)]
+        calls_per_round = executor.max_workers * 4
+
+        async def timed_infer(batch: list[np.ndarray], tracker: LatencyTracker):
+            call_start = time.perf_counter()
+            await executor.run(model.engine.infer, batch, [True] * len(batch))
+            tracker.observe(time.perf_counter() - call_start)
+
+        # 단건 추론 shape도 미리 준비 (부하가 낮을 때는 배치 크기 1이 대부분)
+        await asyncio.gather(*(timed_infer(images[:1], LatencyTracker()) for _ in range(executor.max_workers)))
+
+        previous_p99, p99, stable, rounds = None, 0.0, False, 0
+        for rounds in range(1, max_rounds + 1):
+            tracker = LatencyTracker()
+            await asyncio.gather(*(timed_infer(images, tracker) for _ in range(calls_per_round)))
+            p99 = tracker.percentile(99)
+            stable = previous_p99 is not None and abs(p99 - previous_p99) <= self.warmup_tolerance * previous_p99
+            if stable and rounds >= min_rounds:
+                break
+            previous_p99 = p99
+
+        summary = {
+            "rounds": rounds,
+            "stable": stable,
+            "batch_p99_ms": round(p99 * 1000, 2),
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+        log = logger.info if stable else logger.warning
+        log(f"🔥 모델 워밍업 {'완료' if stable else '종료 (p99 미안정)'}: {model.variant} "
+            f"(라운드 {rounds}, 배치 {max_batch}장 p99 {summary['batch_p99_ms']}ms, {summary['elapsed_ms']}ms)")
+        return summary
+
+    async def warm_up_all(self) -> dict:
+        """로드된 모든 모델 워밍업 (서버 시작 시 readiness 단계, 모델별로 순차 실행)"""
+        return {variant: await self.warm_up(model) for variant, model in list(self.models.items())}
+
+    async def activate(self, variant: str, warm: bool = True) -> LoadedModel:
+        """활성 모델 교체 (필요 시 로드, 이전 모델은 즉시 롤백할 수 있도록 로드 상태 유지)"""
+        async with self._lock:
+            model = await self._load(variant, warm)
+            previous, self.active = self.active, model
+        if previous is not model:
+            logger.info(f"🔁 활성 모델 교체: {previous.variant if previous else None} → {variant}")
+        return model
+
+    async def set_shadow(self, variant: str | None, sample_rate: float = 0.1,
+                         warm: bool = True) -> LoadedModel | None:
+        """shadow 모델 지정 (variant=None이면 shadow 평가 중지)"""
+        if variant is None:
+            self.shadow, self.shadow_sample_rate = None, 0.0
+            logger.info("🌓 shadow 평가 중지")
+            return None
+
+        async with self._lock:
+            model = await self._load(variant, warm)
+            if model is not self.shadow:
+                self._reset_shadow_stats()
+            self.shadow = model
+            self.shadow_sample_rate = min(1.0, max(0.0, sample_rate))
+        logger.info(f"🌓 shadow 평가 시작: {variant} (sample_rate={self.shadow_sample_rate})")
+        return model
+
+    @contextmanager
+    def acquire(self):
+        """
+        활성 모델 스냅샷 + 참조 카운트 (with 블록이 끝날 때 해제)
+        - 스냅샷과 카운트 증가 사이에 await가 없으므로 교체 / 언로드와 경합하지 않음
+          → unload()의 drain이 배치 스케줄러에 도착하기 전(캐시 조회 / 디코딩 중)인 요청도 기다림
+        """
+        model = self.active
+        model.in_flight += 1
+        try:
+            yield model
+        finally:
+            model.in_flight -= 1
+
+    async def unload(self, variant: str, drain_timeout: float = 30.0):
+        """활성 / shadow가 아닌 모델 언로드 (처리 중인 요청이 끝난 뒤 배치 스케줄러 종료)"""
+        async with self._lock:
+            model = self.models.get(variant)
+            if model is None:
+                raise ValueError(f"로드되지 않은 모델입니다: {variant}")
+            if model is self.active or model is self.shadow:
+                raise ValueError(f"활성 / shadow 모델은 언로드할 수 없습니다: {variant}")
+            del self.models[variant]
+
+        await model.drain(drain_timeout)
+        await model.batcher.stop()
+        logger.info(f"📤 모델 언로드: {variant}")
+
+    def observe(self, model: LoadedModel, image: ImageContext, prediction: dict):
+        """
+        활성 모델 추론 직후 호출: 샘플링된 요청만 shadow 모델로 백그라운드 비교 (즉시 반환)
+        image.rgb는 활성 모델 추론에서 이미 디코딩된 224x224 배열을 그대로 사용
+        """
+        shadow = self.shadow
+        if shadow is None or shadow is model or image.rgb is None:
+            return
+        if random.random() >= self.shadow_sample_rate:
+            return
+        if self.shadow_executor.stats()["pending"] >= self.shadow_executor.max_pending:
+            self.shadow_skipped += 1  # shadow 스레드 풀 포화 → 비교 생략
+            return
+
+        shadow.in_flight += 1  # 비교가 끝날 때까지 언로드 drain 대상 (_compare에서 해제)
+        task = asyncio.create_task(self._compare(shadow, image.rgb, prediction, model.variant))
+        self._shadow_tasks.add(task)
+        task.add_done_callback(self._shadow_tasks.discard)
+
+    async def _compare(self, shadow: LoadedModel, image_rgb: np.ndarray, prediction: dict, primary_variant: str):
+        start = time.perf_counter()
+        try:
+            async with self.shadow_executor.admit():
+                result = (await self.shadow_executor.run(shadow.engine.infer, [image_rgb], [False]))[0]
+        except InferenceOverloadedError:
+            self.shadow_skipped += 1
+            return
+        except Exception as e:
+            self.shadow_errors += 1
+            logger.warning(f"shadow 추론 실패 ({shadow.variant}): {e}")
+            return
+        finally:
+            shadow.in_flight -= 1
+
+        elapsed = time.perf_counter() - start
+        self.shadow_latency.observe(elapsed)
+        agreed = result["class_name"] == prediction["class_name"]
+        delta = result["confidence"] - prediction["confidence"]
+        self.shadow_compared += 1
+        self.shadow_agreed += int(agreed)
+        self._confidence_delta_total += abs(delta)
+
+        logger.info(
+            f"🌓 SHADOW | {primary_variant}={prediction['class_name']}({prediction['confidence']}%) "
+            f"vs {shadow.variant}={result['class_name']}({result['confidence']}%) | "
+            f"agree={agreed} | Δconf={delta:+.1f} | {elapsed * 1000:.0f}ms"
+        )
+
+    async def close(self):
+        """shadow 비교 작업 취소 + 모든 배치 스케줄러 / shadow 스레드 풀 종료 (lifespan shutdown)"""
+        for task in list(self._shadow_tasks):
+            task.cancel()
+        await asyncio.gather(*self._shadow_tasks, return_exceptions=True)
+        for model in self.models.values():
+            await model.batcher.stop()
+        self.shadow_executor.shutdown()
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active.variant if self.active else None,
+            "shadow": self.shadow.variant if self.shadow else None,
+            "shadow_sample_rate": self.shadow_sample_rate,
+            "models": {variant: model.stats() for variant, model in self.models.items()},
+            "shadow_eval": {
+                "compared": self.shadow_compared,
+                "agreement_rate": round(self.shadow_agreed / self.shadow_compared, 4) if self.shadow_compared else None,
+                "avg_abs_confidence_delta": round(self._confidence_delta_total / self.shadow_compared, 2)
+                if self.shadow_compared else None,
+                "skipped": self.shadow_skipped,
+                "errors": self.shadow_errors,
+                "latency": self.shadow_latency.snapshot(),
+                "executor": self.shadow_executor.stats(),
+            },
+        }
@@ -1,15 +1,24 @@
 # BACK-END/app/domains/diagnosis/repository.py
 
+from datetime import timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.domains.diagnosis.models import Diagnosis
-from sqlalchemy import select, delete
+from app.domains.diagnosis.models import Diagnosis, DiagnosisJob, DiagnosisUpload, get_now_kst
+from sqlalchemy import select, delete, update
+from sqlalchemy.orm import defer
 
 class DiagnosisRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def create_diagnosis(self, diagnosis_data: dict) -> Diagnosis:
-        """진단 결과를 DB에 저장합니다."""
+    async def create_diagnosis(self, diagnosis_data: dict, job_id: str | None = None,
+                               uploads: list[dict] | None = None) -> Diagnosis:
+        """
+        진단 결과를 DB에 저장합니다.
+        - job_id가 있으면 같은 트랜잭션에서 비동기 진단 작업에 진단 ID를 연결
+          (완료 처리 전에 실패해 재시도해도 진단 기록이 중복 저장되지 않음)
+        - uploads가 있으면 같은 트랜잭션에서 S3 업로드 대기 항목 기록
+          (예정 URL이 저장된 진단 기록은 반드시 업로드 대기 항목을 가짐)
+        """
         new_diagnosis = Diagnosis(
             user_id=diagnosis_data['user_id'],
             result=diagnosis_data['result'],
@@ -22,10 +31,40 @@ class DiagnosisRepository:
         )
         
         self.db.add(new_diagnosis)
+        if job_id is not None or uploads:
+            await self.db.flush()  # 진단 ID 확보
+        if job_id is not None:
+            await self.db.execute(
+                update(DiagnosisJob).where(DiagnosisJob.id == job_id).values(diagnosis_id=new_diagnosis.id)
+            )
+        for upload in uploads or []:
+            self.db.add(DiagnosisUpload(
+                diagnosis_id=new_diagnosis.id,
+                field=upload["field"],
+                storage_key=upload["key"],
+                body=upload["body"],
+                content_type=upload["content_type"],
+            ))
         await self.db.commit()
         await self.db.refresh(new_diagnosis)
         
         return new_diagnosis
+
+    async def get_diagnosis_by_id(self, diagnosis_id: int) -> Diagnosis | None:
+        return await self.db.get(Diagnosis, diagnosis_id)
+
+    async def update_storage_paths(self, diagnosis_id: int, paths: dict[str, str | None]):
+        """
+        S3 업로드 결과 반영 (write-behind 업로드용)
+        paths: {"image_path" / "gradcam_image_path": 최종 URL 또는 업로드 실패 표시} → 포함된 컬럼만 갱신
+        """
+        stmt = (
+            update(Diagnosis)
+            .where(Diagnosis.id == diagnosis_id)
+            .values(**paths)
+        )
+        await self.db.execute(stmt)
+        await self.db.commit()
     
     async def get_diagnosis_by_user_id(self, db, user_id: int) -> list[Diagnosis]:
         query = select(Diagnosis).where(Diagnosis.user_id == user_id).order_by(Diagnosis.created_at.desc())
@@ -38,4 +77,161 @@ class DiagnosisRepository:
         stmt = delete(Diagnosis).where(Diagnosis.id == id)
         await db.execute(stmt)
         await db.commit()
-        return True
\ No newline at end of file
+        return True
+
+class DiagnosisJobRepository:
+    """비동기 진단 작업 큐 (diagnosis_jobs 테이블) 접근"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_job(self, job_data: dict) -> DiagnosisJob:
+        new_job = DiagnosisJob(
+            id=job_data['id'],
+            user_id=job_data['user_id'],
+            status="queued",
+            mold_location=job_data['mold_location'],
+            image_data=job_data['image_data'],
+            filename=job_data.get('filename'),
+            content_type=job_data.get('content_type'),
+            attempts=0,
+        )
+        self.db.add(new_job)
+        await self.db.commit()
+        return new_job
+
+    async def get_job(self, job_id: str, user_id: int) -> DiagnosisJob | None:
+        """본인 작업만 조회"""
+        query = (
+            select(DiagnosisJob)
+            .options(defer(DiagnosisJob.image_data))  # 상태 조회에는 이미지 불필요
+            .where(DiagnosisJob.id == job_id, DiagnosisJob.user_id == user_id)
+        )
+        result = await self.db.execute(query)
+        return result.scalar_one_or_none()
+
+    async def claim_next_job(self) -> DiagnosisJob | None:
+        """
+        처리할 작업 1개를 가져와 processing으로 표시
+        FOR UPDATE SKIP LOCKED → 여러 워커(프로세스)가 같은 작업을 동시에 가져가지 않음
+        """
+        query = (
+            select(DiagnosisJob)
+            .where(DiagnosisJob.status == "queued", DiagnosisJob.available_at <= get_now_kst())
+            .order_by(DiagnosisJob.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        job = (await self.db.execute(query)).scalar_one_or_none()
+        if job is None:
+            await self.db.rollback()
+            return None
+
+        job.status = "processing"
+        job.attempts += 1
+        job.started_at = get_now_kst()
+        await self.db.commit()
+        return job
+
+    async def mark_done(self, job_id: str, diagnosis_id: int):
+        stmt = (
+            update(DiagnosisJob)
+            .where(DiagnosisJob.id == job_id)
+            .values(status="done", diagnosis_id=diagnosis_id, image_data=None, error=None,
+                    finished_at=get_now_kst())
+        )
+        await self.db.execute(stmt)
+        await self.db.commit()
+
+    async def mark_failed(self, job_id: str, error: str):
+        stmt = (
+            update(DiagnosisJob)
+            .where(DiagnosisJob.id == job_id)
+            .values(status="failed", image_data=None, error=error, finished_at=get_now_kst())
+        )
+        await self.db.execute(stmt)
+        await self.db.commit()
+
+    async def requeue(self, job_id: str, delay_seconds: float, error: str | None = None,
+                      count_attempt: bool = True):
+        """재시도 대기열로 되돌림 (count_attempt=False면 시도 횟수에서 제외, 예: 추론 대기열 포화)"""
+        values = {
+            "status": "queued",
+            "error": error,
+            "available_at": get_now_kst() + timedelta(seconds=delay_seconds),
+        }
+        if not count_attempt:
+            values["attempts"] = DiagnosisJob.attempts - 1
+        stmt = update(DiagnosisJob).where(DiagnosisJob.id == job_id).values(**values)
+        await self.db.execute(stmt)
+        await self.db.commit()
+
+    async def release_jobs(self, job_ids: list[str]) -> int:
+        """
+        처리 도중 중단한 작업(서버 종료 등)을 즉시 queued로 되돌림 (시도 횟수에서 제외)
+        - 그 사이 완료/실패 처리된 작업은 건드리지 않도록 processing 상태만 대상
+        """
+        if not job_ids:
+            return 0
+        stmt = (
+            update(DiagnosisJob)
+            .where(DiagnosisJob.id.in_(job_ids), DiagnosisJob.status == "processing")
+            .values(status="queued", available_at=get_now_kst(), attempts=DiagnosisJob.attempts - 1)
+        )
+        result = await self.db.execute(stmt)
+        await self.db.commit()
+        return result.rowcount or 0
+
+    async def requeue_stale_jobs(self, stale_seconds: float) -> int:
+        """processing 상태로 오래 남은 작업(처리 중 서버 종료 등)을 다시 queued로"""
+        stmt = (
+            update(DiagnosisJob)
+            .where(DiagnosisJob.status == "processing",
+                   DiagnosisJob.started_at < get_now_kst() - timedelta(seconds=stale_seconds))
+            .values(status="queued", available_at=get_now_kst())
+        )
+        result = await self.db.execute(stmt)
+        await self.db.commit()
+        return result.rowcount or 0
+
+
+class DiagnosisUploadRepository:
+    """S3 업로드 대기 항목 (diagnosis_uploads 테이블) 접근 (기록은 DiagnosisRepository.create_diagnosis)"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def delete_uploads(self, diagnosis_id: int, storage_keys: list[str]):
+        """업로드가 끝난(또는 포기한) 항목 삭제"""
+        if not storage_keys:
+            return
+        stmt = delete(DiagnosisUpload).where(DiagnosisUpload.diagnosis_id == diagnosis_id,
+                                             DiagnosisUpload.storage_key.in_(storage_keys))
+        await self.db.execute(stmt)
+        await self.db.commit()
+
+    async def record_failure(self, diagnosis_id: int, storage_keys: list[str]):
+        """재시도까지 실패한 항목의 실패 횟수 증가 (다음 복구 주기에 다시 업로드)"""
+        if not storage_keys:
+            return
+        stmt = (
+            update(DiagnosisUpload)
+            .where(DiagnosisUpload.diagnosis_id == diagnosis_id, DiagnosisUpload.storage_key.in_(storage_keys))
+            .values(attempts=DiagnosisUpload.attempts + 1)
+        )
+        await self.db.execute(stmt)
+        await self.db.commit()
+
+    async def get_pending_uploads(self, min_age_seconds: float, limit: int = 100) -> list[DiagnosisUpload]:
+        """
+        created_at이 min_age_seconds보다 오래된 업로드 대기 항목 (오래된 순, 최대 limit개)
+        (다른 서버 프로세스가 지금 업로드 중인 최신 항목은 제외)
+        """
+        query = (
+            select(DiagnosisUpload)
+            .where(DiagnosisUpload.created_at < get_now_kst() - timedelta(seconds=min_age_seconds))
+            .order_by(DiagnosisUpload.id)
+            .limit(limit)
+        )
+        result = await self.db.execute(query)
+        return result.scalars().all()
@@ -1,13 +1,20 @@
 # BACK-END/app/domains/diagnosis/router.py
 
 from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
 from app.core.database import get_db
 from app.domains.auth.jwt_handler import verify_token
 from app.domains.diagnosis.service import DiagnosisService
-from app.domains.diagnosis.schemas import DiagnosisResponse
+from app.domains.diagnosis.schemas import DiagnosisResponse, DiagnosisJobCreateResponse, DiagnosisJobResponse
+from app.domains.diagnosis.repository import DiagnosisRepository, DiagnosisJobRepository
+from app.core.lifespan import ml_models
+from app.domains.diagnosis.executor import InferenceOverloadedError
+from app.utils.sse import SSE_HEADERS
 
 from enum import Enum as PyEnum
+import uuid
 
 router = APIRouter()
 
@@ -48,7 +55,119 @@ async def predict_mold(
     service = DiagnosisService(db)
     
     # place 정보도 함께 넘겨줍니다.
-    result = await service.diagnose_image(file, place.value, user_id)
+    # 추론 대기열 포화 시 503 + Retry-After (지연이 무한히 늘어나는 대신 재시도 유도)
+    try:
+        result = await service.diagnose_image(file, place.value, user_id)
+    except InferenceOverloadedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
     
     return result
 
+
+@router.post("/predict/stream")
+async def predict_mold_stream(
+    file: UploadFile = File(...),
+    place: MoldLocation = Form(...),
+    user_id: int = Depends(verify_token),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    곰팡이 사진 판별 (스트리밍, text/event-stream)
+    - classification: 추론 직후 등급 / 신뢰도 / bbox / CAM 이미지 URL
+    - section: 진단 리포트(model_solution) 필드가 생성되는 대로 {"key", "value"}
+    - done: 저장된 진단 기록 (/predict 응답과 동일한 형식)
+    - error: 도중 실패 시 안내 메시지
+    """
+    if not file.content_type.startswith("image/"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="이미지 파일만 업로드할 수 있습니다."
+        )
+
+    service = DiagnosisService(db)
+
+    # 추론까지는 스트림 시작 전에 수행 → 대기열 포화 시 일반 응답과 동일하게 503 + Retry-After
+    try:
+        events = await service.diagnose_image_stream(file, place.value, user_id)
+    except InferenceOverloadedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.post("/jobs", response_model=DiagnosisJobCreateResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_diagnosis_job(
+    file: UploadFile = File(...),
+    place: MoldLocation = Form(...),
+    user_id: int = Depends(verify_token),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    비동기 곰팡이 판별 요청
+    - 이미지를 작업 큐(diagnosis_jobs)에 저장하고 작업 ID를 즉시 반환
+    - 추론 / S3 업로드 / RAG 리포트는 백그라운드 워커가 처리 → GET /jobs/{job_id}로 결과 조회
+    """
+    if not file.content_type.startswith("image/"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="이미지 파일만 업로드할 수 있습니다."
+        )
+
+    # 상한 + 1바이트까지만 읽어 크기 확인 (큰 파일을 통째로 메모리에 올리지 않음)
+    max_bytes = settings.DIAGNOSIS_JOB_MAX_IMAGE_BYTES
+    image_data = await file.read(max_bytes + 1)
+    if len(image_data) > max_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"이미지 파일은 {max_bytes // (1024 * 1024)}MB 이하만 업로드할 수 있습니다."
+        )
+
+    job = await DiagnosisJobRepository(db).create_job({
+        "id": str(uuid.uuid4()),
+        "user_id": user_id,
+        "mold_location": place.value,
+        "image_data": image_data,
+        "filename": file.filename,
+        "content_type": file.content_type,
+    })
+    ml_models["job_worker"].notify()
+
+    return DiagnosisJobCreateResponse(job_id=job.id, status=job.status)
+
+
+@router.get("/jobs/{job_id}", response_model=DiagnosisJobResponse)
+async def get_diagnosis_job(
+    job_id: str,
+    user_id: int = Depends(verify_token),
+    db: AsyncSession = Depends(get_db)
+):
+    """비동기 판별 작업 상태 조회 (done이면 진단 결과 포함)"""
+    job = await DiagnosisJobRepository(db).get_job(job_id, user_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="진단 작업을 찾을 수 없습니다."
+        )
+
+    result = None
+    if job.status == "done" and job.diagnosis_id is not None:
+        diagnosis = await DiagnosisRepository(db).get_diagnosis_by_id(job.diagnosis_id)
+        result = DiagnosisResponse.model_validate(diagnosis) if diagnosis else None
+
+    return DiagnosisJobResponse(
+        job_id=job.id,
+        status=job.status,
+        attempts=job.attempts,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+        error=job.error if job.status == "failed" else None,
+        result=result,
+    )
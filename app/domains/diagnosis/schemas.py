@@ -17,3 +17,17 @@ class DiagnosisResponse(BaseModel):
     class Config:
         from_attributes = True  # ORM 객체를 Pydantic 모델로 변환 허용
 
+
+class DiagnosisJobCreateResponse(BaseModel):
+    job_id: str
+    status: str
+
+
+class DiagnosisJobResponse(BaseModel):
+    job_id: str
+    status: str                                # queued / processing / done / failed
+    attempts: int
+    created_at: datetime
+    finished_at: datetime | None = None
+    error: str | None = None                   # failed일 때 실패 원인
+    result: DiagnosisResponse | None = None    # done일 때 진단 결과
@@ -1,19 +1,30 @@
 # BACK-END/app/domains/diagnosis/service.py
 from fastapi import UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.utils.storage import StorageClient
+from app.core.config import settings
 from app.utils.cam_utils import draw_bbox_on_image
+from app.utils.storage import folder_key, sidecar_key
+from app.utils.image_context import ImageContext
+from app.utils.partial_json import PartialJSONObjectParser
+from app.utils.sse import detach_stream, sse_event
+from app.core.database import AsyncSessionLocal
 from app.domains.diagnosis.repository import DiagnosisRepository
+from app.domains.diagnosis.schemas import DiagnosisResponse
+from app.domains.diagnosis.executor import InferenceOverloadedError
+from app.domains.diagnosis.cache import diagnosis_cache
+from app.domains.diagnosis.registry import LoadedModel
 from app.core.lifespan import ml_models  # 서버 시작 시 로드된 모델 재사용
 from app.domains.search.service import search_service # [추가] RAG 서비스 임포트
+from app.domains.search.rag_engine import is_fallback_report
 import logging
 import json
-import io
 import uuid
 from datetime import datetime, timezone
 
 logger = logging.getLogger(__name__)
 
+STREAM_ERROR_MESSAGE = "진단 처리 중 오류가 발생했습니다. 잠시 후 다시 시도해주세요."
+
 # 예측 확률 임계치: 이 값 미만이면 "곰팡이 특정 불가"로 처리
 CONFIDENCE_THRESHOLD = 60.0
 
@@ -21,6 +32,9 @@ CONFIDENCE_THRESHOLD = 60.0
 MULTI_MOLD_SUM_THRESHOLD = 60.0        # G1~G4 확률 합이 이 값 이상이면 복합 곰팡이 후보
 MULTI_MOLD_INDIVIDUAL_THRESHOLD = 15.0  # 개별 클래스가 이 값 이상이어야 유의미한 곰팡이로 표시
 
+# CAM 이미지 / bbox sidecar를 저장하지 않는 라벨 (CAM 계산도 생략)
+CAM_SKIPPED_LABELS = ("G0", "UNCLASSIFIED")
+
 # 곰팡이 등급 → 한글 이름 매핑
 MOLD_KOREAN_NAMES = {
     "G1": "검은곰팡이",
@@ -29,30 +43,123 @@ MOLD_KOREAN_NAMES = {
     "G4": "붉은곰팡이",
 }
 
+# 판별 불가 (신뢰도 부족 + 복합 곰팡이 아님) 안내 리포트
+UNCLASSIFIED_SOLUTION = {
+    "diagnosis": "AI가 곰팡이를 특정하지 못했습니다. 이미지의 화질이 낮거나, 곰팡이가 아닌 오염물일 수 있습니다.",
+    "FrequentlyVisitedAreas": [],
+    "solution": [
+        "곰팡이 의심 부위를 가까이 접근하여 다시 사진을 찍어보세요.",
+        "밝은 빛 아래에서 촬영하세요.",
+        "반사가 심한 경우 각도를 바꿔 다시 시도해보세요."
+    ],
+    "prevention": [],
+    "insight": "신뢰도가 낮아 정확한 곰팡이 종류를 판별할 수 없었습니다. 위의 권장 조치를 따라 다시 진단을 시도해주세요."
+}
+
+# G0 확신 (곰팡이 아님) 안내 리포트
+NOT_MOLD_SOLUTION = {
+    "diagnosis": "AI 분석 결과, 해당 이미지에서 곰팡이가 감지되지 않았습니다.",
+    "FrequentlyVisitedAreas": [],
+    "solution": [
+        "현재 촬영하신 부분에는 곰팡이가 발견되지 않았습니다.",
+        "다른 의심 부위가 있다면 추가 진단을 진행해보세요.",
+        "곰팡이와 유사한 얼룩이나 오염물일 수 있으니, 지속적으로 관찰해주세요."
+    ],
+    "prevention": [
+        "실내 습도를 50% 이하로 유지하면 곰팡이 예방에 효과적입니다.",
+        "환기를 자주 시켜 공기 순환을 유지하세요.",
+        "결로가 생기기 쉬운 곳은 주기적으로 확인해주세요."
+    ],
+    "insight": "곰팡이가 아닌 것으로 판단되었습니다. 다만 비슷해 보이는 오염물이 시간이 지나며 곰팡이로 발전할 수 있으니 주기적으로 관찰하시길 권장합니다."
+}
+
+# G3(흰곰팡이 + 백화현상) 리포트의 insight에 덧붙이는 물 테스트 안내
+WATER_TEST_GUIDE = (
+    "\n\n[추가 진단 안내] 하얀 오염물이 판단되었습니다.\n"
+    "이 오염물이 콘크리트 또는 벽돌 위에 있다면 간단한 테스트를 해보세요:\n"
+    "→ 물을 약간 뿌려보세요.\n"
+    "  • 물에 바로 녹으면 → 백화현상(소금기). 벽돌·콘크리트 내부의 수분이 건조할 때 표면으로 올라온 것입니다.\n"
+    "  • 물이 맺혀서 바로 사라지지 않으면 → 곰팡이. 환기 및 제곰팡이 처리가 필요합니다."
+)
+
 class DiagnosisService:
     def __init__(self, db: AsyncSession):
-        self.storage = StorageClient()
         self.repository = DiagnosisRepository(db)
-        self.ai = ml_models["efficientnet"]  # lifespan에서 서버 시작 시 한 번만 로드된 인스턴스 재사용
+        self.models = ml_models["models"]  # 모델 레지스트리 (활성 모델 무중단 교체 + shadow 평가)
+        self.executor = ml_models["executor"]  # 추론 전용 스레드 풀 (대기열 상한 관리)
+        self.uploader = ml_models["uploader"]  # S3 업로드 write-behind 큐 (응답 후 백그라운드 업로드)
 
     async def diagnose_image(self, file: UploadFile, place: str, user_id: int):
-        # 파일 바이트를 먼저 메모리로 읽기 (S3 업로드 후 스트림이 닫히므로)
-        file_bytes = await file.read()
-        await file.seek(0)  # S3 업로드를 위해 포인터 초기화
+        # 파일을 1회만 읽고 디코딩 결과(224x224)를 추론/CAM/업로드에서 공유
+        image = await ImageContext.from_upload(file, fast_decode=settings.IMAGE_FAST_DECODE)
+        return await self.diagnose_context(image, place, user_id)
+
+    async def diagnose_context(self, image: ImageContext, place: str, user_id: int, job_id: str | None = None):
+        """
+        이미 읽어둔 이미지로 진단 (비동기 진단 작업 워커도 사용)
+        - job_id: 비동기 진단 작업에서 호출 시 저장과 함께 작업에 진단 ID 연결
+        - 요청이 끝날 때까지 시작 시점의 활성 모델을 잡아둠 (교체 후 언로드되어도 drain이 대기)
+        """
+        with self.models.acquire() as model:
+            # 0. 같은 사진 재업로드 확인: 캐시 적중 시 추론/RAG/S3 업로드 생략
+            cached, phash = await self._lookup_cached_result(user_id, image, model.model_version)
+            if cached:
+                return await self._save_cached_result(self.repository, cached, place, user_id, image, job_id=job_id)
+
+            # 1~5. 추론 + 저장 라벨 결정 + 업로드 목록 구성
+            analysis = await self._analyze(image, model)
+
+            # 6~7. 진단 리포트 구성 (RAG / 고정 안내문)
+            final_solution = await self._build_solution(image, analysis)
+
+            # 8~10. DB 저장 + S3 업로드 예약 + 결과 캐시
+            return await self._persist(self.repository, image, analysis, final_solution, place, user_id, phash,
+                                       job_id=job_id)
+
+    async def diagnose_image_stream(self, file: UploadFile, place: str, user_id: int):
+        """
+        스트리밍 진단: 추론까지 마친 뒤 SSE 이벤트 제너레이터를 반환
+        - 추론 대기열 포화(InferenceOverloadedError)는 스트림 시작 전에 발생 → 라우터에서 503 처리
+        - 이벤트 순서: classification (등급/신뢰도/bbox/CAM URL) → section (리포트 필드가 완성될 때마다)
+          → done (저장된 진단 기록, DiagnosisResponse 형식) / 도중 실패 시 error
+        - 리포트 생성 / 저장은 요청과 분리된 Task로 실행 → 클라이언트가 중간에 끊어도 진단 기록 / 업로드 완료
+        """
+        image = await ImageContext.from_upload(file, fast_decode=settings.IMAGE_FAST_DECODE)
+
+        # 모델은 추론 + CAM 렌더링(_analyze)까지만 사용 → 스트림 시작 전에 참조 해제
+        with self.models.acquire() as model:
+            cached, phash = await self._lookup_cached_result(user_id, image, model.model_version)
+            if cached:
+                return self._detach_stream(self._stream_cached_result(cached, place, user_id, image))
 
+            analysis = await self._analyze(image, model)
+        return self._detach_stream(self._stream_diagnosis(image, analysis, place, user_id, phash))
+
+    async def _analyze(self, image: ImageContext, model: LoadedModel) -> dict:
+        """
+        추론 → 저장 라벨 결정 → CAM 렌더링 → S3 업로드 목록 구성 (업로드 자체는 DB 저장 후)
+        - model: acquire()로 잡아둔 활성 모델
+        반환: 리포트 구성 / DB 저장에 필요한 중간 결과
+        """
+        model_version = model.model_version
         # 고유 UUID 생성 (원본, CAM, JSON 파일에 동일 UUID 사용)
         file_uuid = str(uuid.uuid4())
-        file_ext = file.filename.split(".")[-1] if file.filename else "jpg"
+        file_ext = image.file_ext
 
-        # 1. AI 모델(EfficientNet-B0) 분류 추론 + CAM 생성
+        # 1. AI 모델(EfficientNet-B0) 분류 추론 + CAM 생성 (저장 라벨이 CAM을 쓰는 경우에만)
+        # 추론 대기열이 가득 차면 InferenceOverloadedError → 라우터에서 503 처리
         try:
-            prediction = self.ai.predict_with_cam(io.BytesIO(file_bytes), generate_cam=True)
+            async with self.executor.admit():
+                prediction = await model.predict_with_cam(image, generate_cam=self._needs_cam)
+            self.models.observe(model, image, prediction)  # 샘플링된 요청만 shadow 모델과 비교 (백그라운드)
             mold_name = prediction.get("class_name", "Unknown Mold")
             probability = float(prediction.get("confidence", 0.0))
             cam_heatmap = prediction.get("cam_heatmap")
             bbox = prediction.get("bbox")
             all_probabilities = prediction.get("all_probabilities", {})
 
+        except InferenceOverloadedError:
+            raise
         except Exception as e:
             logger.error(f"EfficientNet 추론 실패: {e}")
             mold_name = "Unknown"
@@ -62,43 +169,34 @@ class DiagnosisService:
             all_probabilities = {}
 
         # 2. 저장 라벨 결정 (S3 폴더 분류)
-        storage_label = self._determine_storage_label(mold_name, probability)
-
-        # 3. S3 업로드: 원본 이미지 (라벨 폴더)
-        original_bytes_io = io.BytesIO(file_bytes)
-        image_url = self.storage.upload_to_folder(
-            file_bytes=original_bytes_io,
-            label=storage_label,
-            file_uuid=file_uuid,
-            folder_type="dataset",
-            content_type=file.content_type or "image/jpeg",
-            file_ext=file_ext
-        )
+        # 복합 곰팡이(MULTI) 여부를 업로드 목록 구성 전에 확정 → 원본을 한 번만, 최종 라벨 폴더에 업로드
+        storage_label, multi_info = self._classify_storage(mold_name, probability, all_probabilities)
+
+        # 3. S3 업로드 목록 구성: 원본 이미지 (라벨 폴더)
+        # 실제 업로드는 DB 저장 후 uploader가 백그라운드에서 동시에 처리 (URL은 key로 미리 계산)
+        uploads = [self._file_upload("image_path", image.data, storage_label, file_uuid, "dataset",
+                                     image.content_type, file_ext)]
+        image_url = self.uploader.object_url(uploads[-1])
 
-        # 4. CAM 이미지 생성 + S3 업로드 (G0, UNCLASSIFIED 제외)
+        # 4. CAM 이미지 생성 + S3 업로드 (G0, UNCLASSIFIED 제외 / MULTI는 top-1 기준 bbox)
         gradcam_url = None
         bbox_json_str = None
 
-        if storage_label not in ("G0", "UNCLASSIFIED") and bbox is not None:
-            # CAM 바운딩박스 이미지 생성
-            cam_image_bytes = draw_bbox_on_image(file_bytes, bbox)
+        if storage_label not in CAM_SKIPPED_LABELS and bbox is not None:
+            # CAM 바운딩박스 이미지 생성 (디코딩된 224x224 배열 재사용)
+            cam_image_bytes = await self._render_bbox(image, bbox)
 
             # S3 업로드: CAM 이미지
-            gradcam_url = self.storage.upload_to_folder(
-                file_bytes=cam_image_bytes,
-                label=storage_label,
-                file_uuid=file_uuid,
-                folder_type="gradcam",
-                content_type="image/jpeg",
-                file_ext="jpg"
-            )
+            uploads.append(self._file_upload("gradcam_image_path", cam_image_bytes.getvalue(), storage_label,
+                                             file_uuid, "gradcam", "image/jpeg", "jpg"))
+            gradcam_url = self.uploader.object_url(uploads[-1])
 
         # 5. JSON sidecar 업로드 (bbox 좌표 + 메타데이터, G0/UNCLASSIFIED 제외)
-        if storage_label not in ("G0", "UNCLASSIFIED") and bbox is not None:
+        if storage_label not in CAM_SKIPPED_LABELS and bbox is not None:
             bbox_data = {
                 "image_id": file_uuid,
-                "label": mold_name,
-                "confidence": probability,
+                "label": multi_info["display_name"] if multi_info else mold_name,
+                "confidence": multi_info["total_confidence"] if multi_info else probability,
                 "bbox": {
                     "x_min": bbox[0],
                     "y_min": bbox[1],
@@ -108,126 +206,61 @@ class DiagnosisService:
                     "image_size": [224, 224]
                 },
                 "created_at": datetime.now(timezone.utc).isoformat(),
-                "model_version": "efficientnet_b0_v1.0"
+                "model_version": model_version
             }
-            self.storage.upload_json(bbox_data, label=storage_label, file_uuid=file_uuid)
+            uploads.append(self._json_upload(bbox_data, storage_label, file_uuid))
             bbox_json_str = json.dumps(bbox_data, ensure_ascii=False)
 
         # 6. 임계치 체크: 확률이 낮으면 복합 곰팡이 또는 판별 불가
         if probability < CONFIDENCE_THRESHOLD:
-            # 6-1. 복합 곰팡이 감지 시도
-            multi_info = self._check_multi_mold(all_probabilities)
-
-            if multi_info:
-                # 복합 곰팡이 확정: storage_label 오버라이드
-                storage_label = "MULTI"
-                mold_name = "MULTI"
-                probability = multi_info["total_confidence"]
-
-                # top-1 곰팡이명으로 RAG 1회 호출
-                top_mold_name = multi_info["detected_molds"][0]["class_name"]
-                rag_result = await search_service.get_mold_solution_with_rag(top_mold_name, probability)
-
-                try:
-                    rag_data = json.loads(rag_result["rag_solution"])
-                    # 진단 텍스트 앞에 복합 곰팡이 안내 삽입
-                    display_text = multi_info["display_name"] + "가 함께 검출되었습니다. 여러 곰팡이가 핀 것으로 확인됩니다."
-                    rag_data["diagnosis"] = display_text + "\n\n" + rag_data.get("diagnosis", "")
-                    rag_data["multi_mold_detail"] = {
-                        "detected_molds": [
-                            {"grade": m["grade"], "name": m["name"], "confidence": m["confidence"]}
-                            for m in multi_info["detected_molds"]
-                        ],
-                        "total_confidence": multi_info["total_confidence"]
-                    }
-                    final_solution = json.dumps(rag_data, ensure_ascii=False)
-                except (json.JSONDecodeError, TypeError):
-                    final_solution = rag_result["rag_solution"]
-
-                # MULTI는 CAM + JSON sidecar 생성 (top-1 기준 bbox 이미 계산됨)
-                if bbox is not None:
-                    cam_image_bytes = draw_bbox_on_image(file_bytes, bbox)
-                    gradcam_url = self.storage.upload_to_folder(
-                        file_bytes=cam_image_bytes,
-                        label=storage_label,
-                        file_uuid=file_uuid,
-                        folder_type="gradcam",
-                        content_type="image/jpeg",
-                        file_ext="jpg"
-                    )
-                    bbox_data = {
-                        "image_id": file_uuid,
-                        "label": multi_info["display_name"],
-                        "confidence": probability,
-                        "bbox": {
-                            "x_min": bbox[0], "y_min": bbox[1],
-                            "x_max": bbox[2], "y_max": bbox[3],
-                            "format": "xyxy", "image_size": [224, 224]
-                        },
-                        "created_at": datetime.now(timezone.utc).isoformat(),
-                        "model_version": "efficientnet_b0_v1.0"
-                    }
-                    self.storage.upload_json(bbox_data, label=storage_label, file_uuid=file_uuid)
-                    bbox_json_str = json.dumps(bbox_data, ensure_ascii=False)
-
-                # MULTI용 S3 원본 이미지 재업로드 (기존 UNCLASSIFIED → MULTI 폴더로)
-                original_bytes_io = io.BytesIO(file_bytes)
-                image_url = self.storage.upload_to_folder(
-                    file_bytes=original_bytes_io,
-                    label=storage_label,
-                    file_uuid=file_uuid,
-                    folder_type="dataset",
-                    content_type=file.content_type or "image/jpeg",
-                    file_ext=file_ext
-                )
-            else:
-                # 6-2. 복합 곰팡이 아님 → 기존 UnClassified 처리
-                mold_name = "UnClassified"
-                final_solution = json.dumps({
-                    "diagnosis": "AI가 곰팡이를 특정하지 못했습니다. 이미지의 화질이 낮거나, 곰팡이가 아닌 오염물일 수 있습니다.",
-                    "FrequentlyVisitedAreas": [],
-                    "solution": [
-                        "곰팡이 의심 부위를 가까이 접근하여 다시 사진을 찍어보세요.",
-                        "밝은 빛 아래에서 촬영하세요.",
-                        "반사가 심한 경우 각도를 바꿔 다시 시도해보세요."
-                    ],
-                    "prevention": [],
-                    "insight": "신뢰도가 낮아 정확한 곰팡이 종류를 판별할 수 없었습니다. 위의 권장 조치를 따라 다시 진단을 시도해주세요."
-                }, ensure_ascii=False)
-        elif mold_name == "G0_NotMold":
-            # 7-1. G0 확신: 곰팡이가 아님 (RAG 호출 불필요)
-            final_solution = json.dumps({
-                "diagnosis": "AI 분석 결과, 해당 이미지에서 곰팡이가 감지되지 않았습니다.",
-                "FrequentlyVisitedAreas": [],
-                "solution": [
-                    "현재 촬영하신 부분에는 곰팡이가 발견되지 않았습니다.",
-                    "다른 의심 부위가 있다면 추가 진단을 진행해보세요.",
-                    "곰팡이와 유사한 얼룩이나 오염물일 수 있으니, 지속적으로 관찰해주세요."
-                ],
-                "prevention": [
-                    "실내 습도를 50% 이하로 유지하면 곰팡이 예방에 효과적입니다.",
-                    "환기를 자주 시켜 공기 순환을 유지하세요.",
-                    "결로가 생기기 쉬운 곳은 주기적으로 확인해주세요."
-                ],
-                "insight": "곰팡이가 아닌 것으로 판단되었습니다. 다만 비슷해 보이는 오염물이 시간이 지나며 곰팡이로 발전할 수 있으니 주기적으로 관찰하시길 권장합니다."
-            }, ensure_ascii=False)
+            result_name = "MULTI" if multi_info else "UnClassified"
+            confidence = multi_info["total_confidence"] if multi_info else probability
         else:
-            # 7-2. G3 특별 처리: "물 테스트" 안내 추가
-            if mold_name == "G3_WhiteMold":
-                final_solution = await self._handle_g3_white_mold(mold_name, probability)
-            else:
-                # 기존 RAG 파이프라인 유지 (G1, G2, G4)
-                rag_result = await search_service.get_mold_solution_with_rag(mold_name, probability)
-                final_solution = rag_result["rag_solution"]
+            result_name, confidence = mold_name, probability
 
+        return {
+            "model_version": model_version,
+            "file_uuid": file_uuid,
+            "class_name": mold_name,                   # 모델 top-1 예측 (추론 실패 시 "Unknown")
+            "result_name": result_name,                # 최종 판정 (G0~G4 클래스명 / MULTI / UnClassified)
+            "confidence": confidence,
+            "multi_info": multi_info,
+            "bbox": bbox,
+            "bbox_coordinates": bbox_json_str,
+            "image_path": image_url,
+            "gradcam_image_path": gradcam_url,
+            "uploads": uploads,
+        }
+
+    async def _build_solution(self, image: ImageContext, analysis: dict) -> str:
+        """최종 판정별 진단 리포트 (JSON 문자열)"""
+        if analysis["result_name"] == "UnClassified":
+            # 복합 곰팡이 아님 → 판별 불가 안내
+            return json.dumps(UNCLASSIFIED_SOLUTION, ensure_ascii=False)
+        if analysis["result_name"] == "G0_NotMold":
+            # 7-1. G0 확신: 곰팡이가 아님 (RAG 호출 불필요)
+            return json.dumps(NOT_MOLD_SOLUTION, ensure_ascii=False)
+
+        # 7-2. RAG 리포트 (MULTI는 top-1 곰팡이명으로 1회 호출, G3는 물 테스트 안내 추가)
+        rag_mold_name, rag_probability = self._rag_target(analysis)
+        with image.stage("rag"):
+            rag_result = await search_service.get_mold_solution_with_rag(rag_mold_name, rag_probability)
+        return self._finalize_report(rag_result["rag_solution"], analysis)
+
+    async def _persist(self, repository: DiagnosisRepository, image: ImageContext, analysis: dict,
+                       final_solution: str, place: str, user_id: int, phash: int | None,
+                       job_id: str | None = None):
+        """DB 저장 → S3 업로드 예약 → (업로드 성공 시) 결과 캐시 저장"""
         # 8. DB 저장을 위한 데이터 구성
         # result 필드: "G1_Stachybotrys" → "G1" 등 등급 접두사만 저장 (프론트 표시용)
-        grade = mold_name.split("_")[0]  # "G1_Stachybotrys" → "G1", "UnClassified" → "UnClassified"
+        grade = analysis["result_name"].split("_")[0]  # "G1_Stachybotrys" → "G1", "UnClassified" → "UnClassified"
+        probability = analysis["confidence"]
+        bbox_json_str = analysis["bbox_coordinates"]
 
         diagnosis_data = {
             "user_id": user_id,
-            "image_path": image_url,
-            "gradcam_image_path": gradcam_url,        # CAM 이미지 S3 URL (G0는 None)
+            "image_path": analysis["image_path"],
+            "gradcam_image_path": analysis["gradcam_image_path"],  # CAM 이미지 S3 URL (G0는 None)
             "bbox_coordinates": bbox_json_str,         # bbox JSON string
             "result": grade,                           # 등급 접두사 (G1~G4 / UnClassified)
             "confidence": probability,                 # 확률
@@ -235,11 +268,194 @@ class DiagnosisService:
             "model_solution": final_solution           # RAG가 생성한 리포트 저장
         }
 
-        # 9. DB 저장
-        saved_diagnosis = await self.repository.create_diagnosis(diagnosis_data)
+        # 9. DB 저장 (업로드 대기 항목도 같은 트랜잭션으로 기록 → 저장 직후 종료돼도 재기동/주기 복구로 업로드)
+        with image.stage("db"):
+            saved_diagnosis = await repository.create_diagnosis(diagnosis_data, job_id=job_id,
+                                                                uploads=analysis["uploads"])
+
+        # 9-1. 결과 캐시 저장 (추론 실패 / Gemini fallback 리포트는 재시도할 수 있도록 제외)
+        # 캐시된 URL이 실제 객체를 가리키도록 S3 업로드가 모두 성공한 뒤에 저장
+        on_uploaded = None
+        if (settings.DIAGNOSIS_CACHE_ENABLED and analysis["class_name"] != "Unknown"
+                and not is_fallback_report(final_solution)):
+            model_version = analysis["model_version"]
+
+            def on_uploaded(urls: dict):
+                diagnosis_cache.store(user_id, image, model_version, {
+                    "result": grade,
+                    "confidence": probability,
+                    "image_path": urls["image_path"],
+                    "gradcam_image_path": urls.get("gradcam_image_path"),
+                    "bbox_coordinates": bbox_json_str,
+                    "model_solution": final_solution,
+                }, phash=phash)
+
+        # 9-2. S3 업로드 예약 (완료 시 Diagnosis 행을 최종 URL로 갱신, 실패 시 재시도)
+        self.uploader.submit(saved_diagnosis.id, analysis["uploads"], on_complete=on_uploaded)
+
+        # 10. 단계별 소요 시간 기록 (read/decode/inference/cam_render/rag/db)
+        logger.info(json.dumps({
+            "event": "DIAGNOSIS_TIMINGS",
+            "image_id": analysis["file_uuid"],
+            "result": grade,
+            "timings_ms": image.timings_ms(),
+        }, ensure_ascii=False))
 
         return saved_diagnosis
 
+    async def _stream_diagnosis(self, image: ImageContext, analysis: dict, place: str, user_id: int,
+                                phash: int | None):
+        """추론 결과를 먼저 보내고, RAG 리포트를 필드 단위로 스트리밍한 뒤 DB 저장 (_detach_stream으로 실행)"""
+        yield sse_event("classification", {
+            "result": analysis["result_name"].split("_")[0],
+            "confidence": analysis["confidence"],
+            "bbox": analysis["bbox"],
+            "image_path": analysis["image_path"],
+            "gradcam_image_path": analysis["gradcam_image_path"],
+        })
+
+        sent_sections = {}
+        if analysis["result_name"] in ("UnClassified", "G0_NotMold"):
+            final_solution = await self._build_solution(image, analysis)
+        else:
+            rag_mold_name, rag_probability = self._rag_target(analysis)
+            parser = PartialJSONObjectParser()
+            report_text = None
+            with image.stage("rag"):
+                async for event in search_service.stream_mold_solution_with_rag(rag_mold_name, rag_probability):
+                    if "report" in event:
+                        report_text = event["report"]
+                        continue
+                    for key, value in parser.feed(event["delta"]):
+                        value = self._decorate_section(key, value, analysis)
+                        sent_sections[key] = value
+                        yield sse_event("section", {"key": key, "value": value})
+            final_solution = self._finalize_report(report_text, analysis)
+
+        # 스트리밍 중 보내지 못했거나 최종본과 다른 필드 (고정 안내문, MULTI 상세, fallback 대체 등)
+        for key, value in self._report_sections(final_solution).items():
+            if sent_sections.get(key) != value:
+                yield sse_event("section", {"key": key, "value": value})
+
+        # 스트림이 끝날 때 저장 (요청 세션은 응답 시작 후 닫힐 수 있으므로 별도 세션 사용)
+        async with AsyncSessionLocal() as db:
+            saved_diagnosis = await self._persist(DiagnosisRepository(db), image, analysis, final_solution,
+                                                  place, user_id, phash)
+            yield sse_event("done", DiagnosisResponse.model_validate(saved_diagnosis).model_dump(mode="json"))
+
+    async def _stream_cached_result(self, cached: dict, place: str, user_id: int, image: ImageContext):
+        """캐시 적중 시 스트리밍: 캐시된 결과를 한 번에 보낸 뒤 새 진단 기록 저장"""
+        bbox_data = json.loads(cached["bbox_coordinates"]) if cached["bbox_coordinates"] else None
+        yield sse_event("classification", {
+            "result": cached["result"],
+            "confidence": cached["confidence"],
+            "bbox": [bbox_data["bbox"][k] for k in ("x_min", "y_min", "x_max", "y_max")] if bbox_data else None,
+            "image_path": cached["image_path"],
+            "gradcam_image_path": cached["gradcam_image_path"],
+        })
+        for key, value in self._report_sections(cached["model_solution"]).items():
+            yield sse_event("section", {"key": key, "value": value})
+
+        async with AsyncSessionLocal() as db:
+            saved_diagnosis = await self._save_cached_result(DiagnosisRepository(db), cached, place, user_id, image)
+            yield sse_event("done", DiagnosisResponse.model_validate(saved_diagnosis).model_dump(mode="json"))
+
+    @staticmethod
+    def _detach_stream(events):
+        """
+        리포트 생성 → DB 저장 → S3 업로드 예약을 요청과 분리된 Task로 실행 (detach_stream)
+        - 클라이언트 연결이 끊겨도 classification 이벤트로 이미 보낸 이미지 URL의 객체 / 진단 기록이 반드시 생성됨
+        """
+        return detach_stream(events, STREAM_ERROR_MESSAGE, name="진단 스트리밍")
+
+    async def _lookup_cached_result(self, user_id: int, image: ImageContext,
+                                    model_version: str) -> tuple[dict | None, int | None]:
+        """
+        진단 결과 캐시 조회
+        반환: (캐시된 결과 또는 None, 저장 시 재사용할 dHash 또는 None)
+        """
+        if not settings.DIAGNOSIS_CACHE_ENABLED:
+            return None, None
+
+        cached = diagnosis_cache.lookup_exact(user_id, image, model_version)
+        if cached or not diagnosis_cache.use_perceptual_hash:
+            return cached, None
+
+        # dHash 계산을 위한 디코딩 결과는 이후 추론에서 그대로 재사용됨
+        try:
+            async with self.executor.admit():
+                phash = await self.executor.run(image.perceptual_hash)
+        except InferenceOverloadedError:
+            raise
+        except Exception as e:
+            logger.warning(f"dHash 계산 실패 (캐시 조회 생략): {e}")
+            return None, None
+
+        return diagnosis_cache.lookup_perceptual(user_id, phash, model_version), phash
+
+    async def _save_cached_result(self, repository: DiagnosisRepository, cached: dict, place: str,
+                                  user_id: int, image: ImageContext, job_id: str | None = None):
+        """캐시된 진단 결과로 새 진단 기록 저장 (S3 객체는 기존 URL 재사용)"""
+        diagnosis_data = {
+            "user_id": user_id,
+            "image_path": cached["image_path"],
+            "gradcam_image_path": cached["gradcam_image_path"],
+            "bbox_coordinates": cached["bbox_coordinates"],
+            "result": cached["result"],
+            "confidence": cached["confidence"],
+            "mold_location": place,
+            "model_solution": cached["model_solution"]
+        }
+        with image.stage("db"):
+            saved_diagnosis = await repository.create_diagnosis(diagnosis_data, job_id=job_id)
+
+        logger.info(json.dumps({
+            "event": "DIAGNOSIS_CACHE_HIT",
+            "result": cached["result"],
+            "model_version": cached["model_version"],
+            "timings_ms": image.timings_ms(),
+        }, ensure_ascii=False))
+
+        return saved_diagnosis
+
+    def _file_upload(self, field: str, body: bytes, label: str, file_uuid: str, folder_type: str,
+                     content_type: str, file_ext: str) -> dict:
+        """uploader에 넘길 이미지 업로드 항목 (라벨 폴더 key)"""
+        return {
+            "field": field,
+            "key": folder_key(label, file_uuid, folder_type, file_ext),
+            "body": body,
+            "content_type": content_type,
+        }
+
+    def _json_upload(self, bbox_data: dict, label: str, file_uuid: str) -> dict:
+        """uploader에 넘길 JSON sidecar 업로드 항목"""
+        return {
+            "field": None,
+            "key": sidecar_key(label, file_uuid),
+            "body": json.dumps(bbox_data, ensure_ascii=False).encode("utf-8"),
+            "content_type": "application/json",
+        }
+
+    async def _render_bbox(self, image: ImageContext, bbox: list[int]):
+        """디코딩된 224x224 배열 위에 바운딩박스를 그려 JPEG로 인코딩 (추론 스레드 풀에서 실행)"""
+        with image.stage("cam_render"):
+            return await self.executor.run(draw_bbox_on_image, image.decode(), bbox)
+
+    def _classify_storage(self, mold_name: str, probability: float,
+                          all_probabilities: dict) -> tuple[str, dict | None]:
+        """저장 라벨 + 복합 곰팡이 정보 (신뢰도 부족 시 MULTI 여부를 먼저 확인)"""
+        multi_info = self._check_multi_mold(all_probabilities) if probability < CONFIDENCE_THRESHOLD else None
+        storage_label = "MULTI" if multi_info else self._determine_storage_label(mold_name, probability)
+        return storage_label, multi_info
+
+    def _needs_cam(self, prediction: dict) -> bool:
+        """(추론 스레드) 분류 결과의 저장 라벨이 CAM을 쓰는지 판단 → G0 / UNCLASSIFIED는 CAM 계산 생략"""
+        storage_label, _ = self._classify_storage(
+            prediction["class_name"], prediction["confidence"], prediction["all_probabilities"]
+        )
+        return storage_label not in CAM_SKIPPED_LABELS
+
     def _determine_storage_label(self, mold_name: str, confidence: float) -> str:
         """
         S3 저장 폴더 라벨 결정
@@ -293,27 +509,59 @@ class DiagnosisService:
             )
         }
 
-    async def _handle_g3_white_mold(self, mold_name: str, probability: float) -> str:
+    def _rag_target(self, analysis: dict) -> tuple[str, float]:
+        """RAG 리포트 생성 대상 (MULTI는 top-1 곰팡이명 + 합산 신뢰도)"""
+        multi_info = analysis["multi_info"]
+        if multi_info:
+            return multi_info["detected_molds"][0]["class_name"], analysis["confidence"]
+        return analysis["class_name"], analysis["confidence"]
+
+    def _decorate_section(self, key: str, value, analysis: dict):
         """
-        G3(흰곰팡이 + 백화현상) 특별 처리
-        RAG JSON 응답의 insight 필드에 물 테스트 안내를 통합하여 반환
+        RAG 리포트 필드 후처리 (스트리밍 / 일반 응답 공통)
+        - MULTI: diagnosis 앞에 복합 곰팡이 안내 삽입
+        - G3(흰곰팡이 + 백화현상): insight에 물 테스트 안내 추가
         """
-        rag_result = await search_service.get_mold_solution_with_rag(mold_name, probability)
-        rag_json_str = rag_result["rag_solution"]
-
-        water_test_guide = (
-            "\n\n[추가 진단 안내] 하얀 오염물이 판단되었습니다.\n"
-            "이 오염물이 콘크리트 또는 벽돌 위에 있다면 간단한 테스트를 해보세요:\n"
-            "→ 물을 약간 뿌려보세요.\n"
-            "  • 물에 바로 녹으면 → 백화현상(소금기). 벽돌·콘크리트 내부의 수분이 건조할 때 표면으로 올라온 것입니다.\n"
-            "  • 물이 맺혀서 바로 사라지지 않으면 → 곰팡이. 환기 및 제곰팡이 처리가 필요합니다."
-        )
+        multi_info = analysis["multi_info"]
+        if multi_info:
+            if key == "diagnosis":
+                display_text = multi_info["display_name"] + "가 함께 검출되었습니다. 여러 곰팡이가 핀 것으로 확인됩니다."
+                return display_text + "\n\n" + value
+        elif analysis["class_name"] == "G3_WhiteMold" and key == "insight":
+            return value + WATER_TEST_GUIDE
+        return value
+
+    def _finalize_report(self, report_text: str, analysis: dict) -> str:
+        """RAG 리포트 JSON에 MULTI / G3 후처리를 적용한 최종 model_solution"""
+        multi_info = analysis["multi_info"]
+        is_g3 = not multi_info and analysis["class_name"] == "G3_WhiteMold"
+        if not multi_info and not is_g3:
+            return report_text
 
         try:
-            rag_data = json.loads(rag_json_str)
+            rag_data = json.loads(report_text)
+        except (json.JSONDecodeError, TypeError):
+            # JSON 파싱 실패 시 G3는 문자열로 안내 추가 (fallback)
+            return report_text + WATER_TEST_GUIDE if is_g3 else report_text
+
+        if multi_info:
+            rag_data["diagnosis"] = self._decorate_section("diagnosis", rag_data.get("diagnosis", ""), analysis)
+            rag_data["multi_mold_detail"] = {
+                "detected_molds": [
+                    {"grade": m["grade"], "name": m["name"], "confidence": m["confidence"]}
+                    for m in multi_info["detected_molds"]
+                ],
+                "total_confidence": multi_info["total_confidence"]
+            }
+        else:
             # insight 필드에 물 테스트 안내 추가 (JSON 구조 유지)
-            rag_data["insight"] = rag_data.get("insight", "") + water_test_guide
-            return json.dumps(rag_data, ensure_ascii=False)
+            rag_data["insight"] = self._decorate_section("insight", rag_data.get("insight", ""), analysis)
+        return json.dumps(rag_data, ensure_ascii=False)
+
+    def _report_sections(self, model_solution: str) -> dict:
+        """model_solution JSON → 필드 dict (JSON이 아니면 빈 dict)"""
+        try:
+            sections = json.loads(model_solution)
         except (json.JSONDecodeError, TypeError):
-            # JSON 파싱 실패 시 문자열로 추가 (fallback)
-            return rag_json_str + water_test_guide
+            return {}
+        return sections if isinstance(sections, dict) else {}
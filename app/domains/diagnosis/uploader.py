@@ -0,0 +1,244 @@
+# BACK-END/app/domains/diagnosis/uploader.py
+
+import asyncio
+import logging
+import time
+from typing import Callable
+
+from app.core.database import AsyncSessionLocal
+from app.domains.diagnosis.repository import DiagnosisRepository, DiagnosisUploadRepository
+from app.utils.storage import StorageBackend
+
+logger = logging.getLogger(__name__)
+
+# 원본 업로드 최종 실패 시 image_path에 기록하는 값 (존재하지 않는 객체 URL 대신 빈 값, 재업로드 성공 시 URL로 갱신)
+UPLOAD_FAILED_PATH = ""
+
+
+class UploadDispatcher:
+    """
+    진단 이미지 S3 업로드 write-behind 큐
+    - 진단 응답은 DB 저장 직후 반환하고, S3 업로드는 백그라운드에서 처리
+    - 한 진단의 업로드(원본 / CAM / JSON sidecar)는 storage.put_many()로 한 번에 동시 업로드
+    - 실패한 항목만 지수 백오프로 재시도 (업로드할 bytes를 보관하므로 재전송 가능)
+    - 업로드가 끝나면 Diagnosis 행의 image_path / gradcam_image_path를 최종 URL로 갱신,
+      재시도까지 실패하면 존재하지 않는 URL 대신 실패 표시 (image_path = "", gradcam_image_path = None)
+    - 업로드 항목은 Diagnosis 행과 같은 트랜잭션으로 diagnosis_uploads 테이블에 기록되고 성공 시 삭제
+      → 저장 직후 서버가 종료되거나 재시도까지 실패한 항목은 recover_interval마다 다시 업로드
+        (max_recover_attempts회 실패하면 포기, 원본이면 image_path는 실패 표시 유지)
+    - 서버 종료 시 stop()에서 메모리 큐에 남은 작업을 모두 처리한 뒤 종료
+
+    업로드 항목(dict):
+    - field: 업로드 URL을 저장할 Diagnosis 컬럼 ("image_path" / "gradcam_image_path" / None)
+    - key: 스토리지 key (app.utils.storage.folder_key / sidecar_key)
+    - body: 업로드할 bytes
+    - content_type: MIME type
+    """
+
+    def __init__(self, storage: StorageBackend, max_retries: int = 3, retry_backoff_seconds: float = 0.5,
+                 recover_interval: float = 60.0, recover_min_age_seconds: float = 60.0,
+                 max_recover_attempts: int = 10):
+        self.storage = storage
+        self.max_retries = max(0, max_retries)
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.recover_interval = recover_interval
+        self.recover_min_age_seconds = recover_min_age_seconds
+        self.max_recover_attempts = max(1, max_recover_attempts)
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._worker: asyncio.Task | None = None
+        self._recovery: asyncio.Task | None = None
+        self._jobs: set[asyncio.Task] = set()
+        self._active: set[int] = set()  # 이 프로세스에서 큐에 있거나 업로드 중인 진단 ID (복구 중복 방지)
+
+        # 운영 통계
+        self.total_jobs = 0
+        self.total_uploads = 0
+        self.total_retries = 0
+        self.total_failed = 0
+        self.total_recovered = 0
+        self.total_abandoned = 0
+        self._job_seconds_total = 0.0
+
+    async def start(self):
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+            self._recovery = asyncio.create_task(self._recover_loop())
+
+    async def _recover_loop(self):
+        """기동 직후 + recover_interval마다 남은 업로드 복구"""
+        while True:
+            await self._recover_pending()
+            await asyncio.sleep(self.recover_interval)
+
+    async def _recover_pending(self):
+        """
+        끝나지 않은 업로드(이전 실행 / 재시도까지 실패한 항목)를 다시 큐에 등록
+        - 다른 프로세스가 업로드 중일 수 있는 최신 항목, 이 프로세스에서 처리 중인 진단은 제외
+        """
+        try:
+            async with AsyncSessionLocal() as db:
+                rows = await DiagnosisUploadRepository(db).get_pending_uploads(self.recover_min_age_seconds)
+        except Exception as e:
+            logger.error(f"업로드 대기 항목 조회 실패: {e}")
+            return
+
+        grouped: dict[int, list] = {}
+        for row in rows:
+            if row.diagnosis_id not in self._active:
+                grouped.setdefault(row.diagnosis_id, []).append(row)
+
+        for diagnosis_id, items in grouped.items():
+            exhausted = [row.storage_key for row in items if row.attempts >= self.max_recover_attempts]
+            if exhausted:
+                self.total_abandoned += len(exhausted)
+                logger.error(f"S3 업로드 포기 ({self.max_recover_attempts}회 실패, diagnosis_id={diagnosis_id}): "
+                             f"{exhausted}")
+                try:
+                    async with AsyncSessionLocal() as db:
+                        await DiagnosisUploadRepository(db).delete_uploads(diagnosis_id, exhausted)
+                except Exception as e:
+                    logger.error(f"업로드 대기 항목 삭제 실패 (diagnosis_id={diagnosis_id}): {e}")
+
+            uploads = [{"field": row.field, "key": row.storage_key, "body": row.body,
+                        "content_type": row.content_type}
+                       for row in items if row.attempts < self.max_recover_attempts]
+            if uploads:
+                self.total_recovered += 1
+                self.submit(diagnosis_id, uploads)
+
+        if grouped:
+            logger.warning(f"♻️ 끝나지 않은 S3 업로드 {sum(len(items) for items in grouped.values())}건 "
+                           f"(진단 {len(grouped)}건)을 다시 처리합니다.")
+
+    async def stop(self):
+        """대기 중인 작업까지 모두 업로드한 뒤 종료 (lifespan shutdown에서 호출)"""
+        if self._recovery is not None:
+            self._recovery.cancel()
+            await asyncio.gather(self._recovery, return_exceptions=True)
+            self._recovery = None
+        if self._worker is not None:
+            await self._queue.join()
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._jobs:
+            await asyncio.gather(*self._jobs, return_exceptions=True)
+
+    def submit(self, diagnosis_id: int, uploads: list[dict],
+               on_complete: Callable[[dict], None] | None = None):
+        """
+        진단 1건의 업로드 작업 등록 (즉시 반환)
+        on_complete: 모든 업로드 성공 시 {field: url}로 호출 (예: 진단 결과 캐시 저장)
+        """
+        self._active.add(diagnosis_id)
+        self._queue.put_nowait((diagnosis_id, uploads, on_complete))
+
+    def object_url(self, upload: dict) -> str:
+        """업로드 항목의 최종 URL (업로드 전 DB에 먼저 기록할 값)"""
+        return self.storage.object_url(upload["key"])
+
+    async def _run(self):
+        """큐에서 작업을 꺼내 진단 단위로 동시에 처리"""
+        while True:
+            job = await self._queue.get()
+            task = asyncio.create_task(self._process(*job))
+            self._jobs.add(task)
+            task.add_done_callback(self._jobs.discard)
+            task.add_done_callback(lambda _: self._queue.task_done())
+
+    async def _process(self, diagnosis_id: int, uploads: list[dict], on_complete):
+        start = time.perf_counter()
+        try:
+            results = await self._upload_with_retry(uploads)
+
+            # 성공한 항목의 URL, 최종 실패한 항목은 실패 표시 (CAM 업로드 실패 시 gradcam_image_path는 비움)
+            paths = {}
+            done_keys, failed_keys = [], []
+            for upload, url in zip(uploads, results):
+                if url is None:
+                    failed_keys.append(upload["key"])
+                    if upload["field"]:
+                        paths[upload["field"]] = UPLOAD_FAILED_PATH if upload["field"] == "image_path" else None
+                else:
+                    done_keys.append(upload["key"])
+                    if upload["field"]:
+                        paths[upload["field"]] = url
+
+            if paths.get("image_path") == UPLOAD_FAILED_PATH:
+                logger.error(f"원본 이미지 업로드 실패: 실패로 표시 후 복구 주기에 재업로드 (diagnosis_id={diagnosis_id})")
+
+            failed = bool(failed_keys)
+            try:
+                async with AsyncSessionLocal() as db:
+                    if paths:
+                        await DiagnosisRepository(db).update_storage_paths(diagnosis_id, paths)
+                    upload_repository = DiagnosisUploadRepository(db)
+                    await upload_repository.delete_uploads(diagnosis_id, done_keys)
+                    await upload_repository.record_failure(diagnosis_id, failed_keys)
+            except Exception as e:
+                logger.error(f"진단 이미지 URL 갱신 실패 (diagnosis_id={diagnosis_id}): {e}")
+                failed = True
+
+            if not failed and on_complete is not None:
+                try:
+                    on_complete(paths)
+                except Exception as e:
+                    logger.warning(f"업로드 완료 콜백 실패 (diagnosis_id={diagnosis_id}): {e}")
+        finally:
+            self._active.discard(diagnosis_id)
+
+        self.total_jobs += 1
+        self._job_seconds_total += time.perf_counter() - start
+
+    async def _upload_with_retry(self, uploads: list[dict]) -> list[str | None]:
+        """
+        진단 1건의 업로드를 put_many로 동시에 처리하고, 실패한 항목만 최대 max_retries회 재시도
+        반환: 항목 순서대로 URL 또는 최종 실패 시 None
+        """
+        results: list[str | None] = [None] * len(uploads)
+        pending = list(range(len(uploads)))
+
+        for attempt in range(self.max_retries + 1):
+            outcomes = await self.storage.put_many(
+                [(uploads[i]["key"], uploads[i]["body"], uploads[i]["content_type"]) for i in pending]
+            )
+            failed = []
+            for i, outcome in zip(pending, outcomes):
+                if isinstance(outcome, Exception):
+                    failed.append((i, outcome))
+                else:
+                    results[i] = outcome
+                    self.total_uploads += 1
+
+            if not failed:
+                break
+            if attempt == self.max_retries:
+                for i, error in failed:
+                    self.total_failed += 1
+                    logger.error(f"S3 업로드 최종 실패 ({uploads[i]['key']}): {error}")
+                break
+
+            self.total_retries += len(failed)
+            delay = self.retry_backoff_seconds * (2 ** attempt)
+            logger.warning(f"S3 업로드 {len(failed)}건 실패, {delay:.1f}초 후 재시도 "
+                           f"({attempt + 1}/{self.max_retries}): {failed[0][1]}")
+            pending = [i for i, _ in failed]
+            await asyncio.sleep(delay)
+
+        return results
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "in_flight_jobs": len(self._jobs),
+            "total_jobs": self.total_jobs,
+            "total_uploads": self.total_uploads,
+            "total_retries": self.total_retries,
+            "total_failed": self.total_failed,
+            "total_recovered": self.total_recovered,
+            "total_abandoned": self.total_abandoned,
+            "avg_job_ms": round(self._job_seconds_total / self.total_jobs * 1000, 2) if self.total_jobs else 0.0,
+        }
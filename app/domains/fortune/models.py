@@ -41,3 +41,30 @@ class FortuneHistory(Base):
     __table_args__ = (
         UniqueConstraint('user_id', 'fortune_date', name='uix_fortune_user_date'),
     )
+
+
+class FortunePool(Base):
+    """
+    날짜별로 미리 생성해 둔 기본 운세 (질문 없는 /api/fortune/today 요청용)
+    - 스케줄러가 전날 밤에 다음 날 풀을 생성, 서버 시작 시 오늘 풀이 없으면 생성
+    - 요청 시 hash(user_id + 날짜)로 슬롯을 골라 사용 (같은 날 같은 사용자는 항상 같은 운세)
+    """
+    __tablename__ = "fortune_pools"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # 기준 날짜 (YYYY-MM-DD, 한국 시간 기준)
+    fortune_date = Column(String(10), nullable=False, index=True)
+
+    # 풀 안에서의 순번 (0부터)
+    slot = Column(Integer, nullable=False)
+
+    score = Column(Integer, nullable=False)
+    status = Column(String(50), nullable=False)
+    message = Column(Text, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), default=get_now_kst)
+
+    __table_args__ = (
+        UniqueConstraint('fortune_date', 'slot', name='uix_fortune_pool_date_slot'),
+    )
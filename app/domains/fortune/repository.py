@@ -0,0 +1,83 @@
+# BACK-END/app/domains/fortune/repository.py
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from app.domains.fortune.models import FortuneHistory, FortunePool, get_now_kst
+from typing import List, Optional, Tuple
+
+
+class FortuneRepository:
+
+    async def get_history(self, db: AsyncSession, user_id: int, fortune_date: str) -> Optional[FortuneHistory]:
+        """사용자의 해당 날짜 운세 조회"""
+        result = await db.execute(
+            select(FortuneHistory).where(
+                FortuneHistory.user_id == user_id,
+                FortuneHistory.fortune_date == fortune_date,
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def upsert_history(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        fortune_date: str,
+        fortune: dict
+    ) -> Tuple[FortuneHistory, bool]:
+        """
+        오늘 운세 저장 (INSERT ... ON DUPLICATE KEY UPDATE 1문장, 동시 요청이 겹쳐도 unique 제약 오류 없음)
+        - 이미 저장된 운세가 있으면 아무것도 바꾸지 않음 (먼저 저장된 운세 유지)
+        - 반환: (실제로 저장되어 있는 운세, 이번 요청이 새로 저장했는지 여부)
+        """
+        stmt = mysql_insert(FortuneHistory).values(
+            user_id=user_id,
+            score=fortune["score"],
+            status=fortune["status"],
+            message=fortune["message"],
+            fortune_date=fortune_date,
+            created_at=get_now_kst(),
+        )
+        # 중복 시 id = id (변경 없음) → 새로 저장된 경우에만 lastrowid가 저장된 행의 id와 같음
+        # (rowcount는 드라이버의 FOUND_ROWS 설정에 따라 중복 시에도 1이 될 수 있어 사용하지 않음)
+        result = await db.execute(stmt.on_duplicate_key_update(id=FortuneHistory.id))
+        await db.commit()
+
+        stored = await self.get_history(db, user_id, fortune_date)
+        return stored, stored.id == result.lastrowid
+
+    async def get_pool(self, db: AsyncSession, fortune_date: str) -> List[FortunePool]:
+        """해당 날짜의 기본 운세 풀 (슬롯 순)"""
+        result = await db.execute(
+            select(FortunePool)
+            .where(FortunePool.fortune_date == fortune_date)
+            .order_by(FortunePool.slot.asc())
+        )
+        return result.scalars().all()
+
+    async def replace_pool(self, db: AsyncSession, fortune_date: str, fortunes: List[dict]) -> int:
+        """해당 날짜의 운세 풀을 통째로 교체 (한 트랜잭션: 교체 도중에도 이전 풀 또는 새 풀만 보임)"""
+        await db.execute(delete(FortunePool).where(FortunePool.fortune_date == fortune_date))
+        db.add_all([
+            FortunePool(
+                fortune_date=fortune_date,
+                slot=slot,
+                score=fortune["score"],
+                status=fortune["status"],
+                message=fortune["message"],
+            )
+            for slot, fortune in enumerate(fortunes)
+        ])
+        await db.commit()
+        return len(fortunes)
+
+    async def delete_pools_before(self, db: AsyncSession, fortune_date: str) -> int:
+        """지난 날짜의 운세 풀 삭제 (YYYY-MM-DD 문자열 비교)"""
+        result = await db.execute(delete(FortunePool).where(FortunePool.fortune_date < fortune_date))
+        await db.commit()
+        return result.rowcount
+
+
+# 싱글톤 인스턴스
+fortune_repository = FortuneRepository()
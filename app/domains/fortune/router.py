@@ -1,15 +1,13 @@
 # BACK-END/app/domains/fortune/router.py
 
-from fastapi import APIRouter, Query, Depends, HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from fastapi import APIRouter, Query, Depends
+from fastapi.responses import StreamingResponse
 from datetime import datetime
 import pytz
 
-from app.core.database import get_db
 from app.domains.auth.jwt_handler import verify_token
 from app.domains.fortune.service import fortune_service
-from app.domains.fortune.models import FortuneHistory
+from app.utils.sse import SSE_HEADERS
 
 router = APIRouter()
 
@@ -23,50 +21,30 @@ def _get_today_kst() -> str:
 async def get_fortune(
     q: str = Query(None, description="팡이에게 물어볼 고민"),
     user_id: int = Depends(verify_token),
-    db: AsyncSession = Depends(get_db),
 ):
     """
     오늘의 팡이 운세 조회 (하루 1회 제한)
-    - 오늘 이미 조회한 경우: 저장된 결과 반환
-    - 처음 조회하는 경우: Gemini API 호출 후 저장
+    - 오늘 이미 조회한 경우: 저장된 결과 반환 (캐시 적중 시 DB 조회 없음)
+    - 처음 조회하는 경우: 질문이 없으면 오늘 운세 풀에서 선택, 있으면 Gemini 호출 후 저장
+    - 같은 사용자의 동시 요청도 운세는 1번만 생성/저장
     """
-    today = _get_today_kst()
+    service = await fortune_service.aget()
+    return await service.get_today_fortune(user_id, _get_today_kst(), user_question=q)
 
-    # 오늘 이미 조회했는지 확인
-    result = await db.execute(
-        select(FortuneHistory).where(
-            FortuneHistory.user_id == user_id,
-            FortuneHistory.fortune_date == today,
-        )
-    )
-    existing = result.scalar_one_or_none()
 
-    if existing:
-        # 저장된 결과 반환
-        return {
-            "score": existing.score,
-            "status": existing.status,
-            "message": existing.message,
-            "already_viewed": True,
-        }
-
-    # 새 운세 생성
-    fortune = await fortune_service.generate_pangi_fortune(user_question=q)
-
-    # DB에 저장
-    new_record = FortuneHistory(
-        user_id=user_id,
-        score=fortune.get("score", 50),
-        status=fortune.get("status", ""),
-        message=fortune.get("message", ""),
-        fortune_date=today,
-    )
-    db.add(new_record)
-    await db.commit()
-
-    return {
-        "score": fortune.get("score"),
-        "status": fortune.get("status"),
-        "message": fortune.get("message"),
-        "already_viewed": False,
-    }
+@router.get("/today/stream")
+async def stream_fortune(
+    q: str = Query(None, description="팡이에게 물어볼 고민"),
+    user_id: int = Depends(verify_token),
+):
+    """
+    오늘의 팡이 운세 조회 (스트리밍, text/event-stream)
+    - delta: 생성 중인 문자열 필드(status / message)의 추가분 {"key", "text"} → 이어 붙여서 렌더링
+    - section: 완성된 필드 {"key", "value"}
+    - done: 저장된 결과 (/today 응답과 동일한 형식, 최종 표시 기준)
+    - error: 도중 실패 시 안내 메시지
+    - 오늘 이미 조회했거나 질문이 없으면 done만 전송
+    """
+    service = await fortune_service.aget()
+    events = service.stream_today_fortune(user_id, _get_today_kst(), user_question=q)
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
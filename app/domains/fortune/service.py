@@ -1,31 +1,279 @@
 # BACK-END/app/domains/fortune/service.py
 
+import asyncio
+import hashlib
 import json
 import logging
-import google.generativeai as genai
+import time
+from datetime import datetime, timedelta
+import pytz
 from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import LatencyTracker
+from app.core.resources import LazyResource
+from app.domains.fortune.repository import fortune_repository
+from app.utils.cache import TTLCache
+from app.utils.llm_gateway import llm_gateway
+from app.utils.partial_json import PartialJSONObjectParser
+from app.utils.single_flight import SingleFlight
+from app.utils.sse import detach_stream, sse_event
 
-# 로그 설정
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+KST = pytz.timezone('Asia/Seoul')
+
+# 같은 입력(기본 운세 / 정규화한 같은 질문)으로 동시에 들어온 생성 요청은 Gemini 호출 1번으로 공유
+# (아침 알림 직후 기본 운세 요청이 몰릴 때 업스트림 호출 수 절감)
+fortune_flights = SingleFlight("fortune")
+
+# (user_id, 날짜) → 오늘 운세 (KST 자정에 만료) → 재조회는 MySQL / Gemini 없이 응답
+fortune_cache = TTLCache(max_size=settings.FORTUNE_CACHE_MAX_SIZE, ttl_seconds=86400)
+
+# 같은 사용자의 첫 조회가 동시에 들어오면 (연속 탭) 조회/생성/저장을 1번만 실행
+fortune_view_flights = SingleFlight("fortune_view")
+
+FORTUNE_STREAM_ERROR_MESSAGE = "운세를 불러오지 못했습니다. 잠시 후 다시 시도해주세요."
+
+# 스트리밍 운세 응답 시간 (ttfb: 요청 시작 → 첫 생성 텍스트 전송, total: 저장 완료까지)
+fortune_stream_latency = {"ttfb": LatencyTracker(), "total": LatencyTracker()}
+
+
+def seconds_until_kst_midnight() -> float:
+    now = datetime.now(KST)
+    midnight = KST.localize(datetime.combine(now.date() + timedelta(days=1), datetime.min.time()))
+    return max(1.0, (midnight - now).total_seconds())
+
+
+def _fortune_fields(record) -> dict:
+    return {"score": record.score, "status": record.status, "message": record.message}
+
+
+def normalize_question(user_question: str | None) -> str | None:
+    """공백/대소문자 차이만 있는 질문은 같은 요청으로 취급 (빈 질문은 기본 운세)"""
+    if not user_question or not user_question.strip():
+        return None
+    return " ".join(user_question.split()).lower()
+
+
+def pool_slot(user_id: int, fortune_date: str, pool_size: int) -> int:
+    """hash(user_id + 날짜) → 풀 슬롯 (프로세스/워커와 무관하게 같은 값, 내장 hash()는 실행마다 달라 사용 불가)"""
+    digest = hashlib.sha256(f"{user_id}:{fortune_date}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % pool_size
+
+
 class FortuneService:
     def __init__(self):
+        # 무료 티어에서 가장 빠르고 효율적인 모델 선택 (호출은 공용 LLM 게이트웨이가 담당)
+        self.model_name = 'models/gemini-2.5-flash-lite'
+        # 오늘 기본 운세 풀 (날짜, 운세 목록) → 같은 날 반복 조회 시 DB 조회 생략
+        self._pool: tuple[str, list[dict]] | None = None
+
+    async def get_today_fortune(self, user_id: int, fortune_date: str, user_question: str | None = None) -> dict:
+        """
+        오늘의 운세 조회 (하루 1회 제한)
+        - 캐시 적중: MySQL / Gemini 없이 저장된 결과 반환
+        - 캐시 미스: DB 조회 → 없으면 생성 (기본 운세는 풀에서 선택) → INSERT ... ON DUPLICATE KEY로 저장
+        - 같은 사용자의 동시 첫 조회는 1번만 실행하고 결과 공유
+        반환: {"score", "status", "message", "already_viewed"}
+        """
+        key = (user_id, fortune_date)
+        cached = fortune_cache.get(key)
+        if cached is not None:
+            return {**cached, "already_viewed": True}
+
+        result = await fortune_view_flights.run(
+            key, lambda: self._load_or_create(user_id, fortune_date, user_question)
+        )
+        return dict(result)
+
+    async def _load_or_create(self, user_id: int, fortune_date: str, user_question: str | None) -> dict:
+        # 요청 세션과 분리 (먼저 온 요청의 연결이 끊겨도 함께 기다리던 요청은 결과를 받음)
+        async with AsyncSessionLocal() as db:
+            existing = await fortune_repository.get_history(db, user_id, fortune_date)
+            if existing is not None:
+                fortune, already_viewed = _fortune_fields(existing), True
+            else:
+                fortune = None
+                if normalize_question(user_question) is None:
+                    fortune = await self.draw_from_pool(db, user_id, fortune_date)
+                if fortune is None:
+                    fortune = await self.generate_pangi_fortune(user_question=user_question)
+                fortune = self._validate_fortune(fortune) or self._get_fallback_response()
+
+                # 다른 워커가 먼저 저장했다면 그 운세가 반환됨 (already_viewed=True)
+                stored, inserted = await fortune_repository.upsert_history(db, user_id, fortune_date, fortune)
+                fortune, already_viewed = _fortune_fields(stored), not inserted
+
+        fortune_cache.set((user_id, fortune_date), fortune, ttl_seconds=seconds_until_kst_midnight())
+        return {**fortune, "already_viewed": already_viewed}
+
+    def stream_today_fortune(self, user_id: int, fortune_date: str, user_question: str | None = None):
+        """
+        오늘의 운세 조회 (스트리밍, SSE 이벤트 문자열을 yield)
+        - 이미 조회했거나 질문이 없으면 (풀에서 선택) 생성 과정 없이 done 1개
+        - 질문이 있으면 Gemini 응답을 받는 대로 전달: delta(생성 중인 문자열 필드의 추가분) → section(완성된 필드)
+        - 응답이 끝나면 검증(실패 시 fallback) 후 저장, done으로 저장된 결과 전달
+        - 생성 / 저장은 요청과 분리된 Task로 실행 → 클라이언트가 중간에 끊어도 운세 기록 저장 (재조회 시 같은 운세)
+        - 도중 예외 발생 시 연결을 끊는 대신 error 이벤트로 알림
+        """
+        return detach_stream(self._stream_today_fortune(user_id, fortune_date, user_question),
+                             FORTUNE_STREAM_ERROR_MESSAGE, name="운세 스트리밍")
+
+    async def _stream_today_fortune(self, user_id: int, fortune_date: str, user_question: str | None):
+        key = (user_id, fortune_date)
+        cached = fortune_cache.get(key)
+        if cached is not None:
+            yield sse_event("done", {**cached, "already_viewed": True})
+            return
+
+        # 기본 운세(풀) / 같은 사용자의 조회가 진행 중이면 일반 조회 결과를 그대로 전달
+        if normalize_question(user_question) is None or fortune_view_flights.in_flight(key):
+            yield sse_event("done", await self.get_today_fortune(user_id, fortune_date, user_question))
+            return
+
+        async with AsyncSessionLocal() as db:
+            existing = await fortune_repository.get_history(db, user_id, fortune_date)
+        if existing is not None:
+            fortune = _fortune_fields(existing)
+            fortune_cache.set(key, fortune, ttl_seconds=seconds_until_kst_midnight())
+            yield sse_event("done", {**fortune, "already_viewed": True})
+            return
+
+        start = time.perf_counter()
+        first_sent = False
+        parser = PartialJSONObjectParser()
+        fields: dict = {}
+        sent_lengths: dict[str, int] = {}
+        try:
+            async for chunk in llm_gateway.stream(
+                self._build_prompt(user_question), model=self.model_name, json_mode=True, purpose="fortune_stream"
+            ):
+                events = []
+                for field, value in parser.feed(chunk):
+                    fields[field] = value
+                    events.append(sse_event("section", {"key": field, "value": value}))
+
+                partial = parser.partial_string()
+                if partial is not None:
+                    field, text = partial
+                    if len(text) > sent_lengths.get(field, 0):
+                        events.append(sse_event("delta", {"key": field, "text": text[sent_lengths.get(field, 0):]}))
+                        sent_lengths[field] = len(text)
+
+                if events and not first_sent:
+                    first_sent = True
+                    fortune_stream_latency["ttfb"].observe(time.perf_counter() - start)
+                for event in events:
+                    yield event
+        except Exception as e:
+            # 데드라인 초과 / 서킷 open / 연결 오류 → 일반 조회와 같이 fallback 저장
+            logger.error(f"FortuneService 스트리밍 오류: {str(e)}")
+            if not first_sent:
+                fortune_stream_latency["ttfb"].observe(time.perf_counter() - start, error=True)
+
+        fortune = (self._validate_fortune(fields) if parser.done else None) or self._get_fallback_response()
+
+        # 스트림이 끝날 때 저장 (요청 세션은 응답 시작 후 닫힐 수 있으므로 별도 세션 사용)
+        # 다른 요청이 먼저 저장했다면 그 운세가 최종 결과 (already_viewed=True)
+        async with AsyncSessionLocal() as db:
+            stored, inserted = await fortune_repository.upsert_history(db, user_id, fortune_date, fortune)
+        fortune = _fortune_fields(stored)
+        fortune_cache.set(key, fortune, ttl_seconds=seconds_until_kst_midnight())
+        fortune_stream_latency["total"].observe(time.perf_counter() - start)
+        yield sse_event("done", {**fortune, "already_viewed": not inserted})
+
+    async def draw_from_pool(self, db, user_id: int, fortune_date: str) -> dict | None:
+        """미리 생성된 기본 운세 풀에서 사용자 몫 선택 (Gemini 호출 없음), 풀이 없으면 None"""
+        if self._pool is not None and self._pool[0] == fortune_date:
+            pool = self._pool[1]
+        else:
+            rows = await fortune_repository.get_pool(db, fortune_date)
+            pool = [{"score": row.score, "status": row.status, "message": row.message} for row in rows]
+            if pool:
+                self._pool = (fortune_date, pool)
+        if not pool:
+            return None
+        return dict(pool[pool_slot(user_id, fortune_date, len(pool))])
+
+    async def build_pool(self, size: int, batch_size: int, concurrency: int) -> list[dict]:
+        """
+        기본 운세 풀 생성 (스케줄러용)
+        - 호출 1번에 batch_size개씩 생성, 동시에 최대 concurrency개 호출
+        - 실패한 배치는 건너뜀 (생성된 만큼만 반환)
+        """
+        limit = asyncio.Semaphore(max(1, concurrency))
+
+        async def generate(count: int) -> list[dict]:
+            async with limit:
+                return await self.generate_fortune_batch(count)
+
+        counts = [min(batch_size, size - offset) for offset in range(0, size, max(1, batch_size))]
+        batches = await asyncio.gather(*(generate(count) for count in counts))
+        return [fortune for batch in batches for fortune in batch]
+
+    async def generate_fortune_batch(self, count: int) -> list[dict]:
+        """서로 다른 기본 운세 count개를 한 번의 호출로 생성 (형식이 잘못된 항목은 제외)"""
+        prompt = (
+            f"주거 환경의 곰팡이와 쾌적함을 테마로 한 오늘의 운세를 서로 다른 내용으로 {count}개 작성하세요.\n"
+            "말투는 겉으로 무심하지만 속으로 챙겨주는 츤데레 가족(아버지/어머니) 느낌을 유지하고, "
+            "점수는 20~95 사이에서 골고루 분포시키세요.\n\n"
+            "반드시 아래의 JSON 형식을 지켜서 답변하세요. 다른 설명은 생략하세요.\n"
+            "{\"fortunes\": [{\"score\": 0~100, \"status\": \"상태 요약\", \"message\": \"가족의 마음이 담긴 답변\"}]}"
+        )
         try:
-            # 설정 파일에서 API 키 로드
-            genai.configure(api_key=settings.GEMINI_API_KEY)
-            
-            # 무료 티어에서 가장 빠르고 효율적인 모델 선택
-            self.model = genai.GenerativeModel('models/gemini-2.5-flash-lite')
-            # logger.info("Gemini API 설정 완료 (models/gemini-2.5-flash)")
+            response_text = await llm_gateway.generate(
+                prompt, model=self.model_name, json_mode=True, purpose="fortune_pool"
+            )
+            data = json.loads(response_text)
         except Exception as e:
-            # API 키가 없거나 설정 실패 시 로그 출력
-            logger.error(f"Gemini 초기화 실패: {str(e)}")
+            logger.error(f"운세 풀 배치 생성 실패: {str(e)}")
+            return []
+
+        items = data.get("fortunes", []) if isinstance(data, dict) else data
+        fortunes = [fortune for fortune in map(self._validate_fortune, items or []) if fortune]
+        return fortunes[:count]
+
+    @staticmethod
+    def _validate_fortune(item) -> dict | None:
+        if not isinstance(item, dict):
+            return None
+        try:
+            score = min(max(int(item["score"]), 0), 100)
+            status = str(item["status"]).strip()[:50]
+            message = str(item["message"]).strip()
+        except (KeyError, TypeError, ValueError):
+            return None
+        if not status or not message:
+            return None
+        return {"score": score, "status": status, "message": message}
 
     async def generate_pangi_fortune(self, user_question: str = None):
         """
         사용자 질문 수신 시 곰팡이 테마의 가족 페르소나로 답변 생성
+        - 같은 입력으로 진행 중인 생성이 있으면 그 결과를 함께 사용 (호출 측마다 별도 dict 반환)
         """
+        key = normalize_question(user_question)
+        result = await fortune_flights.run(key, lambda: self._generate(user_question if key else None))
+        return dict(result)
+
+    async def _generate(self, user_question: str | None):
+        try:
+            # 비동기 호출 (이벤트 루프 블로킹 없음), JSON 응답 강제
+            # 데드라인 초과 / 서킷 open 시 예외 → fallback 응답
+            response_text = await llm_gateway.generate(
+                self._build_prompt(user_question), model=self.model_name, json_mode=True, purpose="fortune"
+            )
+
+            result = json.loads(response_text)
+            # logger.info("Gemini 응답 성공")
+            return result
+
+        except Exception as e:
+            logger.error(f"FortuneService 오류: {str(e)}")
+            return self._get_fallback_response()
+
+    @staticmethod
+    def _build_prompt(user_question: str | None) -> str:
         if user_question:
             # logger.info(f"질문 수신: {user_question}")
             system_instruction = (
@@ -39,28 +287,12 @@ class FortuneService:
             # logger.info("질문 없음: 기본 운세 모드")
             prompt = "주거 환경의 곰팡이와 쾌적함을 테마로 한 오늘의 운세를 작성하세요."
 
-        final_prompt = (
+        return (
             f"{prompt}\n\n"
             "반드시 아래의 JSON 형식을 지켜서 답변하세요. 다른 설명은 생략하세요.\n"
             "{\"score\": 0~100, \"status\": \"상태 요약\", \"message\": \"가족의 마음이 담긴 답변\"}"
         )
 
-        try:
-            # logger.info("Gemini API 호출 시도 중...")
-            # JSON 응답 강제 설정 (라이브러리 0.7.2+ 필요)
-            response = self.model.generate_content(
-                final_prompt,
-                generation_config={"response_mime_type": "application/json"}
-            )
-            
-            result = json.loads(response.text)
-            # logger.info("Gemini 응답 성공")
-            return result
-
-        except Exception as e:
-            logger.error(f"FortuneService 오류: {str(e)}")
-            return self._get_fallback_response()
-
     def _get_fallback_response(self):
         return {
             "score": 50,
@@ -68,4 +300,4 @@ class FortuneService:
             "message": "서버에 포자가 날려 연결이 어렵구나. 밥 든든히 먹고 잠시 뒤에 다시 와라."
         }
 
-fortune_service = FortuneService()
\ No newline at end of file
+fortune_service: LazyResource[FortuneService] = LazyResource("fortune_service", FortuneService)
@@ -51,7 +51,8 @@ class NotificationService:
 
         # 3. FCM 전송 (토큰이 있고 알림 수신 활성화된 경우)
         if fcm_info and fcm_info.get("fcm_token") and fcm_info.get("notification_enabled"):
-            success = await fcm_service.send_push(
+            fcm = await fcm_service.aget()
+            success = await fcm.send_push(
                 token=fcm_info["fcm_token"],
                 title=title,
                 body=message,
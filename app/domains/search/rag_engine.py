@@ -1,26 +1,30 @@
 # BACK-END/app/domains/search/rag_engine.py
-import google.generativeai as genai
-from app.core.config import settings
+from app.core.resources import LazyResource
+from app.utils.llm_gateway import llm_gateway
 import logging
-import asyncio
 import json
 import time
 
 logger = logging.getLogger(__name__)
 
+# 진단 리포트 프롬프트 버전 (프롬프트 수정 시 올리면 리포트 캐시가 새로 생성됨)
+REPORT_PROMPT_VERSION = "v1"
+
+# Gemini 호출 실패 시 반환하는 fallback 리포트의 insight 문구 (캐시 저장 제외 판별용)
+FALLBACK_INSIGHT = "현재 상세 분석 서비스를 이용할 수 없습니다."
+
+
+def is_fallback_report(report_text: str) -> bool:
+    """Gemini 호출 실패로 생성된 fallback 리포트인지 여부"""
+    return FALLBACK_INSIGHT in report_text
+
 class RAGEngine:
     def __init__(self):
-        genai.configure(api_key=settings.GEMINI_API_KEY)
-        self.model = genai.GenerativeModel(
-            'models/gemini-2.5-flash-lite',
-            generation_config={"response_mime_type": "application/json"}
-        )
+        # Gemini 호출은 공용 LLM 게이트웨이가 담당 (데드라인 / 동시 호출 상한 / 서킷 브레이커)
+        self.model_name = 'models/gemini-2.5-flash-lite'
 
-    async def generate_diagnosis_report(self, mold_name: str, probability: float, context_text: str) -> str:
-        start_time = time.time()
-        
-        # [로그 강화] 입력 Prompt 구성 (로그에 남길 내용)
-        prompt = f"""
+    def _build_prompt(self, mold_name: str, probability: float, context_text: str) -> str:
+        return f"""
         당신은 건물 위생 및 곰팡이 관리 전문가 'QUAIL AI'입니다.
         아래 정보를 바탕으로 사용자에게 제공할 진단 리포트를 작성하세요.
 
@@ -41,9 +45,28 @@ class RAGEngine:
         }}
         """
 
+    def fallback_report(self, mold_name: str) -> str:
+        """Gemini 호출 실패 시 반환하는 기본 리포트 (JSON 문자열)"""
+        fallback_response = {
+            "diagnosis": f"{mold_name}이(가) 의심됩니다. (AI 분석 지연)",
+            "FrequentlyVisitedAreas": ["분석 불가"],
+            "solution": ["기본 환기 및 청소 권장"],
+            "prevention": ["습도 관리 요망"],
+            "insight": FALLBACK_INSIGHT
+        }
+        return json.dumps(fallback_response, ensure_ascii=False)
+
+    async def generate_diagnosis_report(self, mold_name: str, probability: float, context_text: str) -> str:
+        start_time = time.time()
+        
+        # [로그 강화] 입력 Prompt 구성 (로그에 남길 내용)
+        prompt = self._build_prompt(mold_name, probability, context_text)
+
         try:
-            # Gemini 호출
-            response = await asyncio.to_thread(self.model.generate_content, prompt)
+            # Gemini 호출 (JSON 응답 강제)
+            response_text = await llm_gateway.generate(
+                prompt, model=self.model_name, json_mode=True, purpose="rag_report"
+            )
             duration = time.time() - start_time
 
             # [핵심] 성공 시: 입력(Prompt 일부)과 출력(Response) 내용을 모두 기록
@@ -53,11 +76,11 @@ class RAGEngine:
                 "target": mold_name,
                 "duration": f"{duration:.3f}s",
                 "input_context_preview": context_text[:200] + "..." if len(context_text) > 200 else context_text,
-                "output_response": response.text  # 제미나이가 뱉은 전체 답변
+                "output_response": response_text  # 제미나이가 뱉은 전체 답변
             }
             logger.info(json.dumps(success_log, ensure_ascii=False))
 
-            return response.text
+            return response_text
 
         except Exception as e:
             duration = time.time() - start_time
@@ -73,13 +96,44 @@ class RAGEngine:
             logger.error(json.dumps(error_log, ensure_ascii=False), exc_info=True)
             
             # Fallback 응답
-            fallback_response = {
-                "diagnosis": f"{mold_name}이(가) 의심됩니다. (AI 분석 지연)",
-                "FrequentlyVisitedAreas": ["분석 불가"],
-                "solution": ["기본 환기 및 청소 권장"],
-                "prevention": ["습도 관리 요망"],
-                "insight": "현재 상세 분석 서비스를 이용할 수 없습니다."
-            }
-            return json.dumps(fallback_response, ensure_ascii=False)
+            return self.fallback_report(mold_name)
+
+    async def stream_diagnosis_report(self, mold_name: str, probability: float, context_text: str):
+        """
+        진단 리포트를 Gemini 스트리밍으로 생성하며 텍스트 청크를 순서대로 yield
+        - 첫 청크 전에 실패하면 fallback 리포트를 통째로 yield,
+          도중에 실패하면 중단 (호출 측에서 완성되지 않은 JSON을 fallback으로 대체)
+        """
+        start_time = time.time()
+        prompt = self._build_prompt(mold_name, probability, context_text)
+
+        chunks, first_chunk_at = [], None
+        try:
+            async for chunk in llm_gateway.stream(
+                prompt, model=self.model_name, json_mode=True, purpose="rag_stream"
+            ):
+                if first_chunk_at is None:
+                    first_chunk_at = time.time()
+                chunks.append(chunk)
+                yield chunk
+        except Exception as e:
+            logger.error(json.dumps({
+                "event": "GEMINI_STREAM_FAILED",
+                "target": mold_name,
+                "duration": f"{time.time() - start_time:.3f}s",
+                "received_chars": sum(len(c) for c in chunks),
+                "error_cause": str(e),
+            }, ensure_ascii=False))
+            if not chunks:
+                yield self.fallback_report(mold_name)
+            return
+
+        logger.info(json.dumps({
+            "event": "GEMINI_STREAM_SUCCESS",
+            "target": mold_name,
+            "ttfb": f"{(first_chunk_at or time.time()) - start_time:.3f}s",
+            "duration": f"{time.time() - start_time:.3f}s",
+            "output_response": "".join(chunks),
+        }, ensure_ascii=False))
 
-rag_engine = RAGEngine()
\ No newline at end of file
+rag_engine: LazyResource[RAGEngine] = LazyResource("rag_engine", RAGEngine)
@@ -0,0 +1,68 @@
+# BACK-END/app/domains/search/report_cache.py
+
+import logging
+
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# RAG 리포트를 생성하는 곰팡이 클래스 (G0 / UNCLASSIFIED는 고정 문구 사용)
+REPORT_CLASSES = ["G1_Stachybotrys", "G2_Penicillium", "G3_WhiteMold", "G4_Serratia"]
+
+# 신뢰도 구간 크기 (%) → 60~69, 70~79, ... 구간별로 리포트 1개 공유
+CONFIDENCE_BUCKET_SIZE = 10
+
+# 캐시 워밍 대상 구간 (진단 서비스의 CONFIDENCE_THRESHOLD 60% 이상)
+WARM_BUCKETS = [60, 70, 80, 90]
+
+
+def confidence_bucket(probability: float) -> int:
+    """신뢰도(%) → 구간 하한 (예: 67.3 → 60, 100.0 → 90)"""
+    clamped = min(max(probability, 0.0), 100.0 - 1e-6)
+    return int(clamped // CONFIDENCE_BUCKET_SIZE) * CONFIDENCE_BUCKET_SIZE
+
+
+def bucket_probability(bucket: int) -> float:
+    """구간 대표 신뢰도 (리포트 생성 프롬프트에 사용, 예: 60 → 65.0)"""
+    return bucket + CONFIDENCE_BUCKET_SIZE / 2
+
+
+class ReportCache:
+    """
+    곰팡이 클래스별 RAG 진단 리포트 캐시
+    - 키: (클래스, 신뢰도 구간, 프롬프트 버전, 도감 버전)
+    - 프롬프트나 도감(mold_wiki) 내용이 바뀌면 키가 달라져 자동으로 새 리포트 생성
+    """
+
+    def __init__(self, ttl_seconds: float = 7 * 86400):
+        self._cache = TTLCache(max_size=256, ttl_seconds=ttl_seconds)
+        self.dictionary_version = "unknown"
+        self.invalidations = 0
+
+    def key(self, mold_name: str, bucket: int, prompt_version: str) -> tuple:
+        return (mold_name, bucket, prompt_version, self.dictionary_version)
+
+    def get(self, key: tuple) -> str | None:
+        return self._cache.get(key)
+
+    def set(self, key: tuple, report_text: str):
+        self._cache.set(key, report_text)
+
+    def set_dictionary_version(self, version: str):
+        """도감 버전 갱신 (바뀌었으면 이전 리포트 전체 무효화)"""
+        if version != self.dictionary_version:
+            if self.dictionary_version != "unknown":
+                logger.info(f"📚 도감 버전 변경 ({self.dictionary_version} → {version}): 리포트 캐시 무효화")
+            self.dictionary_version = version
+            self.invalidate()
+
+    def invalidate(self):
+        self._cache.clear()
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        return {
+            **self._cache.stats(),
+            "dictionary_version": self.dictionary_version,
+            "invalidations": self.invalidations,
+        }
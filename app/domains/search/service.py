@@ -1,21 +1,105 @@
 # BACK-END/app/domains/search/service.py
 from app.domains.search.vector_store import vector_store
-from app.domains.search.rag_engine import rag_engine
+from app.domains.search.rag_engine import rag_engine, is_fallback_report, REPORT_PROMPT_VERSION
+from app.domains.search.report_cache import (
+    ReportCache, REPORT_CLASSES, WARM_BUCKETS, confidence_bucket, bucket_probability
+)
+from app.core.config import settings
+from app.utils.single_flight import SingleFlight
+import asyncio
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 
 class SearchService:
-    
+    def __init__(self):
+        # 클래스 x 신뢰도 구간별 진단 리포트 캐시 (Gemini 호출은 캐시 미스/무효화 시에만)
+        self.report_cache = ReportCache(ttl_seconds=settings.RAG_REPORT_CACHE_TTL_SECONDS)
+        # 같은 캐시 키(클래스 x 구간 x 프롬프트/도감 버전) 리포트 생성이 동시에 몰리면 Gemini 호출 1번으로 공유
+        self.report_flights = SingleFlight("rag_report")
+
     async def get_mold_solution_with_rag(self, mold_name: str, probability: float) -> dict:
         """
-        RAG 파이프라인: [검색] -> [생성]
+        RAG 파이프라인: [캐시 조회] -> [검색] -> [생성]
+        - 리포트는 신뢰도 구간 단위로 공유 (프롬프트에는 구간 대표 신뢰도 사용)
+        """
+        bucket = confidence_bucket(probability)
+        cache_key = self.report_cache.key(mold_name, bucket, REPORT_PROMPT_VERSION)
+
+        cached_report = self.report_cache.get(cache_key)
+        if cached_report is not None:
+            logger.info(f"⚡ RAG 리포트 캐시 적중: {mold_name} (구간: {bucket}%)")
+            return {
+                "mold_name": mold_name,
+                "probability": probability,
+                "rag_solution": cached_report
+            }
+
+        logger.info(f"🔎 RAG 프로세스 시작: {mold_name} (신뢰도: {probability}%, 구간: {bucket}%)")
+        rag_solution = await self.report_flights.run(
+            cache_key, lambda: self._generate_and_cache(mold_name, bucket, cache_key)
+        )
+
+        return {
+            "mold_name": mold_name,
+            "probability": probability,
+            "rag_solution": rag_solution
+        }
+
+    async def stream_mold_solution_with_rag(self, mold_name: str, probability: float):
+        """
+        RAG 파이프라인 스트리밍 버전
+        - {"delta": 텍스트 청크}를 생성되는 대로 yield, 마지막에 {"report": 완성된 리포트 JSON 문자열}
+        - 캐시 적중 시 캐시된 리포트를 청크 1개로 즉시 전달
+        - 생성 도중 실패해 JSON이 완성되지 않으면 최종 리포트는 fallback으로 대체 (캐시 저장 제외)
         """
-        logger.info(f"🔎 RAG 프로세스 시작: {mold_name} (신뢰도: {probability}%)")
+        bucket = confidence_bucket(probability)
+        cache_key = self.report_cache.key(mold_name, bucket, REPORT_PROMPT_VERSION)
+
+        cached_report = self.report_cache.get(cache_key)
+        if cached_report is not None:
+            logger.info(f"⚡ RAG 리포트 캐시 적중: {mold_name} (구간: {bucket}%)")
+            yield {"delta": cached_report}
+            yield {"report": cached_report}
+            return
+
+        # 같은 리포트를 이미 생성 중이면 (일반 요청 / 캐시 워밍) 그 결과를 청크 1개로 전달
+        if self.report_flights.in_flight(cache_key):
+            report = await self.report_flights.join(cache_key)
+            yield {"delta": report}
+            yield {"report": report}
+            return
+
+        logger.info(f"🔎 RAG 스트리밍 시작: {mold_name} (신뢰도: {probability}%, 구간: {bucket}%)")
+        context_text = await self._retrieve_context(mold_name)
+
+        engine = await rag_engine.aget()
+        chunks = []
+        async for chunk in engine.stream_diagnosis_report(mold_name, bucket_probability(bucket), context_text):
+            chunks.append(chunk)
+            yield {"delta": chunk}
+
+        report = "".join(chunks)
+        try:
+            json.loads(report)
+        except json.JSONDecodeError:
+            report = engine.fallback_report(mold_name)
 
+        if not is_fallback_report(report):
+            self.report_cache.set(cache_key, report)
+        yield {"report": report}
+
+    async def _retrieve_context(self, mold_name: str) -> str:
         # 1. Retrieve: 벡터 DB에서 관련 정보 검색
         # 유사도가 높은 상위 1개 문서만 참조
-        search_results = vector_store.search(query=mold_name, n_results=1)
+        try:
+            store = await vector_store.aget()
+            search_results = await store.search_async(query=mold_name, n_results=1)
+        except Exception as e:
+            # Chroma / Gemini 초기화 실패 시에도 리포트는 일반 지식으로 생성
+            logger.error(f"벡터 DB 초기화 실패: {e}")
+            search_results = []
         
         context_text = ""
         # 검색 결과가 있는지 확인 (documents[0]이 리스트 형태임)
@@ -25,18 +109,72 @@ class SearchService:
         else:
             logger.warning("⚠️ DB에서 정확한 정보를 찾지 못했습니다. (Gemini 일반 지식 활용 예정)")
             context_text = "데이터베이스에 해당 곰팡이의 상세 정보가 없습니다. 일반적인 곰팡이 지식을 활용해 답변해주세요."
+        return context_text
+
+    async def _generate_and_cache(self, mold_name: str, bucket: int, cache_key: tuple) -> str:
+        report = await self._generate_report(mold_name, bucket)
+        # Gemini 실패로 생성된 fallback 리포트는 캐시하지 않음 (다음 요청에서 재시도)
+        if not is_fallback_report(report):
+            self.report_cache.set(cache_key, report)
+        return report
+
+    async def _generate_report(self, mold_name: str, bucket: int) -> str:
+        context_text = await self._retrieve_context(mold_name)
 
         # 2. Generate: Gemini가 리포트 작성
-        rag_solution = await rag_engine.generate_diagnosis_report(
+        engine = await rag_engine.aget()
+        return await engine.generate_diagnosis_report(
             mold_name=mold_name,
-            probability=probability,
+            probability=bucket_probability(bucket),
             context_text=context_text
         )
 
-        return {
-            "mold_name": mold_name,
-            "probability": probability,
-            "rag_solution": rag_solution
-        }
+    async def refresh_dictionary_version(self):
+        """도감(mold_wiki) 인메모리 인덱스 재로드 + 버전 확인 → 바뀌었으면 리포트 캐시 무효화"""
+        try:
+            store = await vector_store.aget()
+            version = await asyncio.to_thread(store.load_index)
+            self.report_cache.set_dictionary_version(version)
+        except Exception as e:
+            logger.error(f"도감 버전 확인 실패: {e}")
+
+    async def prime_retrieval(self) -> dict:
+        """
+        검색 경로 준비 (서버 시작 시 readiness 단계)
+        - 도감 인메모리 인덱스 로드 + 리포트 대상 클래스의 검색어 임베딩을 캐시에 확보
+        - 이후 RAG 요청의 검색 단계는 네트워크 없이 처리 (리포트 생성 자체는 warm_report_cache가 담당)
+        """
+        await self.refresh_dictionary_version()
+        store = await vector_store.aget()
+        for mold_name in REPORT_CLASSES:
+            await store.search_async(query=mold_name, n_results=1)
+        return {"index_version": store.index_version, "queries": len(REPORT_CLASSES)}
+
+    async def warm_report_cache(self, force: bool = False):
+        """
+        클래스 x 신뢰도 구간 리포트 미리 생성 (서버 시작 시 / 스케줄러)
+        - force=False: 캐시에 없는 항목만 생성
+        - force=True: 전체 재생성 (생성 중에는 기존 리포트 계속 사용, 성공한 항목만 교체)
+        - Gemini 호출량 제한을 고려해 순차 실행
+        """
+        await self.refresh_dictionary_version()
+
+        generated, failed = 0, 0
+        for mold_name in REPORT_CLASSES:
+            for bucket in WARM_BUCKETS:
+                cache_key = self.report_cache.key(mold_name, bucket, REPORT_PROMPT_VERSION)
+                if not force and self.report_cache.get(cache_key) is not None:
+                    continue
+
+                # 같은 리포트를 생성 중인 요청이 있으면 합류 (성공 시 캐시 저장은 _generate_and_cache가 담당)
+                report = await self.report_flights.run(
+                    cache_key, lambda: self._generate_and_cache(mold_name, bucket, cache_key)
+                )
+                if is_fallback_report(report):
+                    failed += 1
+                    continue
+                generated += 1
+
+        logger.info(f"🔥 RAG 리포트 캐시 워밍 완료 (생성: {generated}, 실패: {failed}, force={force})")
 
-search_service = SearchService()
\ No newline at end of file
+search_service = SearchService()
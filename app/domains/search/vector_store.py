@@ -1,25 +1,46 @@
 # BACK-END/app/domains/search/vector_store.py
 
-import chromadb
-import google.generativeai as genai
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import numpy as np
 from app.core.config import settings
+from app.core.resources import LazyResource
 import logging
 
-# 로그 설정 (터미널에 에러가 보이도록 설정)
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+EMBEDDING_MODEL = "models/gemini-embedding-001"
+
 class VectorStore:
     def __init__(self):
+        # chromadb / Gemini SDK는 import만으로도 무거우므로 인스턴스 생성 시점에 로드
+        import chromadb
+        import google.generativeai as genai
+
         genai.configure(api_key=settings.GEMINI_API_KEY)
+        self._genai = genai
         self.client = chromadb.PersistentClient(path="./chroma_db")
         self.collection = self.client.get_or_create_collection(name="mold_wiki")
 
+        # 검색어 임베딩 캐시 ((모델, 검색어) → 벡터), 파일로 영구 저장
+        # 검색어가 곰팡이 클래스명 몇 개뿐이라 재시작 후에도 Gemini 임베딩 호출 없이 재사용
+        self.query_cache_path = settings.QUERY_EMBEDDING_CACHE_PATH
+        self._query_cache: dict[str, list[float]] = self._load_query_cache()
+        self._query_cache_lock = threading.Lock()
+
+        # mold_wiki 인메모리 코사인 인덱스 (Chroma가 원본, load_index()로 갱신)
+        # (ids, documents, metadatas, L2 정규화된 (문서 수, 차원) 행렬) 튜플을 통째로 교체
+        self._index: tuple[list[str], list[str], list[dict], np.ndarray] | None = None
+        self.index_version: str | None = None
+
     def embed_text(self, text: str):
         try:
             # [수정] 최신 임베딩 모델 사용 ('models/' 접두사 필수)
-            result = genai.embed_content(
-                model="models/gemini-embedding-001",
+            result = self._genai.embed_content(
+                model=EMBEDDING_MODEL,
                 content=text,
                 task_type="retrieval_document",
                 title="Mold Dictionary"
@@ -40,27 +61,127 @@ class VectorStore:
                 metadatas=[metadata]
             )
             logger.info(f"✅ 벡터 저장 완료: {doc_id}")
+            # 컬렉션이 바뀌었으므로 인메모리 인덱스는 다음 검색 때 다시 로드
+            self._index = None
             return True
         else:
             logger.error(f"❌ 벡터 저장 실패: {doc_id}")
             return False
 
+    def load_index(self) -> str:
+        """
+        mold_wiki 컬렉션 전체를 읽어 인메모리 코사인 인덱스 구성
+        반환: 컬렉션 내용(id + 문서) 기반 버전 해시 (도감 재적재 시 변경됨)
+        """
+        data = self.collection.get(include=["embeddings", "documents", "metadatas"])
+        ids = list(data["ids"])
+        embeddings = data["embeddings"]
+
+        if ids:
+            matrix = np.asarray(embeddings, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix = matrix / np.maximum(norms, 1e-12)
+        else:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+
+        digest = hashlib.sha1()
+        for doc_id, document in sorted(zip(ids, data["documents"])):
+            digest.update(doc_id.encode("utf-8"))
+            digest.update((document or "").encode("utf-8"))
+
+        self._index = (ids, list(data["documents"]), list(data["metadatas"]), matrix)
+        self.index_version = digest.hexdigest()[:12]
+        logger.info(f"📚 mold_wiki 인메모리 인덱스 로드 완료 ({len(ids)}건, 버전: {self.index_version})")
+        return self.index_version
+
+    def _load_query_cache(self) -> dict[str, list[float]]:
+        if not os.path.exists(self.query_cache_path):
+            return {}
+        try:
+            with open(self.query_cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"⚠️ 검색어 임베딩 캐시 로드 실패 (새로 생성): {e}")
+            return {}
+
+    def _save_query_cache(self):
+        """임시 파일에 쓴 뒤 교체 (쓰기 도중 종료되어도 기존 캐시 유지)"""
+        tmp_path = self.query_cache_path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.query_cache_path)), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._query_cache, f, ensure_ascii=False)
+            os.replace(tmp_path, self.query_cache_path)
+        except Exception as e:
+            logger.warning(f"⚠️ 검색어 임베딩 캐시 저장 실패: {e}")
+
+    @staticmethod
+    def _query_cache_key(query: str) -> str:
+        return f"{EMBEDDING_MODEL}|retrieval_query|{query}"
+
+    def embed_query(self, query: str) -> list[float]:
+        """검색어 임베딩 (캐시 우선, 미스 시에만 Gemini 호출 후 파일에 저장)"""
+        key = self._query_cache_key(query)
+        cached = self._query_cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = self._genai.embed_content(
+            model=EMBEDDING_MODEL,
+            content=query,
+            task_type="retrieval_query"
+        )
+        vector = result['embedding']
+
+        with self._query_cache_lock:
+            self._query_cache[key] = vector
+            self._save_query_cache()
+        return vector
+
+    def _search_index(self, query_vector: list[float], n_results: int) -> dict:
+        """인메모리 코사인 인덱스 검색 (Chroma query() 결과와 같은 형식으로 반환)"""
+        ids, documents, metadatas, matrix = self._index
+
+        query = np.asarray(query_vector, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+
+        if matrix.shape[0] == 0:
+            top = np.array([], dtype=np.int64)
+            similarities = np.array([], dtype=np.float32)
+        else:
+            similarities = matrix @ query
+            top = np.argsort(-similarities)[:n_results]
+
+        return {
+            "ids": [[ids[i] for i in top]],
+            "documents": [[documents[i] for i in top]],
+            "metadatas": [[metadatas[i] for i in top]],
+            "distances": [[float(1.0 - similarities[i]) for i in top]],  # 코사인 거리
+        }
+
+    async def search_async(self, query: str, n_results: int = 3):
+        """
+        이벤트 루프용 검색
+        - 임베딩 캐시 + 인메모리 인덱스가 준비된 경우: 네트워크 없이 바로 계산 (1ms 미만)
+        - 그 외(Gemini 임베딩 / Chroma 조회 필요): 스레드에서 실행하여 루프 블로킹 방지
+        """
+        if self._index is not None and self._query_cache_key(query) in self._query_cache:
+            return self.search(query, n_results)
+        return await asyncio.to_thread(self.search, query, n_results)
+
     def search(self, query: str, n_results: int = 3):
-        # 검색용 쿼리 임베딩 (task_type 변경)
+        # 검색용 쿼리 임베딩 (task_type 변경, 캐시 우선)
         try:
-            result = genai.embed_content(
-                model="models/gemini-embedding-001",
-                content=query,
-                task_type="retrieval_query"
-            )
-            query_vector = result['embedding']
-            
-            return self.collection.query(
-                query_embeddings=[query_vector],
-                n_results=n_results
-            )
+            query_vector = self.embed_query(query)
+
+            # 인메모리 인덱스가 없으면 Chroma에서 로드 (Chroma가 원본)
+            if self._index is None:
+                self.load_index()
+
+            return self._search_index(query_vector, n_results)
         except Exception as e:
             logger.error(f"검색어 임베딩 실패: {e}")
             return []
 
-vector_store = VectorStore()
\ No newline at end of file
+# 첫 사용 시 생성 (Chroma 디스크 오픈 / Gemini 설정을 import 시점에서 분리, lifespan이 미리 생성)
+vector_store: LazyResource[VectorStore] = LazyResource("vector_store", VectorStore)
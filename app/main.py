@@ -9,10 +9,12 @@ from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from secrets import compare_digest
 from fastapi.openapi.docs import get_swagger_ui_html
 
-from app.core.logger import setup_logging
 from app.middleware import APIAccessLoggerMiddleware
 
+from app.core.config import settings
 from app.core.lifespan import lifespan
+from app.core.metrics import collect_stats
+from app.core.health import readiness
 
 # 라우터 임포트
 from app.domains.user.router import router as user_router
@@ -84,13 +86,16 @@ async def get_open_api_endpoint(username: str = Depends(get_current_username)):
     from fastapi.openapi.utils import get_openapi
     return get_openapi(title=app.title, version=app.version, routes=app.routes)
 
-# 로깅 설정 활성화
-setup_logging()
+# 로깅 설정은 lifespan 시작 시 활성화 (import만으로 logs/ 폴더 / 핸들러가 생기지 않도록)
 logger = logging.getLogger("api_monitor")
 
 # [Source 2] 정적 파일 마운트 (로컬 이미지 서빙)
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
+# 로컬 스토리지 백엔드 사용 시 업로드 파일 서빙 (S3 대신 디스크에 저장한 진단 이미지)
+if settings.STORAGE_BACKEND == "local":
+    app.mount("/local-storage", StaticFiles(directory=settings.LOCAL_STORAGE_DIR, check_dir=False), name="local-storage")
+
 # public 라우터
 app.include_router(auth_router, prefix="/api/auth", tags=["Auth"])
 
@@ -108,9 +113,75 @@ app.include_router(iot_router, prefix="/api/iot", tags=["IoT"], dependencies=[De
 app.include_router(game_router, prefix="/api/game", tags=["Game"], dependencies=[Depends(verify_token)])
 
 
+@app.get("/internal/stats", include_in_schema=False)
+async def get_internal_stats(username: str = Depends(get_current_username)):
+    """운영 통계 조회 (추론 큐 대기 수, 배치 크기 분포 등) - 관리자 전용"""
+    return collect_stats()
+
+@app.delete("/internal/rag-report-cache", include_in_schema=False)
+async def invalidate_rag_report_cache(username: str = Depends(get_current_username)):
+    """RAG 진단 리포트 캐시 무효화 (도감/프롬프트 수동 수정 후) - 관리자 전용"""
+    from app.domains.search.service import search_service
+    search_service.report_cache.invalidate()
+    return {"status": "ok", "message": "RAG 리포트 캐시를 비웠습니다."}
+
+@app.get("/internal/models", include_in_schema=False)
+async def get_models(username: str = Depends(get_current_username)):
+    """로드된 진단 모델 / 활성 모델 / shadow 평가 결과 조회 - 관리자 전용"""
+    from app.core.lifespan import ml_models
+    return ml_models["models"].stats()
+
+@app.post("/internal/models/{variant}/activate", include_in_schema=False)
+async def activate_model(variant: str, username: str = Depends(get_current_username)):
+    """활성 진단 모델 무중단 교체 (미로드 시 로드 후 교체) - 관리자 전용"""
+    from app.core.lifespan import ml_models
+    try:
+        model = await ml_models["models"].activate(variant)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "ok", "active": model.variant, "model_version": model.model_version}
+
+@app.post("/internal/models/{variant}/shadow", include_in_schema=False)
+async def start_shadow_model(variant: str, sample_rate: float = 0.1, username: str = Depends(get_current_username)):
+    """shadow 평가 시작: 요청 중 sample_rate 비율을 이 모델로 백그라운드 재추론 - 관리자 전용"""
+    from app.core.lifespan import ml_models
+    try:
+        model = await ml_models["models"].set_shadow(variant, sample_rate)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "ok", "shadow": model.variant, "sample_rate": ml_models["models"].shadow_sample_rate}
+
+@app.delete("/internal/models/shadow", include_in_schema=False)
+async def stop_shadow_model(username: str = Depends(get_current_username)):
+    """shadow 평가 중지 - 관리자 전용"""
+    from app.core.lifespan import ml_models
+    await ml_models["models"].set_shadow(None)
+    return {"status": "ok", "shadow": None}
+
+@app.delete("/internal/models/{variant}", include_in_schema=False)
+async def unload_model(variant: str, username: str = Depends(get_current_username)):
+    """활성 / shadow가 아닌 모델 언로드 (메모리 회수) - 관리자 전용"""
+    from app.core.lifespan import ml_models
+    try:
+        await ml_models["models"].unload(variant)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "ok", "unloaded": variant}
+
 @app.get("/")
 def health_check():
     return {"status": "ok", "message": "QUAIL Server is Running~~!!"}
+
+@app.get("/health/live", include_in_schema=False)
+def liveness_check():
+    """liveness: 프로세스가 응답 가능한지만 확인 (워밍업 중에도 200)"""
+    return {"status": "ok"}
+
+@app.get("/health/ready", include_in_schema=False)
+def readiness_check():
+    """readiness: 모델 워밍업(p99 안정) + 검색 경로 준비가 끝나야 200, 그 전에는 503 (로드밸런서 헬스체크용)"""
+    snapshot = readiness.snapshot()
+    return JSONResponse(status_code=200 if snapshot["ready"] else 503, content=snapshot)
 # get post put delete 
 
 
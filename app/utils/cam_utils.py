@@ -5,19 +5,19 @@ import numpy as np
 from PIL import Image, ImageDraw
 
 
-def draw_bbox_on_image(image_bytes: bytes, bbox: list[int]) -> io.BytesIO:
+def draw_bbox_on_image(image_rgb: np.ndarray, bbox: list[int]) -> io.BytesIO:
     """
-    원본 이미지에 빨간 바운딩박스를 그려 BytesIO로 반환
+    추론에 사용한 224x224 이미지에 빨간 바운딩박스를 그려 BytesIO로 반환
 
     Args:
-        image_bytes: 원본 이미지의 bytes
+        image_rgb: ImageContext.decode()로 얻은 224x224 RGB uint8 배열 (재디코딩 없음)
         bbox: [x_min, y_min, x_max, y_max] (224x224 기준 좌표)
 
     Returns:
         BytesIO: 바운딩박스가 그려진 JPEG 이미지
     """
-    img = Image.open(io.BytesIO(image_bytes)).convert("RGB")
-    img = img.resize((224, 224), Image.BILINEAR)
+    # fromarray는 별도 버퍼를 만들므로 공유 중인 원본 배열은 변경되지 않음
+    img = Image.fromarray(image_rgb, mode="RGB")
 
     draw = ImageDraw.Draw(img)
     x_min, y_min, x_max, y_max = bbox
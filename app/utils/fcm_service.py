@@ -1,8 +1,7 @@
 # BACK-END/app/utils/fcm_service.py
 
-import firebase_admin
-from firebase_admin import credentials, messaging
 from app.core.config import settings
+from app.core.resources import LazyResource
 import logging
 
 logger = logging.getLogger(__name__)
@@ -22,6 +21,9 @@ class FCMService:
             logger.warning("⚠️ FIREBASE_CREDENTIALS_PATH가 설정되지 않음. FCM 비활성화")
             return
 
+        import firebase_admin
+        from firebase_admin import credentials
+
         try:
             # 이미 초기화되었는지 확인
             firebase_admin.get_app()
@@ -64,6 +66,8 @@ class FCMService:
             logger.warning("⚠️ FCM 서비스 비활성화 상태")
             return False
 
+        from firebase_admin import messaging
+
         try:
             # data 값들을 문자열로 변환 (FCM은 문자열만 지원)
             str_data = {}
@@ -129,6 +133,8 @@ class FCMService:
         if not tokens:
             return {"success_count": 0, "failure_count": 0, "failed_tokens": []}
 
+        from firebase_admin import messaging
+
         try:
             # data 값들을 문자열로 변환
             str_data = {}
@@ -176,5 +182,6 @@ class FCMService:
             }
 
 
-# 싱글톤 인스턴스
-fcm_service = FCMService()
+# 싱글톤 인스턴스 (첫 사용 시 Firebase Admin SDK 초기화, lifespan이 미리 생성)
+fcm_service: LazyResource[FCMService] = LazyResource("fcm_service", FCMService)
+
@@ -0,0 +1,110 @@
+# BACK-END/app/utils/image_context.py
+
+import hashlib
+import io
+import time
+from contextlib import contextmanager
+
+import numpy as np
+from fastapi import UploadFile
+from PIL import Image
+
+# 모델 입력 / CAM 좌표 기준 크기
+TARGET_SIZE = 224
+
+# 축소 리샘플링 시 reduce()로 먼저 정수배 축소할 비율 (큰 PNG/WebP 디코딩 후 리사이즈 가속)
+REDUCING_GAP = 3.0
+
+
+def decode_rgb(fp, size: int = TARGET_SIZE, fast: bool = True) -> np.ndarray:
+    """
+    이미지 파일 객체 → size x size RGB uint8 배열
+
+    fast=True이면 큰 원본을 끝까지 풀 해상도로 디코딩하지 않음
+    - JPEG: draft 모드로 DCT 단계에서 1/2, 1/4, 1/8 축소 디코딩 (결과는 size 이상 유지)
+      → 12MP 사진도 수백 px 수준으로 디코딩되어 시간/메모리가 크게 줄어듦
+    - 그 외 포맷: reduce()로 정수배 축소 후 최종 bilinear 리사이즈
+    """
+    image = Image.open(fp)
+    if fast and image.format == "JPEG":
+        image.draft("RGB", (size, size))
+    image = image.convert("RGB")
+
+    if fast:
+        image = image.resize((size, size), Image.BILINEAR, reducing_gap=REDUCING_GAP)
+    else:
+        image = image.resize((size, size), Image.BILINEAR)
+    return np.asarray(image, dtype=np.uint8)
+
+
+class ImageContext:
+    """
+    업로드 이미지 1건을 한 번만 디코딩해서 추론 전처리, CAM 바운딩박스 렌더링, S3 업로드에 공유
+    - data: 원본 bytes (불변, 업로드 시 복사 없이 재사용)
+    - rgb: 224x224 RGB uint8 배열 (최초 decode() 호출 시 1회 생성)
+    - timings: 단계별 소요 시간 (초)
+    """
+
+    def __init__(self, data: bytes, filename: str | None = None, content_type: str | None = None,
+                 fast_decode: bool = True):
+        self.data = data
+        self.fast_decode = fast_decode
+        self.filename = filename
+        self.content_type = content_type or "image/jpeg"
+        self.file_ext = filename.split(".")[-1] if filename and "." in filename else "jpg"
+
+        self.rgb: np.ndarray | None = None
+        self.timings: dict[str, float] = {}
+        self._sha256: str | None = None
+
+    @classmethod
+    async def from_upload(cls, file: UploadFile, fast_decode: bool = True) -> "ImageContext":
+        """UploadFile → ImageContext (파일 내용을 1회만 읽음)"""
+        start = time.perf_counter()
+        data = await file.read()
+        context = cls(data, filename=file.filename, content_type=file.content_type, fast_decode=fast_decode)
+        context.timings["read"] = time.perf_counter() - start
+        return context
+
+    @contextmanager
+    def stage(self, name: str):
+        """with ctx.stage("inference"): ... 형태로 단계별 소요 시간 기록 (같은 이름은 누적)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + (time.perf_counter() - start)
+
+    def decode(self) -> np.ndarray:
+        """원본 bytes → 224x224 RGB uint8 배열 (최초 1회만 디코딩, 이후 캐시 반환)"""
+        if self.rgb is None:
+            with self.stage("decode"):
+                self.rgb = decode_rgb(io.BytesIO(self.data), fast=self.fast_decode)
+        return self.rgb
+
+    @property
+    def sha256(self) -> str:
+        """원본 bytes의 SHA-256 (완전히 동일한 파일 재업로드 판별용, 디코딩 불필요)"""
+        if self._sha256 is None:
+            self._sha256 = hashlib.sha256(self.data).hexdigest()
+        return self._sha256
+
+    def perceptual_hash(self) -> int:
+        """
+        224x224 배열 기반 64bit dHash (재인코딩/리사이즈된 같은 사진 판별용)
+        - 9x8 흑백 축소 후 좌우 인접 픽셀 밝기 비교 → 64개 비트
+        """
+        gray = Image.fromarray(self.decode(), mode="RGB").convert("L").resize((9, 8), Image.BILINEAR)
+        pixels = np.asarray(gray, dtype=np.int16)
+        bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+        return int(sum(1 << i for i, bit in enumerate(bits) if bit))
+
+    def stream(self) -> io.BytesIO:
+        """
+        업로드용 파일 객체 반환
+        BytesIO(bytes)는 쓰기 전까지 원본 버퍼를 공유하므로 원본 bytes를 복사하지 않음
+        """
+        return io.BytesIO(self.data)
+
+    def timings_ms(self) -> dict[str, float]:
+        return {name: round(seconds * 1000, 2) for name, seconds in self.timings.items()}
@@ -0,0 +1,345 @@
+# BACK-END/app/utils/llm_gateway.py
+# LLM(Gemini) 공용 비동기 게이트웨이
+# - RAG 리포트 / 팡이 운세 / 도감 키워드 추출이 모두 이 게이트웨이를 거쳐 호출
+# - 호출별 데드라인 (대기열 대기 시간 포함), 동시 호출 수 상한, 서킷 브레이커, 용도별 지연/오류 통계
+# - 백엔드: "gemini" (SDK 비동기 클라이언트, gRPC 채널 공유) / "http" (benchmarks/fake_llm_server.py 등 로컬 서버)
+
+import asyncio
+import logging
+import time
+from typing import AsyncIterator
+
+from app.core.config import settings
+from app.core.metrics import LatencyTracker
+from app.core.resources import LazyResource
+
+logger = logging.getLogger(__name__)
+
+
+class LLMError(Exception):
+    """LLM 호출 실패 (호출 측은 기존 fallback 응답으로 대체)"""
+
+
+class LLMTimeout(LLMError):
+    """데드라인 초과 (동시 호출 대기 + 응답 대기)"""
+
+
+class LLMQueueTimeout(LLMTimeout):
+    """동시 호출 슬롯 대기 중 데드라인 초과 (업스트림을 호출하지 않았으므로 서킷 브레이커 실패로 세지 않음)"""
+
+
+class LLMUnavailable(LLMError):
+    """서킷 브레이커가 열려 있어 호출하지 않음 (즉시 fallback)"""
+
+
+class CircuitBreaker:
+    """
+    연속 실패 횟수 기반 서킷 브레이커
+    - closed: 정상 호출, 연속 실패가 failure_threshold회에 도달하면 open
+    - open: reset_seconds 동안 호출하지 않고 즉시 실패 (Gemini 장애 시 요청마다 데드라인까지 기다리지 않음)
+    - half_open: reset_seconds 경과 후 시험 호출 1건만 허용 → 성공하면 closed, 실패하면 다시 open
+    - 이벤트 루프(단일 스레드)에서만 사용하므로 별도 lock 없음
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self.times_opened = 0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.reset_seconds:
+                return False
+            self.state = "half_open"
+        # half_open: 시험 호출 1건만 통과
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def record_success(self):
+        if self.state != "closed":
+            logger.info("🟢 LLM 서킷 브레이커 닫힘 (시험 호출 성공)")
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            if self.state != "open":
+                self.times_opened += 1
+                logger.warning(f"🔴 LLM 서킷 브레이커 열림 (연속 실패 {self.consecutive_failures}회, "
+                               f"{self.reset_seconds:.0f}초 동안 즉시 fallback)")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def release_probe(self):
+        """시험 호출이 성공/실패 판정 없이 끝난 경우 (스트림 소비 중단 등) 다음 시험 호출 허용"""
+        self._probe_in_flight = False
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+        }
+
+
+class GeminiBackend:
+    """google-generativeai 비동기 클라이언트 (SDK가 gRPC 채널을 프로세스 전역으로 공유, 모델 객체는 캐시)"""
+
+    def __init__(self, api_key: str | None):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self._genai = genai
+        self._models: dict[tuple[str, bool], object] = {}
+
+    def _model(self, model: str, json_mode: bool):
+        key = (model, json_mode)
+        if key not in self._models:
+            generation_config = {"response_mime_type": "application/json"} if json_mode else None
+            self._models[key] = self._genai.GenerativeModel(model, generation_config=generation_config)
+        return self._models[key]
+
+    async def generate(self, model: str, prompt: str, json_mode: bool) -> str:
+        response = await self._model(model, json_mode).generate_content_async(prompt)
+        return response.text
+
+    async def stream(self, model: str, prompt: str, json_mode: bool) -> AsyncIterator[str]:
+        response = await self._model(model, json_mode).generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            yield chunk.text
+
+    async def close(self):
+        pass
+
+
+class HTTPBackend:
+    """
+    로컬 LLM 서버용 백엔드 (부하 테스트: benchmarks/fake_llm_server.py)
+    - POST /generate {"model", "prompt", "json"} → {"text"}
+    - POST /stream (같은 요청) → 텍스트 청크 스트림
+    - httpx 연결 풀 공유 (keep-alive, max_connections 상한)
+    """
+
+    def __init__(self, base_url: str, max_connections: int):
+        import httpx
+
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=None,  # 데드라인은 게이트웨이가 관리
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def generate(self, model: str, prompt: str, json_mode: bool) -> str:
+        response = await self._client.post("/generate", json={"model": model, "prompt": prompt, "json": json_mode})
+        response.raise_for_status()
+        return response.json()["text"]
+
+    async def stream(self, model: str, prompt: str, json_mode: bool) -> AsyncIterator[str]:
+        async with self._client.stream(
+            "POST", "/stream", json={"model": model, "prompt": prompt, "json": json_mode}
+        ) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_text():
+                if chunk:
+                    yield chunk
+
+    async def close(self):
+        await self._client.aclose()
+
+
+def create_llm_backend():
+    if settings.LLM_BACKEND == "http":
+        return HTTPBackend(settings.LLM_HTTP_BASE_URL, settings.LLM_MAX_CONNECTIONS)
+    if settings.LLM_BACKEND == "gemini":
+        return GeminiBackend(settings.GEMINI_API_KEY)
+    raise ValueError(f"지원하지 않는 LLM_BACKEND: {settings.LLM_BACKEND}")
+
+
+class LLMGateway:
+    """
+    LLM 공용 호출 창구 (모듈 전역 1개, 생성 비용 없음 → 백엔드는 첫 호출 / lifespan에서 생성)
+    - generate(): 전체 응답 텍스트 1개
+    - stream(): 텍스트 청크를 생성되는 대로 yield (청크 간 대기에도 데드라인 적용)
+    - 실패 시 LLMError 계열 예외 → 호출 측이 기존 fallback 응답 반환
+    """
+
+    def __init__(self, max_concurrency: int, timeout_seconds: float,
+                 failure_threshold: int, reset_seconds: float):
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout_seconds = timeout_seconds
+        self.breaker = CircuitBreaker(failure_threshold, reset_seconds)
+        self._backend: LazyResource = LazyResource("llm_backend", create_llm_backend)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        # 운영 통계
+        self.in_flight = 0
+        self.waiting = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.rejected = 0  # 서킷 브레이커 open으로 호출하지 않은 건수
+        self.queue_timeouts = 0  # 동시 호출 슬롯을 얻지 못해 데드라인을 넘긴 건수 (로컬 과부하)
+        self.queue_wait = LatencyTracker()
+        self.latency: dict[str, LatencyTracker] = {}
+
+    def _tracker(self, purpose: str) -> LatencyTracker:
+        if purpose not in self.latency:
+            self.latency[purpose] = LatencyTracker()
+        return self.latency[purpose]
+
+    def _check_breaker(self, purpose: str):
+        if not self.breaker.allow():
+            self.rejected += 1
+            raise LLMUnavailable(f"LLM 서킷 브레이커 open ({purpose})")
+
+    def _record_failure(self, purpose: str, error: Exception, elapsed: float):
+        self._tracker(purpose).observe(elapsed, error=True)
+        if isinstance(error, LLMQueueTimeout):
+            # 로컬 대기열 포화는 업스트림 장애가 아님 → 브레이커에 반영하지 않음 (시험 호출이었다면 다음 호출에 양보)
+            self.queue_timeouts += 1
+            self.breaker.release_probe()
+            return
+        if isinstance(error, LLMTimeout):
+            self.timeouts += 1
+        else:
+            self.errors += 1
+        self.breaker.record_failure()
+
+    async def _acquire(self, deadline: float):
+        """동시 호출 슬롯 확보 (데드라인까지 대기, 대기 시간도 호출 데드라인에 포함)"""
+        start = time.monotonic()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), max(0.0, deadline - start))
+        except asyncio.TimeoutError:
+            raise LLMQueueTimeout("LLM 동시 호출 대기 시간 초과")
+        finally:
+            self.waiting -= 1
+        self.queue_wait.observe(time.monotonic() - start)
+        self.in_flight += 1
+
+    def _release(self):
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    async def generate(self, prompt: str, *, model: str, json_mode: bool = False,
+                       timeout: float | None = None, purpose: str = "default") -> str:
+        self._check_breaker(purpose)
+        start = time.monotonic()
+        deadline = start + (timeout or self.timeout_seconds)
+        try:
+            backend = await self._backend.aget()
+            await self._acquire(deadline)
+            try:
+                text = await asyncio.wait_for(
+                    backend.generate(model, prompt, json_mode), max(0.0, deadline - time.monotonic())
+                )
+            finally:
+                self._release()
+        except asyncio.TimeoutError:
+            error = LLMTimeout(f"LLM 응답 데드라인 초과 ({purpose}, {deadline - start:.1f}초)")
+            self._record_failure(purpose, error, time.monotonic() - start)
+            raise error
+        except LLMError as e:
+            self._record_failure(purpose, e, time.monotonic() - start)
+            raise
+        except Exception as e:
+            self._record_failure(purpose, e, time.monotonic() - start)
+            raise LLMError(str(e)) from e
+        except asyncio.CancelledError:
+            # 호출 측 취소 (클라이언트 연결 종료 등): 성공/실패로 치지 않음
+            self.breaker.release_probe()
+            raise
+
+        self.breaker.record_success()
+        self._tracker(purpose).observe(time.monotonic() - start)
+        return text
+
+    async def stream(self, prompt: str, *, model: str, json_mode: bool = False,
+                     timeout: float | None = None, purpose: str = "default") -> AsyncIterator[str]:
+        """
+        스트리밍 호출: 첫 청크까지 / 이후 청크 사이 대기 모두 timeout 이내여야 함
+        - 소비 측이 중간에 멈추면(aclose) 업스트림 스트림도 닫고 슬롯 반환
+        """
+        self._check_breaker(purpose)
+        timeout = timeout or self.timeout_seconds
+        start = time.monotonic()
+        acquired, finished = False, False
+        try:
+            backend = await self._backend.aget()
+            await self._acquire(start + timeout)
+            acquired = True
+
+            chunks = backend.stream(model, prompt, json_mode)
+            try:
+                deadline = start + timeout
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(anext(chunks), max(0.0, deadline - time.monotonic()))
+                    except StopAsyncIteration:
+                        break
+                    deadline = time.monotonic() + timeout
+                    yield chunk
+            finally:
+                await chunks.aclose()
+            finished = True
+        except asyncio.TimeoutError:
+            error = LLMTimeout(f"LLM 스트림 데드라인 초과 ({purpose}, 청크 간 {timeout:.1f}초)")
+            self._record_failure(purpose, error, time.monotonic() - start)
+            raise error
+        except LLMError as e:
+            self._record_failure(purpose, e, time.monotonic() - start)
+            raise
+        except Exception as e:
+            self._record_failure(purpose, e, time.monotonic() - start)
+            raise LLMError(str(e)) from e
+        finally:
+            if acquired:
+                self._release()
+            if not finished:
+                self.breaker.release_probe()
+
+        self.breaker.record_success()
+        self._tracker(purpose).observe(time.monotonic() - start)
+
+    async def aclose(self):
+        """백엔드 연결 정리 (서버 종료 / 스크립트 종료 시), 다음 호출에서 다시 생성"""
+        if self._backend.initialized:
+            await self._backend.get().close()
+        self._backend.reset()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    def stats(self) -> dict:
+        return {
+            "backend": settings.LLM_BACKEND,
+            "max_concurrency": self.max_concurrency,
+            "timeout_seconds": self.timeout_seconds,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "queue_timeouts": self.queue_timeouts,
+            "breaker": self.breaker.stats(),
+            "queue_wait": self.queue_wait.snapshot(),
+            "latency": {purpose: tracker.snapshot() for purpose, tracker in self.latency.items()},
+        }
+
+
+llm_gateway = LLMGateway(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    timeout_seconds=settings.LLM_TIMEOUT_SECONDS,
+    failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+    reset_seconds=settings.LLM_BREAKER_RESET_SECONDS,
+)
@@ -0,0 +1,103 @@
+# BACK-END/app/utils/partial_json.py
+
+import json
+import re
+from typing import Any
+
+# 문자열 끝의 역슬래시 + 잘린 \uXXXX 시퀀스 (홀수 개의 역슬래시면 이스케이프가 아직 완성되지 않음)
+_TRAILING_ESCAPE = re.compile(r"(\\+)(u[0-9a-fA-F]{0,3})?$")
+
+
+class PartialJSONObjectParser:
+    """
+    LLM이 스트리밍으로 생성하는 JSON 객체를 청크 단위로 해석
+    - feed(): 새로 완성된 최상위 필드 (key, value) 목록 반환 → 섹션 단위로 바로 전송 가능
+    - partial_string(): 지금 생성 중인 최상위 문자열 값의 앞부분 → 글자 단위 점진 렌더링용
+    - 전체 텍스트를 다시 파싱하지 않고, 이전 청크까지 스캔한 위치부터 이어서 상태를 갱신
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.done = False  # 최상위 객체가 닫혔는지 여부
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._phase = "key"  # 깊이 1에서: key → colon → value
+        self._key: str | None = None
+        self._token_start: int | None = None  # 현재 키 문자열 / 값의 시작 위치
+
+    def feed(self, chunk: str) -> list[tuple[str, Any]]:
+        self.text += chunk
+        completed = []
+
+        while self._pos < len(self.text) and not self.done:
+            i, ch = self._pos, self.text[self._pos]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._phase == "key":
+                        self._key = json.loads(self.text[self._token_start:i + 1])
+                        self._phase = "colon"
+                continue
+
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                    self._phase = "key"
+                continue
+
+            if self._depth == 1:
+                if self._phase == "key":
+                    if ch == '"':
+                        self._in_string = True
+                        self._token_start = i
+                    elif ch == "}":
+                        self.done = True
+                    continue
+                if self._phase == "colon":
+                    if ch == ":":
+                        self._phase = "value"
+                        self._token_start = None
+                    continue
+                # phase == "value"
+                if self._token_start is None:
+                    if ch.isspace():
+                        continue
+                    self._token_start = i
+                if ch in ",}":
+                    value = json.loads(self.text[self._token_start:i])
+                    completed.append((self._key, value))
+                    self._phase, self._key, self._token_start = "key", None, None
+                    if ch == "}":
+                        self.done = True
+                    continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+
+        return completed
+
+    def partial_string(self) -> tuple[str, str] | None:
+        """생성 중인 최상위 문자열 값 → (key, 지금까지의 내용), 해당 없으면 None"""
+        if not (self._in_string and self._depth == 1 and self._phase == "value" and self._token_start is not None):
+            return None
+
+        raw = self.text[self._token_start + 1:]
+        match = _TRAILING_ESCAPE.search(raw)
+        if match and len(match.group(1)) % 2 == 1:
+            raw = raw[:match.end(1) - 1]  # 완성되지 않은 이스케이프는 다음 청크까지 보류
+        try:
+            return self._key, json.loads(f'"{raw}"')
+        except json.JSONDecodeError:
+            return None
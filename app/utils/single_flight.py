@@ -0,0 +1,66 @@
+# BACK-END/app/utils/single_flight.py
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    같은 키로 동시에 들어온 비동기 작업을 1번만 실행하고 결과를 공유 (request coalescing)
+    - 첫 요청(leader)이 작업을 Task로 시작, 진행 중에 들어온 같은 키 요청은 그 Task 결과를 기다림
+    - 작업은 요청과 분리된 Task로 실행 → 기다리던 요청이 취소(연결 종료)되어도 나머지 요청은 결과를 받음
+    - 작업이 끝나면 키를 바로 제거 (결과 보관은 하지 않음, 캐시는 호출 측 담당)
+    - 이벤트 루프(단일 스레드)에서 사용하는 것을 전제로 하므로 별도 lock 없음
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._tasks: dict[Hashable, asyncio.Task] = {}
+
+        # 운영 통계
+        self.calls = 0      # 실제로 실행한 작업 수 (업스트림 호출)
+        self.coalesced = 0  # 진행 중인 작업에 합류해 생략된 호출 수
+        self.failures = 0
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._tasks
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._tasks.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.calls += 1
+            task = asyncio.ensure_future(func())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done, key=key: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    async def join(self, key: Hashable) -> Any | None:
+        """진행 중인 작업이 있으면 결과를 기다려 반환, 없으면 None (직접 실행하지 않는 호출용)"""
+        task = self._tasks.get(key)
+        if task is None:
+            return None
+        self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # 기다리던 요청이 모두 취소된 경우에도 "exception was never retrieved" 경고가 남지 않도록 확인
+        if not task.cancelled() and task.exception() is not None:
+            self.failures += 1
+            logger.warning(f"⚠️ [{self.name}] 공유 작업 실패: {task.exception()}")
+
+    def stats(self) -> dict:
+        total = self.calls + self.coalesced
+        return {
+            "in_flight": len(self._tasks),
+            "upstream_calls": self.calls,
+            "coalesced": self.coalesced,
+            "saved_ratio": round(self.coalesced / total, 3) if total else 0.0,
+            "failures": self.failures,
+        }
@@ -0,0 +1,53 @@
+# BACK-END/app/utils/sse.py
+
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator
+
+logger = logging.getLogger(__name__)
+
+# 요청과 분리되어 실행 중인 스트림 Task (클라이언트 연결과 무관하게 끝까지 실행, GC 방지용 참조)
+_detached_streams: set[asyncio.Task] = set()
+
+# 스트리밍 응답 공통 헤더 (프록시/Nginx 버퍼링 방지)
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Server-Sent Events 메시지 1개 (data는 한 줄 JSON)"""
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+def detach_stream(events: AsyncIterator[str], error_message: str, name: str = "스트리밍") -> AsyncIterator[str]:
+    """
+    이벤트 생성(LLM 응답 → DB 저장 등)을 요청과 분리된 Task로 바로 시작하고,
+    Task가 만든 이벤트를 읽어 전달하는 제너레이터 반환
+    - 클라이언트 연결이 끊겨 제너레이터가 닫혀도 Task는 끝까지 실행 (시작된 스트림의 저장이 반드시 완료됨)
+    - 도중 예외 발생 시 연결을 끊는 대신 error 이벤트({"message": error_message})로 알림
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    finished = object()
+
+    async def produce():
+        try:
+            async for event in events:
+                queue.put_nowait(event)
+        except Exception as e:
+            logger.error(f"{name} 실패: {e}", exc_info=True)
+            queue.put_nowait(sse_event("error", {"message": error_message}))
+        finally:
+            queue.put_nowait(finished)
+
+    async def consume():
+        while (event := await queue.get()) is not finished:
+            yield event
+
+    task = asyncio.create_task(produce())
+    _detached_streams.add(task)
+    task.add_done_callback(_detached_streams.discard)
+    return consume()
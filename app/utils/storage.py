@@ -1,11 +1,30 @@
 # BACK-END/app/utils/storage.py
 
+import asyncio
 import boto3
+from abc import ABC, abstractmethod
 import uuid
 import json
 import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
 from fastapi import UploadFile
 from app.core.config import settings
+from app.core.metrics import LatencyTracker
+
+
+def folder_key(label: str, file_uuid: str, folder_type: str = "dataset", file_ext: str = "jpg") -> str:
+    """라벨 폴더 S3 key (dataset: 원본, gradcam: CAM 이미지)"""
+    if folder_type == "gradcam":
+        return f"gradcam/{label}/{file_uuid}_cam.{file_ext}"
+    return f"dataset/{label}/{file_uuid}.{file_ext}"
+
+
+def sidecar_key(label: str, file_uuid: str) -> str:
+    """JSON sidecar S3 key"""
+    return f"dataset/{label}/{file_uuid}.json"
+
 
 class StorageClient:
     def __init__(self):
@@ -56,10 +75,7 @@ class StorageClient:
         Returns:
             S3 URL
         """
-        if folder_type == "gradcam":
-            s3_key = f"gradcam/{label}/{file_uuid}_cam.{file_ext}"
-        else:
-            s3_key = f"dataset/{label}/{file_uuid}.{file_ext}"
+        s3_key = folder_key(label, file_uuid, folder_type, file_ext)
 
         self.s3_client.upload_fileobj(
             file_bytes,
@@ -68,6 +84,10 @@ class StorageClient:
             ExtraArgs={'ContentType': content_type}
         )
 
+        return self.object_url(s3_key)
+
+    def object_url(self, s3_key: str) -> str:
+        """S3 key → public URL (ap-northeast-2 기준)"""
         return f"https://{self.bucket_name}.s3.{settings.AWS_REGION_NAME}.amazonaws.com/{s3_key}"
 
     def upload_json(self, json_data: dict, label: str, file_uuid: str) -> str:
@@ -82,7 +102,7 @@ class StorageClient:
         Returns:
             S3 URL
         """
-        s3_key = f"dataset/{label}/{file_uuid}.json"
+        s3_key = sidecar_key(label, file_uuid)
 
         self.s3_client.put_object(
             Bucket=self.bucket_name,
@@ -91,4 +111,152 @@ class StorageClient:
             ContentType='application/json'
         )
 
-        return f"https://{self.bucket_name}.s3.{settings.AWS_REGION_NAME}.amazonaws.com/{s3_key}"
+        return self.object_url(s3_key)
+
+
+class StorageBackend(ABC):
+    """
+    비동기 스토리지 백엔드 공통 인터페이스 (S3 / 로컬 디스크)
+    - 앱 전체에서 인스턴스 1개를 공유 (lifespan에서 생성, close()로 정리)
+    - 작업별(put / put_many / delete) 지연 시간을 LatencyTracker로 기록
+    - 하위 클래스는 object_url / _put_sync / _delete_sync를 반드시 구현 (누락 시 생성 시점에 TypeError)
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self.latency = {op: LatencyTracker() for op in ("put", "put_many", "delete")}
+
+    @abstractmethod
+    def object_url(self, key: str) -> str:
+        ...
+
+    @abstractmethod
+    def _put_sync(self, key: str, body: bytes, content_type: str):
+        ...
+
+    @abstractmethod
+    def _delete_sync(self, key: str):
+        ...
+
+    async def _offload(self, func, *args):
+        return await asyncio.to_thread(func, *args)
+
+    async def put(self, key: str, body: bytes, content_type: str = "application/octet-stream") -> str:
+        """객체 1개 저장 후 URL 반환"""
+        with self.latency["put"].time():
+            await self._offload(self._put_sync, key, body, content_type)
+        return self.object_url(key)
+
+    async def put_many(self, items: list[tuple[str, bytes, str]]) -> list[str | Exception]:
+        """
+        여러 객체를 동시에 저장 (items: (key, body, content_type) 목록)
+        반환: 항목 순서대로 URL 또는 실패 시 예외 객체 (일부 실패해도 나머지는 계속 진행)
+        """
+        with self.latency["put_many"].time():
+            return await asyncio.gather(
+                *(self.put(key, body, content_type) for key, body, content_type in items),
+                return_exceptions=True,
+            )
+
+    async def delete(self, key: str):
+        with self.latency["delete"].time():
+            await self._offload(self._delete_sync, key)
+
+    async def close(self):
+        pass
+
+    def stats(self) -> dict:
+        return {"backend": self.name, **{op: tracker.snapshot() for op, tracker in self.latency.items()}}
+
+
+class S3StorageBackend(StorageBackend):
+    """
+    S3 백엔드: boto3 클라이언트 1개 + 연결 풀을 앱 전체에서 공유
+    - 요청마다 boto3.client()를 만들던 비용(자격 증명 로드, 엔드포인트 해석, TLS 연결) 제거
+    - boto3 호출은 블로킹이므로 전용 스레드 풀에서 실행 (풀 크기 = 연결 풀 크기)
+    - 일시적 오류는 botocore standard retry 모드로 재시도
+    """
+
+    name = "s3"
+
+    def __init__(self, bucket_name: str, region_name: str, max_connections: int = 10):
+        super().__init__()
+        self.bucket_name = bucket_name
+        self.region_name = region_name
+        self.max_connections = max(1, max_connections)
+        self.s3_client = boto3.client(
+            's3',
+            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+            region_name=region_name,
+            config=Config(max_pool_connections=self.max_connections, retries={"mode": "standard"}),
+        )
+        self._pool = ThreadPoolExecutor(max_workers=self.max_connections, thread_name_prefix="s3")
+
+    def object_url(self, key: str) -> str:
+        return f"https://{self.bucket_name}.s3.{self.region_name}.amazonaws.com/{key}"
+
+    async def _offload(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, func, *args)
+
+    def _put_sync(self, key: str, body: bytes, content_type: str):
+        self.s3_client.put_object(Bucket=self.bucket_name, Key=key, Body=body, ContentType=content_type)
+
+    def _delete_sync(self, key: str):
+        self.s3_client.delete_object(Bucket=self.bucket_name, Key=key)
+
+    async def close(self):
+        self._pool.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        return {**super().stats(), "max_connections": self.max_connections}
+
+
+class LocalStorageBackend(StorageBackend):
+    """
+    로컬 디스크 백엔드 (S3와 같은 API, 테스트 / 벤치마크 / AWS 키 없는 로컬 개발용)
+    - key를 root_dir 하위 경로로 저장하고 base_url/key를 URL로 반환
+    - 임시 파일에 쓴 뒤 os.replace로 교체 → 읽는 쪽에서 쓰다 만 파일이 보이지 않음
+    """
+
+    name = "local"
+
+    def __init__(self, root_dir: str, base_url: str):
+        super().__init__()
+        self.root_dir = os.path.abspath(root_dir)
+        self.base_url = base_url.rstrip("/")
+
+    def object_url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root_dir, key))
+        if not path.startswith(self.root_dir + os.sep):
+            raise ValueError(f"잘못된 storage key: {key}")
+        return path
+
+    def _put_sync(self, key: str, body: bytes, content_type: str):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+
+    def _delete_sync(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+def create_storage_backend() -> StorageBackend:
+    """settings.STORAGE_BACKEND에 따라 앱 공용 스토리지 백엔드 생성 ("s3" / "local")"""
+    if settings.STORAGE_BACKEND == "local":
+        return LocalStorageBackend(settings.LOCAL_STORAGE_DIR, settings.LOCAL_STORAGE_BASE_URL)
+    if settings.STORAGE_BACKEND != "s3":
+        raise ValueError(f"지원하지 않는 STORAGE_BACKEND: {settings.STORAGE_BACKEND} (s3 / local)")
+    return S3StorageBackend(settings.AWS_BUCKET_NAME, settings.AWS_REGION_NAME,
+                            max_connections=settings.STORAGE_MAX_CONNECTIONS)
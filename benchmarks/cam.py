@@ -0,0 +1,161 @@
+# BACK-END/benchmarks/cam.py
+# CAM + 바운딩박스 계산 마이크로벤치마크: 기존 PIL uint8 resize vs NumPy 보간 행렬 vs 7x7 해석적 bbox
+# 실행: python benchmarks/cam.py [--requests 500] [--batch 8]
+#   - ONNX 모델 없이 합성 feature map (N, 1280, 7, 7)과 무작위 FC weight로 후처리 비용만 측정
+#   - 요청 1건당 평균/p95 시간, 호출당 peak 메모리 할당량(tracemalloc), 기존 방식과의 bbox 차이를 출력
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from PIL import Image
+
+# 프로젝트 루트 경로 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.domains.diagnosis.cam import (  # noqa: E402
+    CAM_THRESHOLD, bbox_from_grid, bbox_from_heatmap, compute_cams, upsample_cams,
+)
+
+NUM_CLASSES = 5
+FEATURE_CHANNELS = 1280
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def synthetic_features(rng: np.random.Generator, fc_weights: np.ndarray, class_idxs: np.ndarray) -> np.ndarray:
+    """
+    곰팡이 영역 하나가 활성화된 feature map 근사 (N, 1280, 7, 7)
+    - 양수 노이즈(SiLU 출력) + 무작위 위치/크기의 가우시안 blob을 예측 클래스 weight 방향으로 추가
+    - 순수 노이즈는 CAM이 임계값 근처에 몰려 실제 진단과 다른 bbox 분포가 나옴
+    """
+    grid = np.arange(7, dtype=np.float32)
+    features = np.abs(rng.standard_normal((len(class_idxs), FEATURE_CHANNELS, 7, 7), dtype=np.float32)) * 0.3
+    for feature, class_idx in zip(features, class_idxs):
+        cy, cx = rng.uniform(0, 6, size=2)
+        sigma = rng.uniform(0.7, 2.0)
+        blob = np.exp(-((grid[:, None] - cy) ** 2 + (grid[None, :] - cx) ** 2) / (2 * sigma ** 2))
+        feature += np.maximum(fc_weights[class_idx], 0)[:, None, None] * blob * 20
+    return features
+
+
+def legacy_cam_bbox(features: np.ndarray, fc_weights: np.ndarray, class_idx: int) -> list[int]:
+    """기존 EfficientNetEngine._compute_cam + _extract_bbox (PIL uint8 왕복)"""
+    cam = np.einsum("i,ijk->jk", fc_weights[class_idx], features)
+    cam = np.maximum(cam, 0)
+    cam_max = cam.max()
+    if cam_max > 0:
+        cam = (cam - cam.min()) / (cam_max - cam.min())
+    cam_pil = Image.fromarray((cam * 255).astype(np.uint8), mode="L")
+    heatmap = np.array(cam_pil.resize((224, 224), Image.BILINEAR), dtype=np.float32) / 255.0
+    return bbox_from_heatmap(heatmap, CAM_THRESHOLD)
+
+
+def numpy_heatmap_bbox(features: np.ndarray, fc_weights: np.ndarray, class_idx: int) -> list[int]:
+    """NumPy 보간 행렬로 224x224 heatmap 생성 후 bbox"""
+    cam = compute_cams(features[None], fc_weights, np.array([class_idx]))[0]
+    return bbox_from_heatmap(upsample_cams(cam), CAM_THRESHOLD)
+
+
+def analytic_bbox(features: np.ndarray, fc_weights: np.ndarray, class_idx: int) -> list[int]:
+    """7x7 격자에서 bbox를 해석적으로 계산 (224x224 미생성)"""
+    cam = compute_cams(features[None], fc_weights, np.array([class_idx]))[0]
+    return bbox_from_grid(cam, CAM_THRESHOLD)
+
+
+def measure(name: str, func, features: np.ndarray, fc_weights: np.ndarray, class_idxs: np.ndarray) -> dict:
+    """요청 1건씩 func 호출 → 시간 / peak 할당량 / bbox 목록"""
+    func(features[0], fc_weights, int(class_idxs[0]))  # warmup (보간 행렬 캐시 생성 등)
+
+    latencies_ms, bboxes = [], []
+    for feature, class_idx in zip(features, class_idxs):
+        start = time.perf_counter()
+        bboxes.append(func(feature, fc_weights, int(class_idx)))
+        latencies_ms.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    func(features[0], fc_weights, int(class_idxs[0]))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"name": name, "latencies_ms": latencies_ms, "peak_kb": peak / 1024, "bboxes": bboxes}
+
+
+def measure_batched(features: np.ndarray, fc_weights: np.ndarray, class_idxs: np.ndarray, batch: int) -> dict:
+    """마이크로 배치 단위 compute_cams 1회 + 이미지별 해석적 bbox (요청당 시간으로 환산)"""
+    def run(chunk: slice) -> list[list[int]]:
+        cams = compute_cams(features[chunk], fc_weights, class_idxs[chunk])
+        return [bbox_from_grid(cam, CAM_THRESHOLD) for cam in cams]
+
+    run(slice(0, batch))  # warmup
+
+    latencies_ms, bboxes = [], []
+    for offset in range(0, len(features), batch):
+        chunk = slice(offset, offset + batch)
+        start = time.perf_counter()
+        chunk_bboxes = run(chunk)
+        per_request_ms = (time.perf_counter() - start) * 1000 / len(chunk_bboxes)
+        latencies_ms.extend([per_request_ms] * len(chunk_bboxes))
+        bboxes.extend(chunk_bboxes)
+
+    tracemalloc.start()
+    run(slice(0, batch))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"name": f"batched(x{batch})", "latencies_ms": latencies_ms, "peak_kb": peak / 1024, "bboxes": bboxes}
+
+
+def max_bbox_diff(bboxes: list[list[int]], reference: list[list[int]]) -> int:
+    """bbox 좌표의 최대 절대 차이 (px)"""
+    return max(max(abs(a - b) for a, b in zip(box, ref)) for box, ref in zip(bboxes, reference))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CAM + bbox 후처리 마이크로벤치마크")
+    parser.add_argument("--requests", type=int, default=500, help="측정할 요청(이미지) 수")
+    parser.add_argument("--batch", type=int, default=8, help="배치 CAM 측정 시 배치 크기")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    fc_weights = rng.standard_normal((NUM_CLASSES, FEATURE_CHANNELS), dtype=np.float32) * 0.05
+    class_idxs = rng.integers(0, NUM_CLASSES, size=args.requests)
+    features = synthetic_features(rng, fc_weights, class_idxs)
+
+    results = [
+        measure("legacy(PIL)", legacy_cam_bbox, features, fc_weights, class_idxs),
+        measure("numpy heatmap", numpy_heatmap_bbox, features, fc_weights, class_idxs),
+        measure("analytic bbox", analytic_bbox, features, fc_weights, class_idxs),
+        measure_batched(features, fc_weights, class_idxs, args.batch),
+    ]
+    legacy, numpy_heatmap = results[0], results[1]
+
+    print("=" * 78)
+    print(f"CAM + bbox 벤치마크: 요청 {args.requests}건 (feature map {FEATURE_CHANNELS}x7x7)")
+    print("=" * 78)
+    print(f"{'path':<16}{'mean(ms)':>10}{'p95(ms)':>10}{'peak alloc(KB)':>16}"
+          f"{'Δbbox vs PIL':>14}{'Δbbox vs NumPy':>16}")
+    for r in results:
+        latencies = r["latencies_ms"]
+        print(f"{r['name']:<16}{sum(latencies) / len(latencies):>10.3f}{percentile(latencies, 95):>10.3f}"
+              f"{r['peak_kb']:>16.1f}{max_bbox_diff(r['bboxes'], legacy['bboxes']):>12}px"
+              f"{max_bbox_diff(r['bboxes'], numpy_heatmap['bboxes']):>14}px")
+
+    legacy_mean = sum(legacy["latencies_ms"]) / len(legacy["latencies_ms"])
+    print("-" * 78)
+    for r in results[1:]:
+        mean = sum(r["latencies_ms"]) / len(r["latencies_ms"])
+        print(f"{r['name']:<16} 요청당 {legacy_mean - mean:.3f}ms 절감 ({legacy_mean / mean:.1f}배 빠름)")
+    print("ℹ️  Δbbox vs PIL은 기존 uint8 양자화 오차로 인한 차이, analytic bbox의 Δbbox vs NumPy는 0이어야 함")
+
+
+if __name__ == "__main__":
+    main()
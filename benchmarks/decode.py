@@ -0,0 +1,121 @@
+# BACK-END/benchmarks/decode.py
+# 업로드 이미지 디코딩 벤치마크: 풀 해상도 디코딩 vs JPEG draft(DCT 축소) 디코딩
+# 실행: python benchmarks/decode.py --samples <샘플 이미지 폴더> [--repeat 5]
+#   - 모드별로 별도 프로세스에서 실행하여 peak RSS(ru_maxrss)를 독립적으로 측정
+#   - fast 모드 결과가 full 모드 결과와 얼마나 다른지(픽셀 평균 오차)도 함께 출력
+
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+# 프로젝트 루트 경로 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+
+def list_samples(folder: str) -> list[str]:
+    paths = []
+    for root, _, files in os.walk(folder):
+        for name in sorted(files):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                paths.append(os.path.join(root, name))
+    return paths
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_mode(mode: str, samples: list[str], repeat: int) -> dict:
+    """(자식 프로세스) 한 가지 디코딩 모드로 모든 샘플을 반복 디코딩"""
+    from app.utils.image_context import decode_rgb
+
+    # 파일 I/O는 측정에서 제외 (업로드 bytes가 이미 메모리에 있는 상황과 동일)
+    blobs = [open(path, "rb").read() for path in samples]
+    rss_before_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    latencies_ms = []
+    for _ in range(repeat):
+        for blob in blobs:
+            start = time.perf_counter()
+            decode_rgb(io.BytesIO(blob), fast=(mode == "fast"))
+            latencies_ms.append((time.perf_counter() - start) * 1000)
+
+    rss_after_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "mode": mode,
+        "images": len(blobs),
+        "decodes": len(latencies_ms),
+        "mean_ms": sum(latencies_ms) / len(latencies_ms),
+        "p50_ms": percentile(latencies_ms, 50),
+        "p95_ms": percentile(latencies_ms, 95),
+        "peak_rss_mb": rss_after_kb / 1024,
+        "decode_rss_growth_mb": (rss_after_kb - rss_before_kb) / 1024,
+    }
+
+
+def pixel_difference(samples: list[str]) -> float:
+    """fast 모드와 full 모드 디코딩 결과의 평균 절대 픽셀 오차 (0~255)"""
+    import numpy as np
+    from app.utils.image_context import decode_rgb
+
+    diffs = []
+    for path in samples:
+        with open(path, "rb") as f:
+            blob = f.read()
+        full = decode_rgb(io.BytesIO(blob), fast=False).astype(np.int16)
+        fast = decode_rgb(io.BytesIO(blob), fast=True).astype(np.int16)
+        diffs.append(float(np.abs(full - fast).mean()))
+    return sum(diffs) / len(diffs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="풀 디코딩 vs draft 디코딩 벤치마크")
+    parser.add_argument("--samples", default="calibration_images", help="샘플 이미지 폴더")
+    parser.add_argument("--repeat", type=int, default=5, help="샘플 전체 반복 횟수")
+    parser.add_argument("--mode", choices=["full", "fast"], help=argparse.SUPPRESS)  # 자식 프로세스용
+    args = parser.parse_args()
+
+    samples = list_samples(args.samples)
+    if not samples:
+        print(f"❌ 샘플 이미지가 없습니다: {args.samples}")
+        sys.exit(1)
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, samples, args.repeat)))
+        return
+
+    results = []
+    for mode in ("full", "fast"):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--samples", args.samples,
+             "--repeat", str(args.repeat), "--mode", mode],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print("=" * 72)
+    print(f"디코딩 벤치마크: 샘플 {len(samples)}장 x {args.repeat}회 ({args.samples})")
+    print("=" * 72)
+    print(f"{'mode':<6}{'mean(ms)':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'peak RSS(MB)':>15}{'decode RSS+(MB)':>18}")
+    for r in results:
+        print(f"{r['mode']:<6}{r['mean_ms']:>10.2f}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}"
+              f"{r['peak_rss_mb']:>15.1f}{r['decode_rss_growth_mb']:>18.1f}")
+
+    full, fast = results
+    print("-" * 72)
+    print(f"평균 디코딩 시간: {full['mean_ms'] / fast['mean_ms']:.1f}배 빠름")
+    print(f"peak RSS 감소:    {full['peak_rss_mb'] - fast['peak_rss_mb']:.1f}MB")
+    print(f"픽셀 평균 오차:   {pixel_difference(samples):.2f} / 255 (fast vs full)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# BACK-END/benchmarks/fake_llm_server.py
+# 부하 테스트용 가짜 LLM 서버 (LLM_BACKEND=http 일 때 app/utils/llm_gateway.py HTTPBackend가 호출)
+# 실행: python benchmarks/fake_llm_server.py [--port 8090] [--latency-ms 800] [--jitter-ms 400] [--error-rate 0]
+#   - POST /generate {"model", "prompt", "json"} → {"text"} (지연 후 한 번에 응답)
+#   - POST /stream (같은 요청) → 텍스트 청크를 나눠서 전송 (청크 간 지연 = 전체 지연 / 청크 수)
+#   - POST /control {"latency_ms", "jitter_ms", "error_rate", "stall_rate"} → 실행 중 장애 주입
+#     (error_rate: 503 응답 비율, stall_rate: 응답하지 않고 멈추는 비율 → 게이트웨이 데드라인 / 서킷 브레이커 확인)
+#   - 프롬프트 내용으로 응답 종류 결정: 운세 풀(JSON fortunes 5개), 운세(JSON score/status/message),
+#     진단 리포트(JSON), 키워드(쉼표 구분)
+
+import argparse
+import asyncio
+import json
+import random
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+app = FastAPI(title="fake-llm")
+config = {"latency_ms": 800.0, "jitter_ms": 400.0, "error_rate": 0.0, "stall_rate": 0.0, "chunks": 12}
+counters = {"generate": 0, "stream": 0, "errors": 0, "stalls": 0}
+
+
+def canned_fortune() -> dict:
+    return {
+        "score": random.randint(40, 95),
+        "status": "뽀송한 하루",
+        "message": "창문 좀 열어라. 환기만 잘해도 곰팡이는 못 버틴다. 밥은 챙겨 먹고 다니고.",
+    }
+
+
+def canned_response(prompt: str) -> str:
+    if "\"fortunes\"" in prompt:
+        return json.dumps({"fortunes": [canned_fortune() for _ in range(5)]}, ensure_ascii=False)
+    if "\"score\"" in prompt:
+        return json.dumps(canned_fortune(), ensure_ascii=False)
+    if "\"diagnosis\"" in prompt:
+        return json.dumps({
+            "diagnosis": "검은 곰팡이로 보입니다. 습도가 높은 벽면에서 빠르게 번식합니다.",
+            "FrequentlyVisitedAreas": ["욕실 천장", "창틀"],
+            "solution": ["락스 희석액으로 닦기", "완전 건조", "실리콘 재시공"],
+            "prevention": ["하루 2회 환기", "제습기 사용", "결로 제거"],
+            "insight": "재발이 잦다면 누수 여부를 먼저 확인하세요.",
+        }, ensure_ascii=False)
+    return "곰팡이,습기,결로,환기,제습"
+
+
+async def simulate_upstream():
+    """지연 + 장애 주입 (stall은 클라이언트가 끊을 때까지 대기)"""
+    if random.random() < config["stall_rate"]:
+        counters["stalls"] += 1
+        await asyncio.sleep(3600)
+    delay = max(0.0, config["latency_ms"] + random.uniform(-1, 1) * config["jitter_ms"]) / 1000
+    if random.random() < config["error_rate"]:
+        counters["errors"] += 1
+        await asyncio.sleep(delay / 4)
+        raise HTTPException(status_code=503, detail="fake upstream unavailable")
+    return delay
+
+
+@app.post("/generate")
+async def generate(request: Request):
+    body = await request.json()
+    counters["generate"] += 1
+    delay = await simulate_upstream()
+    await asyncio.sleep(delay)
+    return {"text": canned_response(body["prompt"])}
+
+
+@app.post("/stream")
+async def stream(request: Request):
+    body = await request.json()
+    counters["stream"] += 1
+    delay = await simulate_upstream()
+    text = canned_response(body["prompt"])
+    size = max(1, len(text) // config["chunks"])
+
+    async def chunks():
+        for offset in range(0, len(text), size):
+            await asyncio.sleep(delay / config["chunks"])
+            yield text[offset:offset + size]
+
+    return StreamingResponse(chunks(), media_type="text/plain; charset=utf-8")
+
+
+@app.post("/control")
+async def control(request: Request):
+    config.update({key: value for key, value in (await request.json()).items() if key in config})
+    return config
+
+
+@app.get("/stats")
+async def stats():
+    return {"config": config, "counters": counters}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="부하 테스트용 가짜 LLM 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="평균 응답 지연")
+    parser.add_argument("--jitter-ms", type=float, default=400.0, help="지연 편차 (균등 분포 ±)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 응답 비율")
+    parser.add_argument("--stall-rate", type=float, default=0.0, help="응답 없이 멈추는 비율")
+    args = parser.parse_args()
+
+    config.update(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                  error_rate=args.error_rate, stall_rate=args.stall_rate)
+    print(f"🤖 fake LLM 서버: http://{args.host}:{args.port} ({config})")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# BACK-END/benchmarks/import_time.py
+# 앱 import 비용 프로파일 (python -X importtime 결과 집계)
+# 실행: python benchmarks/import_time.py [--module app.main] [--repeat 3] [--top 15]
+#   - 새 프로세스에서 모듈을 import하며 -X importtime 로그를 수집 → 패키지별 self 시간 합계 / 느린 import 상위 목록
+#   - import 부작용 점검: 무거운 SDK(chromadb / Gemini / Firebase / onnxruntime)가 로드됐는지,
+#     작업 폴더에 새 파일/폴더(chroma_db, logs 등)가 생겼는지, root logger에 핸들러가 붙었는지
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# import 시점에 로드되면 안 되는 모듈 (lifespan / 첫 사용 시 로드)
+LAZY_MODULES = ("chromadb", "google.generativeai", "firebase_admin", "onnxruntime", "onnx")
+
+CHILD_SCRIPT = """
+import importlib, json, logging, os, sys, time
+before = set(os.listdir("."))
+start = time.perf_counter()
+importlib.import_module({module!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "import_ms": elapsed * 1000,
+    "loaded": [m for m in {lazy!r} if m in sys.modules],
+    "created": sorted(set(os.listdir(".")) - before),
+    "root_handlers": len(logging.getLogger().handlers),
+}}))
+"""
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """-X importtime 로그 → [(모듈, self us, cumulative us)]"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def run_child(module: str) -> tuple[dict, list[tuple[str, int, int]]]:
+    script = CHILD_SCRIPT.format(module=module, lazy=LAZY_MODULES)
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        cwd=ROOT_DIR, capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        print(completed.stderr.strip().splitlines()[-1] if completed.stderr else "import 실패")
+        sys.exit(1)
+    return json.loads(completed.stdout.strip().splitlines()[-1]), parse_importtime(completed.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="앱 import 비용 프로파일 (-X importtime)")
+    parser.add_argument("--module", default="app.main", help="import할 모듈")
+    parser.add_argument("--repeat", type=int, default=3, help="프로세스 실행 횟수 (최솟값 기준으로 출력)")
+    parser.add_argument("--top", type=int, default=15, help="출력할 상위 항목 수")
+    args = parser.parse_args()
+
+    runs = [run_child(args.module) for _ in range(args.repeat)]
+    summary, rows = min(runs, key=lambda run: run[0]["import_ms"])
+
+    by_package: dict[str, int] = defaultdict(int)
+    for name, self_us, _ in rows:
+        by_package[name.split(".")[0]] += self_us
+
+    print("=" * 66)
+    print(f"import 프로파일: {args.module} (최소 {summary['import_ms']:.0f}ms / {args.repeat}회, 모듈 {len(rows)}개)")
+    print("=" * 66)
+    print(f"{'package':<36}{'self 합계(ms)':>14}{'비율':>10}")
+    total_us = sum(by_package.values()) or 1
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{package:<36}{self_us / 1000:>14.1f}{self_us / total_us * 100:>9.1f}%")
+
+    print("-" * 66)
+    print(f"{'module (느린 import)':<44}{'cumulative(ms)':>16}")
+    for name, _, cumulative_us in sorted(rows, key=lambda row: -row[2])[:args.top]:
+        print(f"{name:<44}{cumulative_us / 1000:>16.1f}")
+
+    print("-" * 66)
+    print(f"무거운 SDK 로드: {', '.join(summary['loaded']) or '없음'}")
+    print(f"작업 폴더에 생성된 항목: {', '.join(summary['created']) or '없음'}")
+    print(f"root logger 핸들러: {summary['root_handlers']}개")
+    if summary["loaded"] or summary["created"] or summary["root_handlers"]:
+        print("⚠️  import 부작용 있음 (lifespan / 첫 사용 시점으로 옮길 대상)")
+    else:
+        print("✅ import 부작용 없음")
+
+
+if __name__ == "__main__":
+    main()
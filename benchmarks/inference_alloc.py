@@ -0,0 +1,104 @@
+# BACK-END/benchmarks/inference_alloc.py
+# 추론 경로 메모리 할당 프로파일: 기존 (요청마다 정규화 배열 + session.run 출력 할당) vs 재사용 버퍼 + IO binding
+# 실행: python benchmarks/inference_alloc.py [--variant fp32] [--batch 1 4 8] [--repeat 50]
+#   - tracemalloc으로 배치 1회 추론 중 새로 할당된 NumPy 메모리(peak)를 측정
+#   - 모델 파일이 없으면 --model로 ONNX 경로를 직접 지정
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+# 프로젝트 루트 경로 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.domains.diagnosis.ai_engine import (  # noqa: E402
+    IMAGENET_MEAN, IMAGENET_STD, EfficientNetEngine, resolve_model_path,
+)
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def legacy_normalize(image_rgb: np.ndarray) -> np.ndarray:
+    """기존 EfficientNetEngine.normalize (/255, -mean, /std, transpose, expand_dims)"""
+    img_array = image_rgb.astype(np.float32) / 255.0
+    img_array = (img_array - IMAGENET_MEAN) / IMAGENET_STD
+    img_array = img_array.transpose(2, 0, 1)
+    return np.expand_dims(img_array, axis=0)
+
+
+def legacy_infer(engine: EfficientNetEngine, images: list[np.ndarray]) -> list[dict]:
+    """기존 경로: 요청별 정규화 → concatenate → session.run(None) → 후처리"""
+    inputs = np.concatenate([legacy_normalize(image) for image in images], axis=0)
+    logits, features = engine.run_batch(inputs)
+    return engine.postprocess_batch(logits, features, [True] * len(images))
+
+
+def buffered_infer(engine: EfficientNetEngine, images: list[np.ndarray]) -> list[dict]:
+    """신규 경로: 스레드별 버퍼에 바로 정규화 → IO binding → 후처리"""
+    return engine.infer(images, [True] * len(images))
+
+
+def profile(func, engine: EfficientNetEngine, images: list[np.ndarray], repeat: int) -> dict:
+    func(engine, images)  # warmup (버퍼 / 보간 행렬 할당)
+
+    latencies_ms = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(engine, images)
+        latencies_ms.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    func(engine, images)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "mean_ms": sum(latencies_ms) / len(latencies_ms),
+        "p95_ms": percentile(latencies_ms, 95),
+        "peak_kb": (peak - baseline) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="추론 경로 메모리 할당 프로파일")
+    parser.add_argument("--variant", default="fp32", help="모델 변형 (fp32 / int8)")
+    parser.add_argument("--model", help="ONNX 파일 경로 (지정 시 --variant 무시)")
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 4, 8], help="측정할 배치 크기")
+    parser.add_argument("--repeat", type=int, default=50, help="배치 크기별 반복 횟수")
+    args = parser.parse_args()
+
+    model_path = args.model or resolve_model_path(args.variant)
+    if not os.path.exists(model_path):
+        print(f"❌ 모델 파일이 없습니다: {model_path}")
+        sys.exit(1)
+
+    engine = EfficientNetEngine(model_path, buffer_batch_size=max(args.batch))
+    rng = np.random.default_rng(0)
+
+    print("=" * 66)
+    print(f"추론 할당 프로파일: {os.path.basename(model_path)} x {args.repeat}회")
+    print("=" * 66)
+    print(f"{'batch':<7}{'path':<12}{'mean(ms)':>10}{'p95(ms)':>10}{'peak alloc(KB)':>17}")
+    for batch_size in args.batch:
+        images = [rng.integers(0, 256, (224, 224, 3), dtype=np.uint8) for _ in range(batch_size)]
+        legacy = profile(legacy_infer, engine, images, args.repeat)
+        buffered = profile(buffered_infer, engine, images, args.repeat)
+        for name, r in (("legacy", legacy), ("buffered", buffered)):
+            print(f"{batch_size:<7}{name:<12}{r['mean_ms']:>10.2f}{r['p95_ms']:>10.2f}"
+                  f"{r['peak_kb']:>17.1f}")
+        print(f"{'':<7}→ 배치당 할당 {legacy['peak_kb'] - buffered['peak_kb']:.1f}KB 감소, "
+              f"평균 {legacy['mean_ms'] - buffered['mean_ms']:.2f}ms 단축")
+        print("-" * 66)
+
+
+if __name__ == "__main__":
+    main()
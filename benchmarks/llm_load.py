@@ -0,0 +1,152 @@
+# BACK-END/benchmarks/llm_load.py
+# LLM 호출 경로 부하 테스트: 기존 동기 호출 / to_thread vs 공용 LLM 게이트웨이
+# 실행: (터미널 1) python benchmarks/fake_llm_server.py --latency-ms 800
+#       (터미널 2) python benchmarks/llm_load.py [--requests 200] [--concurrency 50]
+#   - 정상 구간: 같은 동시 요청을 경로별로 실행 → 응답 지연 p50/p95, fallback 수, 이벤트 루프 최대 지연(lag)
+#     (blocking = 기존 운세 경로처럼 async 함수 안에서 동기 호출, to_thread = 기존 RAG 경로)
+#   - 장애 구간: 가짜 서버를 전부 503으로 전환 → 서킷 브레이커 유무별 응답 지연 / 실제 업스트림 호출 수
+#   - .env(DATABASE_URL 등) 설정이 있어야 app.core.config import 가능
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import requests
+
+# 프로젝트 루트 경로 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings  # noqa: E402
+from app.utils.llm_gateway import LLMGateway  # noqa: E402
+
+MODEL = "models/gemini-2.5-flash-lite"
+PROMPT = "오늘의 운세를 작성하세요. {\"score\": 0~100, \"status\": \"상태 요약\", \"message\": \"답변\"}"
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def monitor_loop_lag(stop: asyncio.Event, interval: float = 0.01) -> float:
+    """이벤트 루프가 interval보다 늦게 깨어난 최대 시간 (블로킹 호출이 있으면 커짐)"""
+    max_lag = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        max_lag = max(max_lag, time.perf_counter() - start - interval)
+    return max_lag
+
+
+def blocking_call(base_url: str) -> str:
+    response = requests.post(f"{base_url}/generate", json={"model": MODEL, "prompt": PROMPT, "json": True})
+    response.raise_for_status()
+    return response.json()["text"]
+
+
+async def blocking_in_coroutine(base_url: str) -> str:
+    """기존 FortuneService 방식: async 함수 안에서 동기 HTTP 호출 (응답까지 이벤트 루프 정지)"""
+    return blocking_call(base_url)
+
+
+async def run_scenario(name: str, call, requests_count: int, concurrency: int) -> dict:
+    limit = asyncio.Semaphore(concurrency)
+    latencies, fallbacks = [], 0
+
+    async def one():
+        nonlocal fallbacks
+        async with limit:
+            start = time.perf_counter()
+            try:
+                await call()
+            except Exception:
+                fallbacks += 1  # 서비스에서는 fallback 응답으로 대체되는 경우
+            latencies.append(time.perf_counter() - start)
+
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(monitor_loop_lag(stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests_count)))
+    wall = time.perf_counter() - start
+    stop.set()
+    return {
+        "name": name,
+        "wall_s": wall,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "fallbacks": fallbacks,
+        "max_lag_ms": await lag_task * 1000,
+    }
+
+
+def upstream_calls(base_url: str) -> int:
+    return requests.get(f"{base_url}/stats").json()["counters"]["generate"]
+
+
+def print_results(title: str, results: list[dict], extra_header: str = "", extra_key: str = ""):
+    print("=" * 84)
+    print(title)
+    print("=" * 84)
+    print(f"{'path':<22}{'wall(s)':>9}{'p50(ms)':>10}{'p95(ms)':>10}{'fallback':>10}{'loop lag(ms)':>14}{extra_header}")
+    for r in results:
+        extra = f"{r[extra_key]:>9}" if extra_key else ""
+        print(f"{r['name']:<22}{r['wall_s']:>9.2f}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}"
+              f"{r['fallbacks']:>10}{r['max_lag_ms']:>14.1f}{extra}")
+
+
+async def main_async(args):
+    settings.LLM_BACKEND = "http"
+    settings.LLM_HTTP_BASE_URL = args.base_url
+    settings.LLM_MAX_CONNECTIONS = args.max_concurrency
+
+    def make_gateway(failure_threshold: int) -> LLMGateway:
+        return LLMGateway(max_concurrency=args.max_concurrency, timeout_seconds=args.timeout,
+                          failure_threshold=failure_threshold, reset_seconds=60.0)
+
+    # 1. 정상 구간
+    requests.post(f"{args.base_url}/control", json={"error_rate": 0.0, "stall_rate": 0.0})
+    gateway = make_gateway(failure_threshold=5)
+    normal = [
+        await run_scenario("blocking (기존 운세)", lambda: blocking_in_coroutine(args.base_url),
+                           args.requests // 10, args.concurrency),
+        await run_scenario("to_thread (기존 RAG)", lambda: asyncio.to_thread(blocking_call, args.base_url),
+                           args.requests, args.concurrency),
+        await run_scenario("gateway", lambda: gateway.generate(PROMPT, model=MODEL, json_mode=True),
+                           args.requests, args.concurrency),
+    ]
+    await gateway.aclose()
+    print_results(f"정상 구간: 요청 {args.requests}건 (blocking은 {args.requests // 10}건), "
+                  f"동시 {args.concurrency}, 게이트웨이 상한 {args.max_concurrency}", normal)
+
+    # 2. 장애 구간 (전부 503)
+    requests.post(f"{args.base_url}/control", json={"error_rate": 1.0})
+    outage = []
+    for name, threshold in (("gateway (breaker 없음)", 10 ** 9), ("gateway (breaker)", 5)):
+        gateway = make_gateway(failure_threshold=threshold)
+        before = upstream_calls(args.base_url)
+        result = await run_scenario(name, lambda: gateway.generate(PROMPT, model=MODEL, json_mode=True),
+                                    args.requests, args.concurrency)
+        result["upstream"] = upstream_calls(args.base_url) - before
+        outage.append(result)
+        await gateway.aclose()
+    requests.post(f"{args.base_url}/control", json={"error_rate": 0.0})
+    print_results(f"장애 구간: 업스트림 전부 503, 요청 {args.requests}건", outage, f"{'upstream':>9}", "upstream")
+    print("ℹ️  loop lag가 크면 다른 API 요청까지 멈춤 (blocking 경로), breaker는 연속 실패 후 업스트림 호출 없이 즉시 fallback")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM 호출 경로 부하 테스트 (fake_llm_server.py 필요)")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8090")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50, help="동시에 들어오는 API 요청 수")
+    parser.add_argument("--max-concurrency", type=int, default=8, help="게이트웨이 동시 호출 상한")
+    parser.add_argument("--timeout", type=float, default=20.0, help="게이트웨이 호출 데드라인(초)")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# BACK-END/benchmarks/startup.py
+# 모델 기동 비용 측정: classifier weight를 onnx.load로 추출 vs .npy sidecar memory-map
+# 실행: python benchmarks/startup.py [--variant fp32] [--repeat 5]
+#   - 측정마다 새 프로세스를 띄워 import 캐시 / page cache 외 상태가 섞이지 않게 함
+#   - weight 로드 시간, EfficientNetEngine 생성 전체 시간, 프로세스 peak RSS, onnx 패키지 import 여부를 출력
+#   - sidecar가 없으면 먼저 생성 (convert_to_onnx.py 실행 결과와 동일)
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# 프로젝트 루트 경로 추가
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from app.domains.diagnosis.ai_engine import resolve_model_path  # noqa: E402
+from app.domains.diagnosis.classifier_weights import (  # noqa: E402
+    extract_from_onnx, load_sidecar, write_sidecar,
+)
+
+# 자식 프로세스에서 실행: weight 로드 → 엔진 생성 순으로 측정 후 JSON 한 줄 출력
+# (onnxruntime import 전에 weight를 로드해야 weight 단계의 peak RSS 증가분이 가려지지 않음)
+CHILD_SCRIPT = """
+import json, resource, sys, time
+sys.path.insert(0, {root!r})
+import numpy as np
+from app.domains.diagnosis.classifier_weights import load_classifier_weights
+
+base_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+weights = load_classifier_weights({model!r}, use_sidecar={use_sidecar})
+float(np.asarray(weights).sum())  # memory-map 페이지까지 실제로 읽기
+weights_ms = (time.perf_counter() - start) * 1000
+weights_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+from app.domains.diagnosis.ai_engine import EfficientNetEngine
+start = time.perf_counter()
+EfficientNetEngine({model!r}, use_weight_sidecar={use_sidecar})
+engine_ms = (time.perf_counter() - start) * 1000
+
+print(json.dumps({{
+    "weights_ms": weights_ms,
+    "weights_rss_mb": (weights_rss_kb - base_rss_kb) / 1024,
+    "engine_ms": engine_ms,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "onnx_imported": "onnx" in sys.modules,
+}}))
+"""
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_child(model_path: str, use_sidecar: bool) -> dict:
+    script = CHILD_SCRIPT.format(root=ROOT_DIR, model=model_path, use_sidecar=use_sidecar)
+    completed = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="모델 기동 비용 측정 (onnx.load vs weight sidecar)")
+    parser.add_argument("--variant", default="fp32", help="모델 변형 (fp32 / int8)")
+    parser.add_argument("--model", help="ONNX 파일 경로 (지정 시 --variant 무시)")
+    parser.add_argument("--repeat", type=int, default=5, help="경로별 프로세스 실행 횟수")
+    args = parser.parse_args()
+
+    model_path = os.path.abspath(args.model or resolve_model_path(args.variant))
+    if not os.path.exists(model_path):
+        print(f"❌ 모델 파일이 없습니다: {model_path}")
+        sys.exit(1)
+
+    if load_sidecar(model_path) is None:
+        initializer_name, weights = extract_from_onnx(model_path)
+        print(f"💾 sidecar 생성: {write_sidecar(model_path, weights, initializer_name)}")
+
+    results = {}
+    for name, use_sidecar in (("onnx.load", False), ("sidecar", True)):
+        runs = [run_child(model_path, use_sidecar) for _ in range(args.repeat)]
+        results[name] = {
+            key: [run[key] for run in runs]
+            for key in ("weights_ms", "weights_rss_mb", "engine_ms", "peak_rss_mb")
+        }
+        results[name]["onnx_imported"] = runs[-1]["onnx_imported"]
+
+    model_mb = os.path.getsize(model_path) / 1024 / 1024
+    print("=" * 78)
+    print(f"기동 비용: {os.path.basename(model_path)} ({model_mb:.1f}MB) x {args.repeat}회 (프로세스별)")
+    print("=" * 78)
+    print(f"{'path':<11}{'weights(ms)':>12}{'p95':>8}{'weights RSS(MB)':>17}"
+          f"{'engine(ms)':>12}{'peak RSS(MB)':>14}{'onnx import':>13}")
+    for name, r in results.items():
+        print(f"{name:<11}{sum(r['weights_ms']) / args.repeat:>12.1f}{percentile(r['weights_ms'], 95):>8.1f}"
+              f"{max(r['weights_rss_mb']):>17.1f}{sum(r['engine_ms']) / args.repeat:>12.1f}"
+              f"{max(r['peak_rss_mb']):>14.1f}{str(r['onnx_imported']):>13}")
+
+    legacy, sidecar = results["onnx.load"], results["sidecar"]
+    print("-" * 78)
+    print(f"→ weight 로드 {sum(legacy['weights_ms']) / args.repeat - sum(sidecar['weights_ms']) / args.repeat:.1f}ms 단축, "
+          f"peak RSS {max(legacy['peak_rss_mb']) - max(sidecar['peak_rss_mb']):.1f}MB 감소")
+    print("ℹ️  weights(ms)는 onnx 패키지 import + 모델 파싱 포함, sidecar는 체크섬 검증(ONNX 파일 SHA-256) 포함")
+
+
+if __name__ == "__main__":
+    main()
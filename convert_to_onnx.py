@@ -1,8 +1,13 @@
 # convert_to_onnx.py
-# 1회성 변환 스크립트: .pth → dual-output .onnx (logits + feature maps)
+# 1회성 변환 스크립트: .pth → dual-output .onnx (logits + feature maps, 동적 batch 축)
 # 로컬 환경에서만 실행 (서버 배포에는 포함하지 않음)
-# 실행: python convert_to_onnx.py
+# 실행: python convert_to_onnx.py [--calib-dir calibration_images] [--eval-dir eval_images] [--skip-int8]
+#   - FP32 (동적 batch) 모델: efficientnet_b0_mold.onnx
+#   - INT8 (정적 양자화) 모델: efficientnet_b0_mold_int8.onnx (--calib-dir 샘플 이미지로 보정)
+#   - 정확도 비교는 보정에 쓰지 않은 이미지로 수행: --eval-dir, 없으면 --calib-dir의 --holdout 비율을 보정에서 제외
 
+import argparse
+import hashlib
 import torch
 import torch.nn as nn
 import timm
@@ -11,17 +16,26 @@ import onnx.numpy_helper
 import numpy as np
 import os
 
+from app.domains.diagnosis.classifier_weights import extract_from_onnx, sidecar_paths, write_sidecar
+
 # ── 경로 설정 ──
 PTH_PATH = os.path.join("app", "domains", "diagnosis", "models", "efficientnet_b0_mold.pt")
 ONNX_PATH = os.path.join("app", "domains", "diagnosis", "models", "efficientnet_b0_mold.onnx")
+INT8_ONNX_PATH = os.path.join("app", "domains", "diagnosis", "models", "efficientnet_b0_mold_int8.onnx")
+CALIB_DIR = "calibration_images"
 NUM_CLASSES = 5
 
+# 서버 전처리(EfficientNetEngine.preprocess)와 동일한 정규화 상수
+IMAGENET_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+IMAGENET_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
 
 class EfficientNetDualOutput(nn.Module):
     """
     timm EfficientNet-B0를 감싸서 2개 출력을 반환하는 wrapper
-    - output 1: logits (1, NUM_CLASSES) — 분류 결과
-    - output 2: features (1, 1280, 7, 7) — 마지막 conv layer feature map (CAM용)
+    - output 1: logits (N, NUM_CLASSES) — 분류 결과
+    - output 2: features (N, 1280, 7, 7) — 마지막 conv layer feature map (CAM용)
     """
     def __init__(self, base_model):
         super().__init__()
@@ -83,6 +97,7 @@ def step1_convert_pth_to_onnx():
         print(f"  Features shape: {features.shape}")   # (1, 1280, 7, 7)
 
     # ONNX export (레거시 exporter 강제 사용)
+    # batch 축을 동적으로 지정 → 서버의 마이크로 배칭(InferenceBatcher)에서 N장을 한 번에 추론
     torch.onnx.export(
         model,
         dummy_input,
@@ -92,6 +107,11 @@ def step1_convert_pth_to_onnx():
         do_constant_folding=True,
         input_names=["input"],
         output_names=["output", "features"],  # dual output
+        dynamic_axes={
+            "input": {0: "batch"},
+            "output": {0: "batch"},
+            "features": {0: "batch"},
+        },
         dynamo=False,
     )
 
@@ -102,10 +122,19 @@ def step1_convert_pth_to_onnx():
     onnx_size = os.path.getsize(ONNX_PATH) / (1024 * 1024)
     print(f"  ONNX 모델 저장: {ONNX_PATH} ({onnx_size:.1f}MB)")
     print(f"  유효성 검증 통과")
+    write_classifier_sidecar(ONNX_PATH)
 
     return base_model
 
 
+def write_classifier_sidecar(onnx_path: str):
+    """서버 시작 시 onnx.load 없이 memory-map으로 읽을 classifier weight sidecar 생성 (체크섬 포함)"""
+    initializer_name, weights = extract_from_onnx(onnx_path)
+    npy_path = write_sidecar(onnx_path, weights, initializer_name)
+    print(f"  classifier sidecar 저장: {npy_path} ({initializer_name}, shape={weights.shape})")
+    print(f"  체크섬: {sidecar_paths(onnx_path)[1]}")
+
+
 def step2_verify_dual_output():
     """Step 2: dual-output ONNX 모델 검증"""
     print()
@@ -142,6 +171,20 @@ def step2_verify_dual_output():
 
     assert outputs[0].shape == (1, NUM_CLASSES), f"Logits shape 불일치: {outputs[0].shape}"
     assert outputs[1].shape == (1, 1280, 7, 7), f"Features shape 불일치: {outputs[1].shape}"
+
+    # 동적 batch 축 확인: N장 배치 추론 결과가 단건 추론과 일치해야 함
+    batch_np = np.random.randn(4, 3, 224, 224).astype(np.float32)
+    batch_outputs = session.run(None, {"input": batch_np})
+    print(f"  Batch Output[0] (logits) shape: {batch_outputs[0].shape}")     # (4, 5)
+    print(f"  Batch Output[1] (features) shape: {batch_outputs[1].shape}")   # (4, 1280, 7, 7)
+
+    assert batch_outputs[0].shape == (4, NUM_CLASSES), f"Batch logits shape 불일치: {batch_outputs[0].shape}"
+    assert batch_outputs[1].shape == (4, 1280, 7, 7), f"Batch features shape 불일치: {batch_outputs[1].shape}"
+
+    single_logits = session.run(None, {"input": batch_np[1:2]})[0]
+    batch_diff = float(np.abs(single_logits[0] - batch_outputs[0][1]).max())
+    print(f"  단건 vs 배치 logits 최대 차이: {batch_diff:.6f}")
+    assert batch_diff < 1e-3, f"배치 추론 결과 불일치: {batch_diff}"
     print(f"  검증 통과!")
 
 
@@ -251,7 +294,190 @@ def step4_cam_test():
     print(f"  CAM 테스트 완료!")
 
 
+def list_sample_images(folder: str | None) -> list[str]:
+    """샘플 이미지 폴더의 이미지 경로 목록 (하위 폴더 포함, 정렬)"""
+    paths = []
+    if not folder:
+        return paths
+    for root, _, files in sorted(os.walk(folder)):
+        for name in sorted(files):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                paths.append(os.path.join(root, name))
+    return paths
+
+
+def split_holdout(paths: list[str], fraction: float) -> tuple[list[str], list[str]]:
+    """
+    경로 해시 기준으로 (보정용, 평가용) 분할
+    - 실행할 때마다 / 이미지가 추가돼도 기존 이미지의 소속이 바뀌지 않음
+    """
+    calib, holdout = [], []
+    for path in paths:
+        bucket = int(hashlib.sha1(os.path.relpath(path).encode("utf-8")).hexdigest(), 16) % 1000
+        (holdout if bucket < fraction * 1000 else calib).append(path)
+    return calib, holdout
+
+
+def load_sample_images(paths: list[str], limit: int = 200):
+    """
+    샘플 이미지 경로 목록 → (N, 3, 224, 224) 정규화 배열 + 라벨 목록
+    - 상위 폴더명이 "G0"~"G4"로 시작하면 해당 클래스 라벨로 사용 (정확도 계산용)
+    - 라벨을 알 수 없는 이미지는 None (PyTorch 대비 일치율만 계산)
+    """
+    from PIL import Image
+
+    paths = paths[:limit]
+
+    arrays, labels = [], []
+    for path in paths:
+        image = Image.open(path).convert("RGB").resize((224, 224), Image.BILINEAR)
+        img_array = (np.array(image, dtype=np.float32) / 255.0 - IMAGENET_MEAN) / IMAGENET_STD
+        arrays.append(img_array.transpose(2, 0, 1))
+
+        parent = os.path.basename(os.path.dirname(path))
+        grade = parent.split("_")[0]
+        labels.append(int(grade[1]) if len(grade) == 2 and grade[0] == "G" and grade[1].isdigit() else None)
+
+    if not arrays:
+        return np.zeros((0, 3, 224, 224), dtype=np.float32), []
+    return np.stack(arrays).astype(np.float32), labels
+
+
+def step5_quantize_int8(calib_paths: list[str]):
+    """Step 5: 샘플 이미지로 보정(calibration)한 정적 INT8 양자화 모델 생성"""
+    print()
+    print("=" * 50)
+    print("[Step 5] INT8 정적 양자화")
+    print("=" * 50)
+
+    from onnxruntime.quantization import (
+        CalibrationDataReader, QuantFormat, QuantType, quantize_static
+    )
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    calib_inputs, _ = load_sample_images(calib_paths)
+    if len(calib_inputs) == 0:
+        print("  보정 이미지가 없습니다. INT8 변환 건너뜀.")
+        return False
+    print(f"  보정 이미지: {len(calib_inputs)}장")
+
+    class ImageCalibrationReader(CalibrationDataReader):
+        def __init__(self, inputs):
+            self._iter = iter([{"input": x[np.newaxis]} for x in inputs])
+
+        def get_next(self):
+            return next(self._iter, None)
+
+    # classifier(FC) 노드는 양자화 제외: CAM 계산용 FP32 weight 유지 + logits 정밀도 보존
+    onnx_model = onnx.load(ONNX_PATH)
+    classifier_weights = {
+        init.name for init in onnx_model.graph.initializer
+        if "classifier" in init.name and "weight" in init.name
+    }
+    classifier_nodes = [
+        node.name for node in onnx_model.graph.node
+        if classifier_weights.intersection(node.input)
+    ]
+    print(f"  양자화 제외 노드: {classifier_nodes}")
+
+    preprocessed_path = INT8_ONNX_PATH.replace(".onnx", "_pre.onnx")
+    quant_pre_process(ONNX_PATH, preprocessed_path)
+
+    quantize_static(
+        preprocessed_path,
+        INT8_ONNX_PATH,
+        ImageCalibrationReader(calib_inputs),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True,
+        nodes_to_exclude=classifier_nodes,
+    )
+    os.remove(preprocessed_path)
+
+    int8_size = os.path.getsize(INT8_ONNX_PATH) / (1024 * 1024)
+    print(f"  INT8 모델 저장: {INT8_ONNX_PATH} ({int8_size:.1f}MB)")
+    write_classifier_sidecar(INT8_ONNX_PATH)
+    return True
+
+
+def step6_verify_variant_accuracy(pytorch_model, eval_paths: list[str], variants: dict):
+    """Step 6: 모델 변형(FP32/INT8)별 PyTorch 대비 출력 차이 및 정확도 비교 (보정에 쓰지 않은 이미지)"""
+    print()
+    print("=" * 50)
+    print("[Step 6] 모델 변형별 PyTorch 대비 정확도 비교")
+    print("=" * 50)
+
+    import time
+    import onnxruntime as ort
+
+    inputs, labels = load_sample_images(eval_paths)
+    if len(inputs) == 0:
+        print("  평가 이미지가 없어 랜덤 입력으로 비교합니다.")
+        inputs = np.random.randn(16, 3, 224, 224).astype(np.float32)
+        labels = [None] * len(inputs)
+
+    def softmax(logits):
+        exp = np.exp(logits - np.max(logits, axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    pytorch_model.eval()
+    with torch.no_grad():
+        reference_probs = softmax(pytorch_model(torch.from_numpy(inputs)).numpy())
+    reference_pred = np.argmax(reference_probs, axis=1)
+
+    labeled = [i for i, label in enumerate(labels) if label is not None]
+    label_array = np.array([labels[i] for i in labeled])
+    if labeled:
+        reference_acc = float((reference_pred[labeled] == label_array).mean())
+        print(f"  PyTorch 정확도: {reference_acc * 100:.2f}% ({len(labeled)}장)")
+
+    for variant, path in variants.items():
+        sess_options = ort.SessionOptions()
+        sess_options.intra_op_num_threads = 2  # t3a.medium 2 vCPU 기준 속도 비교
+        session = ort.InferenceSession(path, sess_options, providers=["CPUExecutionProvider"])
+
+        start = time.perf_counter()
+        logits = np.concatenate([
+            session.run(["output"], {"input": inputs[i:i + 1]})[0] for i in range(len(inputs))
+        ])
+        per_image_ms = (time.perf_counter() - start) * 1000 / len(inputs)
+
+        probs = softmax(logits)
+        pred = np.argmax(probs, axis=1)
+        max_diff = float(np.abs(probs - reference_probs).max())
+        agreement = float((pred == reference_pred).mean())
+
+        print(f"  [{variant}] {path}")
+        print(f"    최대 확률 차이:     {max_diff:.6f}")
+        print(f"    PyTorch top-1 일치: {agreement * 100:.2f}%")
+        print(f"    단건 추론 시간:     {per_image_ms:.1f}ms")
+        if labeled:
+            acc = float((pred[labeled] == label_array).mean())
+            print(f"    정확도:             {acc * 100:.2f}% (PyTorch 대비 {(acc - reference_acc) * 100:+.2f}%p)")
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=".pth → FP32/INT8 ONNX 변환")
+    parser.add_argument("--calib-dir", default=CALIB_DIR, help="INT8 보정용 샘플 이미지 폴더")
+    parser.add_argument("--eval-dir", default=None, help="정확도 비교용 이미지 폴더 (보정 이미지와 겹치지 않게)")
+    parser.add_argument("--holdout", type=float, default=0.2,
+                        help="--eval-dir가 없을 때 보정 폴더에서 평가용으로 떼어둘 비율")
+    parser.add_argument("--skip-int8", action="store_true", help="INT8 양자화 모델 생성 생략")
+    args = parser.parse_args()
+
+    # 보정 이미지로 정확도를 재면 보정 데이터에 과적합된 양자화를 잡아낼 수 없음 → 평가 세트 분리
+    calib_paths = list_sample_images(args.calib_dir)
+    if args.eval_dir:
+        eval_paths = list_sample_images(args.eval_dir)
+        overlap = {os.path.realpath(path) for path in calib_paths} & {os.path.realpath(path) for path in eval_paths}
+        if overlap:
+            print(f"⚠️  --eval-dir 이미지 {len(overlap)}장이 보정 이미지와 겹쳐 보정에서 제외합니다.")
+            calib_paths = [path for path in calib_paths if os.path.realpath(path) not in overlap]
+    else:
+        calib_paths, eval_paths = split_holdout(calib_paths, args.holdout)
+    print(f"보정 이미지: {len(calib_paths)}장 / 평가 이미지: {len(eval_paths)}장")
+
     print(f"원본 .pth 파일: {PTH_PATH} (존재: {os.path.exists(PTH_PATH)})")
     print()
 
@@ -260,9 +486,17 @@ if __name__ == "__main__":
     step3_verify_output_consistency(pytorch_model)
     step4_cam_test()
 
+    variants = {"fp32": ONNX_PATH}
+    if not args.skip_int8 and step5_quantize_int8(calib_paths):
+        variants["int8"] = INT8_ONNX_PATH
+    step6_verify_variant_accuracy(pytorch_model, eval_paths, variants)
+
     print()
     print("=" * 50)
     print("변환 완료!")
-    print(f"서버에 배포할 파일: {ONNX_PATH}")
-    print("(dual-output: logits + feature maps)")
+    for variant, path in variants.items():
+        print(f"서버에 배포할 파일 [{variant}]: {path} + {os.path.basename(sidecar_paths(path)[0])} "
+              f"+ {os.path.basename(sidecar_paths(path)[1])}")
+    print("(dual-output: logits + feature maps, dynamic batch)")
+    print("서버에서 사용할 모델은 .env의 MODEL_VARIANT로 선택 (fp32 / int8)")
     print("=" * 50)
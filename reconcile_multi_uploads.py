@@ -0,0 +1,142 @@
+# BACK-END/reconcile_multi_uploads.py
+# 복합 곰팡이(MULTI) 진단의 중복 S3 원본 이미지 정리 (1회성 스크립트)
+#
+# 기존 진단 로직은 신뢰도가 낮은 사진을 dataset/UNCLASSIFIED/에 먼저 업로드한 뒤,
+# 복합 곰팡이로 판정되면 같은 원본을 dataset/MULTI/에 다시 업로드해서
+# UNCLASSIFIED 쪽에 주인 없는 사본이 남아 있음 (DB의 image_path는 MULTI 쪽을 가리킴)
+#
+# 실행:
+#   python reconcile_multi_uploads.py           # 중복 목록만 출력 (dry-run)
+#   python reconcile_multi_uploads.py --apply   # DB 참조를 MULTI로 합친 뒤 UNCLASSIFIED 사본 삭제
+#
+# - 두 객체의 크기/ETag가 같을 때만 중복으로 판단 (다르면 목록에만 표시하고 건드리지 않음)
+# - UNCLASSIFIED 사본을 가리키는 Diagnosis 행이 있으면 MULTI URL로 갱신한 뒤 삭제
+
+import argparse
+import asyncio
+import os
+import sys
+
+from sqlalchemy import update
+
+# 프로젝트 루트 경로 추가
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.database import AsyncSessionLocal, engine
+from app.domains.diagnosis.models import Diagnosis
+from app.utils.storage import StorageClient
+
+MULTI_PREFIX = "dataset/MULTI/"
+UNCLASSIFIED_PREFIX = "dataset/UNCLASSIFIED/"
+
+
+def list_multi_images(storage: StorageClient) -> list[str]:
+    """dataset/MULTI/ 아래 원본 이미지 key 목록 (JSON sidecar 제외)"""
+    keys = []
+    paginator = storage.s3_client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=storage.bucket_name, Prefix=MULTI_PREFIX):
+        for obj in page.get("Contents", []):
+            if not obj["Key"].endswith(".json"):
+                keys.append(obj["Key"])
+    return keys
+
+
+def head(storage: StorageClient, key: str) -> dict | None:
+    try:
+        return storage.s3_client.head_object(Bucket=storage.bucket_name, Key=key)
+    except storage.s3_client.exceptions.ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return None
+        raise
+
+
+def find_duplicates(storage: StorageClient) -> tuple[list[tuple[str, str]], list[tuple[str, str]]]:
+    """
+    반환: (동일한 사본 목록, 내용이 다른 사본 목록)
+    각 항목은 (MULTI key, UNCLASSIFIED key)
+    """
+    duplicates, mismatched = [], []
+    for multi_key in list_multi_images(storage):
+        unclassified_key = UNCLASSIFIED_PREFIX + multi_key[len(MULTI_PREFIX):]
+        copy = head(storage, unclassified_key)
+        if copy is None:
+            continue
+
+        original = head(storage, multi_key)
+        same = (
+            original is not None
+            and original["ContentLength"] == copy["ContentLength"]
+            and original["ETag"] == copy["ETag"]
+        )
+        (duplicates if same else mismatched).append((multi_key, unclassified_key))
+    return duplicates, mismatched
+
+
+async def merge_references(storage: StorageClient, duplicates: list[tuple[str, str]]) -> int:
+    """UNCLASSIFIED 사본 URL을 가리키는 Diagnosis 행을 MULTI URL로 갱신"""
+    updated = 0
+    async with AsyncSessionLocal() as db:
+        for multi_key, unclassified_key in duplicates:
+            result = await db.execute(
+                update(Diagnosis)
+                .where(Diagnosis.image_path == storage.object_url(unclassified_key))
+                .values(image_path=storage.object_url(multi_key))
+            )
+            updated += result.rowcount or 0
+        await db.commit()
+    return updated
+
+
+def delete_copies(storage: StorageClient, duplicates: list[tuple[str, str]]) -> int:
+    """UNCLASSIFIED 사본 삭제 (delete_objects는 요청당 최대 1000개)"""
+    deleted = 0
+    keys = [unclassified_key for _, unclassified_key in duplicates]
+    for i in range(0, len(keys), 1000):
+        chunk = keys[i:i + 1000]
+        response = storage.s3_client.delete_objects(
+            Bucket=storage.bucket_name,
+            Delete={"Objects": [{"Key": key} for key in chunk], "Quiet": True},
+        )
+        for error in response.get("Errors", []):
+            print(f"⚠️  삭제 실패: {error['Key']} ({error.get('Message')})")
+        deleted += len(chunk) - len(response.get("Errors", []))
+    return deleted
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="MULTI 진단 중복 원본 이미지 정리")
+    parser.add_argument("--apply", action="store_true", help="실제로 DB 갱신 및 S3 삭제 수행 (기본: dry-run)")
+    args = parser.parse_args()
+
+    try:
+        storage = StorageClient()
+    except Exception as e:
+        print(f"❌ [초기화 실패] AWS 설정을 확인해주세요: {e}")
+        return
+
+    print("🔍 dataset/MULTI/ ↔ dataset/UNCLASSIFIED/ 중복 원본 검색 중...")
+    duplicates, mismatched = find_duplicates(storage)
+
+    print("=" * 60)
+    print(f"동일한 중복 사본: {len(duplicates)}개")
+    for multi_key, unclassified_key in duplicates:
+        print(f"   - {unclassified_key} (원본: {multi_key})")
+    if mismatched:
+        print(f"내용이 다른 사본 (건드리지 않음): {len(mismatched)}개")
+        for multi_key, unclassified_key in mismatched:
+            print(f"   - {unclassified_key} ≠ {multi_key}")
+
+    if not args.apply:
+        print("\nℹ️  dry-run 모드입니다. 정리하려면 --apply 옵션으로 다시 실행하세요.")
+        return
+
+    if duplicates:
+        updated = await merge_references(storage, duplicates)
+        print(f"\n🔗 Diagnosis image_path 갱신: {updated}건")
+        deleted = delete_copies(storage, duplicates)
+        print(f"🧹 UNCLASSIFIED 사본 삭제: {deleted}개")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
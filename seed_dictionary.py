@@ -9,7 +9,6 @@ from sqlalchemy import text
 # 프로젝트 루트 경로 추가
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-import google.generativeai as genai
 from app.core.database import AsyncSessionLocal, engine
 from app.domains.dictionary.models import Dictionary
 from app.utils.storage import StorageClient
@@ -17,6 +16,7 @@ from app.core.config import settings
 
 # [수정] VectorStore 클래스를 직접 임포트
 from app.domains.search.vector_store import VectorStore
+from app.utils.llm_gateway import llm_gateway
 
 # ---------------------------------------------------------
 # 1. 곰팡이 전체 데이터 리스트
@@ -226,10 +226,6 @@ def upload_local_file_to_s3(client: StorageClient, web_path: str) -> str:
 
 async def generate_keywords(text_content):
     try:
-        genai.configure(api_key=settings.GEMINI_API_KEY)
-        # [수정] 모델명 변경 (gemini-pro)
-        model = genai.GenerativeModel('models/gemini-2.5-flash') 
-
         prompt = f"""
         다음 곰팡이 정보에서 검색에 유용한 핵심 키워드 5개를
         한국어 단어로만 추출해서 쉼표(,)로 구분해줘.
@@ -239,8 +235,9 @@ async def generate_keywords(text_content):
         {text_content}
         """
 
-        response = model.generate_content(prompt)
-        return response.text.strip()
+        # 공용 LLM 게이트웨이 (데드라인 / 서킷 브레이커, 이벤트 루프 블로킹 없음)
+        response_text = await llm_gateway.generate(prompt, model='models/gemini-2.5-flash', purpose="keywords")
+        return response_text.strip()
 
     except Exception as e:
         print(f"⚠️  [키워드 추출 실패] {e} (기본값 사용)")
@@ -353,6 +350,7 @@ async def seed():
             print("   (DB에 데이터가 저장되지 않았습니다)")
             await db.rollback()
             
+    await llm_gateway.aclose()
     await engine.dispose()
 
 if __name__ == "__main__":